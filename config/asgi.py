@@ -3,6 +3,12 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Es el punto de entrada necesario para el progreso en vivo
+(/curricular/eventos/progreso/), que mantiene una conexión abierta por
+navegador sin ocupar un hilo. Por ejemplo:
+
+    uvicorn config.asgi:application --workers 1
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -13,4 +19,21 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from curricular import eventos  # noqa: E402 (requiere las apps cargadas)
+
+
+async def application(scope, receive, send):
+    """Atiende el protocolo lifespan, que Django no implementa, para cerrar
+    los flujos de eventos abiertos al apagar el servidor"""
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            eventos.difusor.cerrar()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -37,6 +37,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'curricular.instrumentacion.InstrumentacionMiddleware',  # Primero: mide también sesión y autenticación
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,6 +76,57 @@ DATABASES = {
     }
 }
 
+# Cache (memoria local por defecto). LocMemCache es propia de cada proceso: con
+# varios workers (gunicorn, uvicorn --workers N) la versión de curricular.cache_datos
+# solo se invalida en el proceso que hizo el cambio. En ese caso usar una caché
+# compartida, por ejemplo:
+#   CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+#   CACHE_LOCATION=/var/tmp/gestion-curricular-cache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='gestion-curricular'),
+    }
+}
+
+# Vigencia de los agregados y fragmentos en caché (curricular.cache_datos)
+CACHE_DATOS_TIMEOUT = config('CACHE_DATOS_TIMEOUT', default=3600, cast=int)
+
+# Reportes en segundo plano (curricular.tareas)
+REPORTES_MAX_WORKERS = config('REPORTES_MAX_WORKERS', default=2, cast=int)
+REPORTES_EJECUCION_SINCRONA = config('REPORTES_EJECUCION_SINCRONA', default=False, cast=bool)
+# Segundos sin señales de vida tras los cuales una tarea pendiente se da por perdida
+REPORTES_TAREA_VIGENCIA = config('REPORTES_TAREA_VIGENCIA', default=600, cast=int)
+# Pool separado para analizar los archivos subidos (curricular.procesamiento)
+PROCESAMIENTO_MAX_WORKERS = config('PROCESAMIENTO_MAX_WORKERS', default=1, cast=int)
+
+# Motor de búsqueda de texto completo (curricular.busqueda); vacío = según la base de datos
+BUSQUEDA_MOTOR = config('BUSQUEDA_MOTOR', default='')
+# Máximo de carreras que retorna una búsqueda; la lista avisa cuando se alcanza
+BUSQUEDA_LIMITE = config('BUSQUEDA_LIMITE', default=200, cast=int)
+
+# Descargas de archivos CA: '' (Django), 'x-sendfile' (Apache) o 'x-accel-redirect' (Nginx,
+# con una location interna que apunte a MEDIA_ROOT en ARCHIVOS_X_ACCEL_PREFIJO)
+ARCHIVOS_DESCARGA_SERVIDOR = config('ARCHIVOS_DESCARGA_SERVIDOR', default='')
+ARCHIVOS_X_ACCEL_PREFIJO = config('ARCHIVOS_X_ACCEL_PREFIJO', default='/media-protegido/')
+
+# Subidas reanudables de archivos CA (curricular.subidas): tamaño máximo de cada fragmento
+SUBIDAS_TAMAÑO_FRAGMENTO = config('SUBIDAS_TAMAÑO_FRAGMENTO', default=8 * 1024 * 1024, cast=int)
+
+# Medición de tiempo y consultas por vista (curricular.instrumentacion): fracción de peticiones
+# que registran las consultas, ventana del resumen y repeticiones a partir de las que se advierte
+INSTRUMENTACION_ACTIVA = config('INSTRUMENTACION_ACTIVA', default=False, cast=bool)
+INSTRUMENTACION_MUESTREO = config('INSTRUMENTACION_MUESTREO', default=1.0, cast=float)
+INSTRUMENTACION_VENTANA = config('INSTRUMENTACION_VENTANA', default=500, cast=int)
+INSTRUMENTACION_UMBRAL_REPETIDAS = config('INSTRUMENTACION_UMBRAL_REPETIDAS', default=10, cast=int)
+# El encabezado Server-Timing se envía solo al personal (is_staff) o con DEBUG, salvo que esto lo active
+INSTRUMENTACION_SERVER_TIMING_PUBLICO = config('INSTRUMENTACION_SERVER_TIMING_PUBLICO', default=False, cast=bool)
+
+# Progreso en vivo por Server-Sent Events (curricular.eventos), solo con servidor ASGI: segundos
+# entre comentarios de latido y espera sugerida al navegador antes de reconectar
+EVENTOS_LATIDO = config('EVENTOS_LATIDO', default=15, cast=float)
+EVENTOS_REINTENTO_MS = config('EVENTOS_REINTENTO_MS', default=5000, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
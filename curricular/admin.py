@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Sede, Facultad, Carrera, Fase, RediseñoCurricular, 
-    SeguimientoFase, ArchivoComisionAcademica
+    SeguimientoFase, ArchivoComisionAcademica, TareaReporte, CambioSeguimiento
 )
 
 @admin.register(Sede)
@@ -34,34 +34,77 @@ class SeguimientoFaseInline(admin.TabularInline):
 
 @admin.register(RediseñoCurricular)
 class RediseñoCurricularAdmin(admin.ModelAdmin):
-    list_display = ['carrera', 'año', 'estado', 'progreso_porcentaje', 'actualizado_el']
+    list_display = ['carrera', 'año', 'estado', 'progreso', 'actualizado_el']
     list_filter = ['estado', 'año', 'carrera__sede']
+    list_select_related = ['carrera', 'carrera__sede']
     search_fields = ['carrera__nombre']
     inlines = [SeguimientoFaseInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_progreso()
+    
+    @admin.display(description='Progreso', ordering='progreso')
+    def progreso(self, obj):
+        return f"{obj.progreso}%"
+    
     def save_model(self, request, obj, form, change):
         if not change:
             obj.creado_por = request.user
+        # Los seguimientos de cada fase se crean en lote al guardar (ver signals)
         super().save_model(request, obj, form, change)
-        
-        # Crear automáticamente los seguimientos para todas las fases
-        if not change:
-            fases = Fase.objects.all()
-            for fase in fases:
-                SeguimientoFase.objects.get_or_create(
-                    rediseño=obj,
-                    fase=fase
-                )
+    
+    def save_formset(self, request, form, formset, change):
+        seguimientos = formset.save(commit=False)
+        for seguimiento in seguimientos:
+            seguimiento.actualizado_por = request.user
+            seguimiento.origen_cambio = 'admin'
+            seguimiento.save()
+        for eliminado in formset.deleted_objects:
+            eliminado.delete()
+        formset.save_m2m()
 
 @admin.register(SeguimientoFase)
 class SeguimientoFaseAdmin(admin.ModelAdmin):
     list_display = ['rediseño', 'fase', 'completado', 'fecha_inicio', 'fecha_conclusion']
     list_filter = ['completado', 'fase', 'rediseño__carrera__sede']
+    list_select_related = ['rediseño__carrera__sede', 'fase']
     search_fields = ['rediseño__carrera__nombre']
+    readonly_fields = ['actualizado_por', 'actualizado_el']
+    
+    def save_model(self, request, obj, form, change):
+        obj.actualizado_por = request.user
+        obj.origen_cambio = 'admin'
+        super().save_model(request, obj, form, change)
 
 @admin.register(ArchivoComisionAcademica)
 class ArchivoComisionAcademicaAdmin(admin.ModelAdmin):
-    list_display = ['nombre_original', 'seguimiento', 'tamaño_legible', 'subido_por', 'subido_el']
-    list_filter = ['subido_el']
+    list_display = ['nombre_original', 'seguimiento', 'tamaño_legible', 'subido_por', 'subido_el', 'estado_procesamiento']
+    list_filter = ['subido_el', 'estado_procesamiento']
     search_fields = ['nombre_original', 'seguimiento__rediseño__carrera__nombre']
-    readonly_fields = ['tamaño', 'tipo_mime', 'subido_por', 'subido_el']
\ No newline at end of file
+    readonly_fields = [
+        'tamaño', 'tipo_mime', 'subido_por', 'subido_el', 'estado_procesamiento', 'paginas',
+        'miniatura', 'error_procesamiento', 'procesado_el',
+    ]
+    exclude = ['texto_extraido']
+
+@admin.register(CambioSeguimiento)
+class CambioSeguimientoAdmin(admin.ModelAdmin):
+    """Historial de solo lectura"""
+    list_display = ['id', 'seguimiento_id', 'rediseño_id', 'origen', 'usuario', 'fecha']
+    list_filter = ['origen']
+    list_select_related = ['usuario']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(TareaReporte)
+class TareaReporteAdmin(admin.ModelAdmin):
+    list_display = ['tipo', 'estado', 'progreso', 'solicitado_por', 'creado_el', 'finalizado_el']
+    list_filter = ['tipo', 'estado']
+    readonly_fields = ['tipo', 'version', 'estado', 'progreso', 'archivo', 'error', 'solicitado_por', 'finalizado_el']
@@ -0,0 +1,159 @@
+"""
+Almacenamiento direccionado por contenido para los archivos de Comisión
+Académica.
+
+Cada archivo se guarda bajo su SHA-256, calculado mientras se copia, de modo
+que una misma resolución adjuntada a decenas de carreras ocupa espacio una
+sola vez. Las filas de ArchivoComisionAcademica referencian el mismo nombre
+y el contenido se elimina cuando desaparece la última referencia (ver
+curricular.signals).
+
+Una subida que reutiliza un contenido existente todavía no tiene su fila
+confirmada, así que la eliminación no puede saber que lo referencia. Por eso
+cada guardado deja antes una reserva, que se libera al confirmarse la fila o
+vence sola, y la eliminación aparta el archivo, revisa las reservas y lo
+restaura si alguna subida lo está usando. Si la subida mira el destino
+mientras está apartado, lo escribe de nuevo con su propia copia.
+"""
+import hashlib
+import os
+import posixpath
+import tempfile
+import threading
+import time
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+PREFIJO_CONTENIDO = 'comision_academica/sha256'
+DIRECTORIO_RESERVAS = posixpath.join(PREFIJO_CONTENIDO, '.reservas')
+# Segundos que una reserva sin liberar (p. ej. de una transacción revertida) protege el contenido
+RESERVA_VIGENCIA = 3600
+
+class AlmacenamientoContenido(FileSystemStorage):
+    """FileSystemStorage que ignora el nombre sugerido (upload_to) y nombra
+    cada archivo por el SHA-256 de su contenido"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._reservas = {}
+        self._bloqueo_reservas = threading.Lock()
+
+    def nombre_contenido(self, digest):
+        return posixpath.join(PREFIJO_CONTENIDO, digest[:2], digest)
+
+    def reservar(self, nombre):
+        """Protege `nombre` de eliminar_sin_reservas() hasta liberar_reserva()"""
+        directorio = self.path(DIRECTORIO_RESERVAS)
+        os.makedirs(directorio, exist_ok=True)
+        reserva = os.path.join(directorio, f'{posixpath.basename(nombre)}.{uuid.uuid4().hex}')
+        open(reserva, 'x').close()
+        with self._bloqueo_reservas:
+            self._reservas.setdefault(nombre, []).append(reserva)
+
+    def liberar_reserva(self, nombre):
+        """Libera una reserva hecha por este proceso, una vez confirmada la
+        fila que referencia `nombre`"""
+        with self._bloqueo_reservas:
+            reservas = self._reservas.get(nombre)
+            if not reservas:
+                return
+            reserva = reservas.pop()
+            if not reservas:
+                del self._reservas[nombre]
+        try:
+            os.unlink(reserva)
+        except FileNotFoundError:
+            pass
+
+    def reservado(self, nombre):
+        """Si alguna subida de cualquier proceso reservó `nombre`; de paso
+        borra las reservas vencidas"""
+        prefijo = posixpath.basename(nombre) + '.'
+        try:
+            entradas = list(os.scandir(self.path(DIRECTORIO_RESERVAS)))
+        except FileNotFoundError:
+            return False
+        vigente = False
+        for entrada in entradas:
+            if not entrada.name.startswith(prefijo):
+                continue
+            try:
+                if entrada.stat().st_mtime > time.time() - RESERVA_VIGENCIA:
+                    vigente = True
+                else:
+                    os.unlink(entrada.path)
+            except FileNotFoundError:
+                pass
+        return vigente
+
+    def eliminar_sin_reservas(self, nombre):
+        """Elimina el contenido `nombre` salvo que una subida en curso lo haya
+        reservado. Retorna si se eliminó."""
+        if not digest_de(nombre):
+            self.delete(nombre)
+            return True
+        ruta = self.path(nombre)
+        apartado = f'{ruta}.eliminando-{uuid.uuid4().hex}'
+        try:
+            os.replace(ruta, apartado)
+        except FileNotFoundError:
+            return False
+        # Una reserva hecha antes de apartarlo sigue visible aquí; una posterior
+        # ya no encuentra el destino y lo escribe de nuevo
+        if self.reservado(nombre):
+            os.replace(apartado, ruta)
+            return False
+        os.unlink(apartado)
+        return True
+
+    def _save(self, name, content):
+        directorio = self.path(PREFIJO_CONTENIDO)
+        os.makedirs(directorio, exist_ok=True)
+
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=directorio, prefix='.subida-', delete=False) as temporal:
+            try:
+                for bloque in content.chunks():
+                    digest.update(bloque)
+                    temporal.write(bloque)
+            except BaseException:
+                os.unlink(temporal.name)
+                raise
+
+        nombre = self.nombre_contenido(digest.hexdigest())
+        destino = self.path(nombre)
+        # La reserva va antes de comprobar el destino (ver el docstring del módulo)
+        self.reservar(nombre)
+        if os.path.exists(destino):
+            # Contenido ya almacenado: se reutiliza
+            os.unlink(temporal.name)
+        else:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(temporal.name, destino)
+            if self.file_permissions_mode is not None:
+                os.chmod(destino, self.file_permissions_mode)
+            else:
+                # NamedTemporaryFile crea el archivo con permisos 0600
+                umask = os.umask(0)
+                os.umask(umask)
+                os.chmod(destino, 0o666 & ~umask)
+        return nombre
+
+    def get_available_name(self, name, max_length=None):
+        # El nombre final lo decide _save a partir del contenido
+        return name
+
+def digest_de(nombre):
+    """SHA-256 de un archivo direccionado por contenido, o None para los
+    archivos guardados antes de este almacenamiento"""
+    if nombre and nombre.startswith(PREFIJO_CONTENIDO + '/'):
+        return posixpath.basename(nombre)
+    return None
+
+_almacenamiento = AlmacenamientoContenido()
+
+def almacenamiento_ca():
+    """Callable para FileField(storage=...), así la migración no serializa
+    la ruta de MEDIA_ROOT"""
+    return _almacenamiento
@@ -0,0 +1,174 @@
+"""
+API JSON de solo lectura sobre los datos curriculares.
+
+Cada recurso se sirve desde una consulta values() con los campos pedidos en
+`?campos=`, filtros por parámetros y paginación por cursor. Las respuestas
+llevan un ETag débil: para rediseños y seguimientos se deriva de
+Max(actualizado_el) y de los contadores del conjunto filtrado, de modo que
+un 304 se responde con una sola consulta de agregación; las tablas de
+catálogo, pequeñas y sin actualizado_el, usan un hash del contenido.
+"""
+import hashlib
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q, Sum
+
+from .models import Sede, Facultad, Carrera, RediseñoCurricular, SeguimientoFase
+from .paginacion import PaginadorCursor
+
+
+class ParametroInvalido(Exception):
+    pass
+
+
+class Recurso:
+    """`campos` y `filtros` relacionan los nombres públicos con los lookups
+    del ORM; `sello` son las agregaciones que cambian cuando cambian los datos"""
+
+    def __init__(self, queryset, campos, filtros, orden, sello=None):
+        self.queryset = queryset
+        self.campos = campos
+        self.filtros = filtros
+        self.orden = orden
+        self.sello = sello
+
+    def seleccionar(self, parametro):
+        if not parametro:
+            return list(self.campos)
+        campos = [campo.strip() for campo in parametro.split(',') if campo.strip()]
+        desconocidos = [campo for campo in campos if campo not in self.campos]
+        if desconocidos:
+            raise ParametroInvalido(
+                f'Campos desconocidos: {", ".join(desconocidos)}. Disponibles: {", ".join(self.campos)}'
+            )
+        return campos
+
+    def filtrar(self, parametros):
+        queryset = self.queryset
+        for nombre, lookup in self.filtros.items():
+            valor = parametros.get(nombre)
+            if valor not in (None, ''):
+                try:
+                    queryset = queryset.filter(**{lookup: valor})
+                except (ValueError, ValidationError):
+                    raise ParametroInvalido(f'Valor inválido para {nombre}: {valor}')
+        return queryset
+
+    def etag_previo(self, queryset, ruta):
+        """ETag calculado sin leer las filas, o None si el recurso no tiene sello"""
+        if self.sello is None:
+            return None
+        return etag_debil(ruta, queryset.order_by().aggregate(**self.sello))
+
+    def pagina(self, queryset, campos, limite, cursor):
+        lookups = {self.campos[campo] for campo in campos} | set(self.orden)
+        pagina = PaginadorCursor(queryset.values(*lookups), self.orden, limite).get_page(cursor)
+        return [{campo: fila[self.campos[campo]] for campo in campos} for fila in pagina], pagina.siguiente
+
+
+def etag_debil(*partes):
+    contenido = json.dumps(partes, cls=DjangoJSONEncoder, sort_keys=True)
+    return f'W/"{hashlib.md5(contenido.encode(), usedforsecurity=False).hexdigest()}"'
+
+
+RECURSOS = {
+    'sedes': Recurso(
+        Sede.objects.all(),
+        campos={'id': 'pk', 'nombre': 'nombre', 'direccion': 'direccion', 'telefono': 'telefono'},
+        filtros={'nombre': 'nombre__icontains'},
+        orden=['nombre', 'pk'],
+    ),
+    'facultades': Recurso(
+        Facultad.objects.all(),
+        campos={'id': 'pk', 'nombre': 'nombre', 'descripcion': 'descripcion'},
+        filtros={'nombre': 'nombre__icontains'},
+        orden=['nombre', 'pk'],
+    ),
+    'carreras': Recurso(
+        Carrera.objects.all(),
+        campos={
+            'id': 'pk',
+            'nombre': 'nombre',
+            'grado_academico': 'grado_academico',
+            'activo': 'activo',
+            'sede_id': 'sede_id',
+            'sede': 'sede__nombre',
+            'facultad_id': 'facultad_id',
+            'facultad': 'facultad__nombre',
+        },
+        filtros={
+            'sede': 'sede_id',
+            'facultad': 'facultad_id',
+            'grado_academico': 'grado_academico',
+            'activo': 'activo',
+            'nombre': 'nombre__icontains',
+        },
+        orden=['pk'],
+    ),
+    'rediseños': Recurso(
+        RediseñoCurricular.objects.all(),
+        campos={
+            'id': 'pk',
+            'carrera_id': 'carrera_id',
+            'carrera': 'carrera__nombre',
+            'sede': 'carrera__sede__nombre',
+            'facultad': 'carrera__facultad__nombre',
+            'año': 'año',
+            'estado': 'estado',
+            'fecha_inicio': 'fecha_inicio',
+            'fecha_conclusion': 'fecha_conclusion',
+            'fases_completadas': 'fases_completadas',
+            'fases_totales': 'fases_totales',
+            'observaciones': 'observaciones',
+            'creado_el': 'creado_el',
+            'actualizado_el': 'actualizado_el',
+        },
+        filtros={
+            'año': 'año',
+            'estado': 'estado',
+            'carrera': 'carrera_id',
+            'sede': 'carrera__sede_id',
+            'facultad': 'carrera__facultad_id',
+            'actualizado_desde': 'actualizado_el__gte',
+        },
+        orden=['pk'],
+        # Los contadores cubren recalcular_progreso(), que no toca actualizado_el
+        sello={'ultimo': Max('actualizado_el'), 'total': Count('pk'), 'completadas': Sum('fases_completadas')},
+    ),
+    'seguimientos': Recurso(
+        SeguimientoFase.objects.all(),
+        campos={
+            'id': 'pk',
+            'rediseño_id': 'rediseño_id',
+            'fase_id': 'fase_id',
+            'fase_codigo': 'fase__codigo',
+            'fase': 'fase__nombre',
+            'completado': 'completado',
+            'fecha_inicio': 'fecha_inicio',
+            'fecha_conclusion': 'fecha_conclusion',
+            'medio_verificacion': 'medio_verificacion',
+            'observaciones': 'observaciones',
+            'responsable': 'responsable__username',
+            'actualizado_por': 'actualizado_por__username',
+            'actualizado_el': 'actualizado_el',
+        },
+        filtros={
+            'rediseño': 'rediseño_id',
+            'fase': 'fase__codigo',
+            'completado': 'completado',
+            'año': 'rediseño__año',
+            'carrera': 'rediseño__carrera_id',
+            'sede': 'rediseño__carrera__sede_id',
+            'actualizado_desde': 'actualizado_el__gte',
+        },
+        orden=['pk'],
+        # update() en lote puede cambiar `completado` sin tocar actualizado_el
+        sello={
+            'ultimo': Max('actualizado_el'),
+            'total': Count('pk'),
+            'completados': Count('pk', filter=Q(completado=True)),
+        },
+    ),
+}
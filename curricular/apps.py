@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CurricularConfig(AppConfig):
     name = 'curricular'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,194 @@
+"""
+Búsqueda de texto completo sobre carreras, facultades, observaciones y el
+texto de los archivos de Comisión Académica.
+
+Los textos se guardan normalizados (minúsculas, sin acentos) en
+IndiceBusqueda, por lo que "ingenieria" encuentra "Ingeniería" en cualquier
+motor. El motor se elige según la base de datos: FTS5 en SQLite y
+tsvector/GIN en PostgreSQL; BUSQUEDA_MOTOR permite forzar otro.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Min, When
+from django.utils.module_loading import import_string
+
+from .models import Carrera, RediseñoCurricular, SeguimientoFase, ArchivoComisionAcademica, IndiceBusqueda
+
+def normalizar(texto):
+    """Pasa el texto a minúsculas y elimina los acentos"""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+def terminos(consulta):
+    return re.findall(r'\w+', normalizar(consulta))
+
+
+class MotorBasico:
+    """Búsqueda por subcadenas sobre el texto normalizado, para bases de
+    datos sin soporte de texto completo. Ordena carreras antes que
+    observaciones."""
+
+    def consulta(self, palabras, limite):
+        resultados = IndiceBusqueda.objects.all()
+        for palabra in palabras:
+            resultados = resultados.filter(texto__contains=palabra)
+        return resultados.values('carrera_id').annotate(
+            prioridad=Min(Case(When(tipo='carrera', then=0), default=1)),
+            primero=Min('id'),
+        ).order_by('prioridad', 'primero').values_list('carrera_id', flat=True)[:limite]
+
+    def buscar(self, palabras, limite):
+        return list(self.consulta(palabras, limite))
+
+
+class MotorSQL:
+    """Motores cuya consulta es SQL propio del motor: `consulta()` retorna
+    (sql, parámetros), que explicar_consultas también usa para el EXPLAIN"""
+
+    def buscar(self, palabras, limite):
+        with connection.cursor() as cursor:
+            cursor.execute(*self.consulta(palabras, limite))
+            return [fila[0] for fila in cursor.fetchall()]
+
+
+class MotorFTS5(MotorSQL):
+    """SQLite FTS5 sobre la tabla curricular_busqueda_fts, que se mantiene
+    sincronizada con IndiceBusqueda mediante triggers (migración 0005)"""
+
+    def consulta(self, palabras, limite):
+        # Cada término entre comillas y como prefijo: "ingen"* "civ"*
+        consulta = ' '.join(f'"{palabra}"*' for palabra in palabras)
+        # bm25() no puede usarse en un GROUP BY: MATERIALIZED evita que
+        # SQLite combine ambas consultas en una
+        return (
+            """
+            WITH coincidencias AS MATERIALIZED (
+                SELECT i.carrera_id, bm25(curricular_busqueda_fts) AS rango
+                FROM curricular_busqueda_fts
+                JOIN curricular_indicebusqueda i ON i.id = curricular_busqueda_fts.rowid
+                WHERE curricular_busqueda_fts MATCH %s
+            )
+            SELECT carrera_id FROM coincidencias
+            GROUP BY carrera_id
+            ORDER BY MIN(rango)
+            LIMIT %s
+            """,
+            [consulta, limite],
+        )
+
+
+class MotorPostgres(MotorSQL):
+    """PostgreSQL tsvector con el índice GIN curricular_busqueda_gin"""
+
+    def consulta(self, palabras, limite):
+        consulta = ' & '.join(f'{palabra}:*' for palabra in palabras)
+        return (
+            """
+            SELECT carrera_id
+            FROM curricular_indicebusqueda, to_tsquery('simple', %s) consulta
+            WHERE to_tsvector('simple', texto) @@ consulta
+            GROUP BY carrera_id
+            ORDER BY MAX(ts_rank(to_tsvector('simple', texto), consulta)) DESC
+            LIMIT %s
+            """,
+            [consulta, limite],
+        )
+
+
+MOTORES = {
+    'sqlite': MotorFTS5,
+    'postgresql': MotorPostgres,
+}
+
+@lru_cache(maxsize=None)
+def obtener_motor():
+    ruta = getattr(settings, 'BUSQUEDA_MOTOR', None)
+    if ruta:
+        return import_string(ruta)()
+    return MOTORES.get(connection.vendor, MotorBasico)()
+
+def buscar_carreras(consulta, limite=None):
+    """Retorna los ids de hasta `limite` (por defecto BUSQUEDA_LIMITE)
+    carreras que coinciden con la consulta, ordenados por relevancia.
+
+    Los motores agrupan por carrera en la misma consulta, de modo que una
+    carrera con muchos seguimientos coincidentes no desplaza a las demás.
+    """
+    palabras = terminos(consulta)
+    if not palabras:
+        return []
+    return list(obtener_motor().buscar(palabras, limite or settings.BUSQUEDA_LIMITE))
+
+
+# Documentos indexados
+
+CAMPOS_SEGUIMIENTO = {'observaciones', 'medio_verificacion'}
+
+def documento(tipo, objeto_id, carrera_id, *textos):
+    return IndiceBusqueda(
+        tipo=tipo,
+        objeto_id=objeto_id,
+        carrera_id=carrera_id,
+        texto=normalizar(' '.join(texto for texto in textos if texto)),
+    )
+
+def documentos_carreras(carreras):
+    for pk, nombre, facultad in carreras.values_list('pk', 'nombre', 'facultad__nombre'):
+        yield documento('carrera', pk, pk, nombre, facultad)
+
+def documentos_rediseños(rediseños):
+    for pk, carrera_id, observaciones in rediseños.values_list('pk', 'carrera_id', 'observaciones'):
+        yield documento('rediseño', pk, carrera_id, observaciones)
+
+def documentos_seguimientos(seguimientos):
+    for pk, carrera_id, observaciones, medio in seguimientos.values_list(
+        'pk', 'rediseño__carrera_id', 'observaciones', 'medio_verificacion'
+    ):
+        yield documento('seguimiento', pk, carrera_id, observaciones, medio)
+
+def documentos_archivos(archivos):
+    for pk, carrera_id, nombre, descripcion, texto in archivos.values_list(
+        'pk', 'seguimiento__rediseño__carrera_id', 'nombre_original', 'descripcion', 'texto_extraido'
+    ):
+        yield documento('archivo', pk, carrera_id, nombre, descripcion, texto)
+
+def indexar(documentos):
+    """Actualiza incrementalmente los documentos; los vacíos se eliminan"""
+    for doc in documentos:
+        if doc.texto:
+            # Un UPDATE en el caso habitual, en lugar del SELECT ... FOR UPDATE de update_or_create
+            actualizados = IndiceBusqueda.objects.filter(tipo=doc.tipo, objeto_id=doc.objeto_id).update(
+                carrera_id=doc.carrera_id, texto=doc.texto,
+            )
+            if not actualizados:
+                doc.save()
+        else:
+            desindexar(doc.tipo, doc.objeto_id)
+
+def indexar_nuevos(documentos):
+    """Agrega en lote documentos de objetos que aún no están indexados"""
+    return len(IndiceBusqueda.objects.bulk_create([doc for doc in documentos if doc.texto], batch_size=500))
+
+def desindexar(tipo, objeto_id):
+    IndiceBusqueda.objects.filter(tipo=tipo, objeto_id=objeto_id).delete()
+
+def reindexar_todo():
+    """Reconstruye el índice completo y retorna la cantidad de documentos"""
+    documentos = [
+        doc
+        for generador in (
+            documentos_carreras(Carrera.objects.all()),
+            documentos_rediseños(RediseñoCurricular.objects.exclude(observaciones='')),
+            documentos_seguimientos(SeguimientoFase.objects.exclude(observaciones='', medio_verificacion='')),
+            documentos_archivos(ArchivoComisionAcademica.objects.filter(estado_procesamiento='completado')),
+        )
+        for doc in generador
+        if doc.texto
+    ]
+    IndiceBusqueda.objects.all().delete()
+    IndiceBusqueda.objects.bulk_create(documentos, batch_size=500)
+    return len(documentos)
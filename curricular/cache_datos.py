@@ -0,0 +1,68 @@
+"""
+Caché versionada de agregados y fragmentos renderizados.
+
+Las claves incluyen un número de versión global que se incrementa cada vez
+que se confirma un cambio en los datos curriculares (ver curricular.signals),
+de modo que las entradas anteriores simplemente dejan de usarse. Los aciertos
+y fallos se cuentan en la misma caché para calcular la tasa de aciertos.
+
+La versión vive en la caché por defecto. Con LocMemCache cada proceso tiene
+la suya, así que con varios workers la invalidación solo llega al proceso
+que hizo el cambio y los demás sirven datos anteriores hasta
+CACHE_DATOS_TIMEOUT. En ese caso conviene una caché compartida, como
+FileBasedCache (ver CACHES en config/settings.py).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CLAVE_VERSION = 'curricular:datos:version'
+CLAVE_ACIERTOS = 'curricular:datos:aciertos'
+CLAVE_FALLOS = 'curricular:datos:fallos'
+
+def version_inicial():
+    """Si la caché se vacía o descarta la clave, la versión vuelve a empezar
+    desde el reloj, por encima de las anteriores, y nunca repite una ya usada
+    (p. ej. en el ETag del reporte)"""
+    return time.time_ns() // 1000
+
+def version_datos():
+    cache.add(CLAVE_VERSION, version_inicial(), None)
+    return cache.get(CLAVE_VERSION) or version_inicial()
+
+def incrementar_version():
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.set(CLAVE_VERSION, version_inicial(), None)
+
+def _contar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, 1, None)
+
+def obtener_o_calcular(nombre, calcular):
+    """Retorna el valor en caché para la versión actual, o lo calcula y guarda"""
+    clave = f'curricular:{nombre}:v{version_datos()}'
+    valor = cache.get(clave)
+    if valor is not None:
+        _contar(CLAVE_ACIERTOS)
+        return valor
+
+    _contar(CLAVE_FALLOS)
+    valor = calcular()
+    cache.set(clave, valor, settings.CACHE_DATOS_TIMEOUT)
+    return valor
+
+def estadisticas():
+    aciertos = cache.get(CLAVE_ACIERTOS, 0)
+    fallos = cache.get(CLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'version': version_datos(),
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': round(aciertos / total, 4) if total else None,
+    }
@@ -0,0 +1,115 @@
+"""
+Generación de datos sintéticos a gran escala para medir consultas.
+
+Todo se inserta con bulk_create, por lo que poblar decenas de miles de
+seguimientos toma pocas sentencias. Como bulk_create no envía señales, las
+carreras y rediseños creados se agregan al índice de búsqueda explícitamente.
+"""
+from django.contrib.auth import get_user_model
+
+from . import busqueda
+from .models import (
+    Sede, Facultad, Carrera, Fase, RediseñoCurricular,
+    SeguimientoFase, ArchivoComisionAcademica
+)
+
+def poblar_datos_sinteticos(sedes=8, facultades=13, carreras=3, años=3, fases=12, archivos=2):
+    """Crea sedes × facultades × carreras carreras, con un rediseño por año,
+    un seguimiento por fase y `archivos` archivos en la fase Comisión Académica.
+
+    Retorna un diccionario con la cantidad de filas creadas por modelo.
+    """
+    usuario = get_user_model().objects.filter(is_superuser=True).first()
+
+    # Las fases faltantes se crean con la numeración de la UATF (CA es la fase 10)
+    existentes = set(Fase.objects.values_list('numero', flat=True))
+    codigos = set(Fase.objects.values_list('codigo', flat=True))
+    Fase.objects.bulk_create([
+        Fase(
+            numero=numero,
+            nombre=f'Fase {numero}',
+            codigo='CA' if numero == 10 and 'CA' not in codigos else f'F{numero}',
+            orden=numero,
+        )
+        for numero in range(1, fases + 1) if numero not in existentes
+    ])
+    lista_fases = list(Fase.objects.filter(numero__lte=fases))
+
+    nombres_sedes = [f'Sede Sintética {i}' for i in range(sedes)]
+    nombres_facultades = [f'Facultad Sintética {i}' for i in range(facultades)]
+    Sede.objects.bulk_create([Sede(nombre=nombre) for nombre in nombres_sedes], ignore_conflicts=True)
+    Facultad.objects.bulk_create(
+        [Facultad(nombre=nombre) for nombre in nombres_facultades], ignore_conflicts=True
+    )
+    lista_sedes = list(Sede.objects.filter(nombre__in=nombres_sedes))
+    lista_facultades = list(Facultad.objects.filter(nombre__in=nombres_facultades))
+
+    # Continúa la numeración para poder poblar varias veces la misma base
+    inicio = Carrera.objects.filter(nombre__startswith='Carrera Sintética ').count()
+    nuevas_carreras = Carrera.objects.bulk_create([
+        Carrera(
+            sede=sede,
+            facultad=facultad,
+            nombre=f'Carrera Sintética {inicio + i}',
+            activo=i % 10 != 9,
+        )
+        for sede in lista_sedes
+        for facultad in lista_facultades
+        for i in range(carreras)
+    ])
+
+    estados = ['en_proceso', 'en_proceso', 'completado', 'suspendido']
+    año_actual = RediseñoCurricular._meta.get_field('año').default
+    nuevos_rediseños = RediseñoCurricular.objects.bulk_create([
+        RediseñoCurricular(
+            carrera=carrera,
+            año=año_actual - desfase,
+            estado=estados[(carrera.pk + desfase) % len(estados)],
+            observaciones=f'Rediseño sintético de {carrera.nombre}',
+            creado_por=usuario,
+        )
+        for carrera in nuevas_carreras
+        for desfase in range(años)
+    ])
+
+    nuevos_seguimientos = SeguimientoFase.objects.bulk_create([
+        SeguimientoFase(
+            rediseño=rediseño,
+            fase=fase,
+            completado=fase.numero <= (rediseño.pk % (len(lista_fases) + 1)),
+        )
+        for rediseño in nuevos_rediseños
+        for fase in lista_fases
+    ])
+
+    nuevos_archivos = ArchivoComisionAcademica.objects.bulk_create([
+        ArchivoComisionAcademica(
+            seguimiento=seguimiento,
+            archivo=f'comision_academica/sintetico/{seguimiento.pk}_{i}.pdf',
+            nombre_original=f'resolucion_{seguimiento.pk}_{i}.pdf',
+            tamaño=1024 * 1024,
+            tipo_mime='application/pdf',
+            subido_por=usuario,
+        )
+        for seguimiento in nuevos_seguimientos
+        if seguimiento.fase.codigo == 'CA'
+        for i in range(archivos)
+    ])
+
+    busqueda.indexar_nuevos([
+        *(
+            busqueda.documento('carrera', carrera.pk, carrera.pk, carrera.nombre, carrera.facultad.nombre)
+            for carrera in nuevas_carreras
+        ),
+        *(
+            busqueda.documento('rediseño', rediseño.pk, rediseño.carrera_id, rediseño.observaciones)
+            for rediseño in nuevos_rediseños
+        ),
+    ])
+
+    return {
+        'carreras': len(nuevas_carreras),
+        'rediseños': len(nuevos_rediseños),
+        'seguimientos': len(nuevos_seguimientos),
+        'archivos': len(nuevos_archivos),
+    }
@@ -0,0 +1,110 @@
+"""
+Descarga de archivos con peticiones condicionales y por rangos de bytes.
+
+Una descarga interrumpida puede reanudarse con `Range: bytes=N-`; ETag y
+Last-Modified permiten responder 304 sin leer el archivo. Con
+ARCHIVOS_DESCARGA_SERVIDOR = 'x-sendfile' o 'x-accel-redirect' el envío del
+contenido (incluidos los rangos) se delega al servidor web.
+"""
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+TAMAÑO_BLOQUE = 64 * 1024
+
+RANGO_BYTES = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def rango_solicitado(cabecera, tamaño):
+    """Interpreta una cabecera Range de un solo rango.
+
+    Retorna (inicio, fin) inclusivos, None si la cabecera no aplica (se envía
+    el archivo completo) o False si el rango no es satisfacible.
+    """
+    coincidencia = RANGO_BYTES.match(cabecera.replace(' ', ''))
+    if not coincidencia or coincidencia.groups() == ('', ''):
+        return None
+
+    inicio, fin = coincidencia.groups()
+    if not inicio:
+        # Sufijo: los últimos N bytes
+        largo = int(fin)
+        if largo == 0:
+            return False
+        return max(tamaño - largo, 0), tamaño - 1
+
+    inicio = int(inicio)
+    fin = min(int(fin), tamaño - 1) if fin else tamaño - 1
+    if inicio >= tamaño or fin < inicio:
+        return False
+    return inicio, fin
+
+def if_range_vigente(request, etag, modificado):
+    """If-Range solo permite el rango si el recurso no cambió"""
+    valor = request.headers.get('If-Range')
+    if not valor:
+        return True
+    if valor.startswith(('"', 'W/')):
+        return valor == etag
+    fecha = parse_http_date_safe(valor)
+    return fecha is not None and int(modificado.timestamp()) <= fecha
+
+def leer_bytes(campo, inicio, largo):
+    with campo.open('rb') as archivo:
+        archivo.seek(inicio)
+        while largo > 0:
+            bloque = archivo.read(min(TAMAÑO_BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+
+def servir_archivo(request, campo, tamaño, modificado, etag, nombre, tipo_mime):
+    """Responde con el contenido del FileField `campo` atendiendo
+    If-None-Match, If-Modified-Since, Range e If-Range"""
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(modificado.timestamp())
+    )
+    if response is None:
+        response = respuesta_archivo(request, campo, tamaño, etag, modificado)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modificado.timestamp())
+    if response.status_code in (200, 206):
+        response['Content-Type'] = tipo_mime
+        response['Content-Disposition'] = content_disposition_header(True, nombre)
+    return response
+
+def respuesta_archivo(request, campo, tamaño, etag, modificado):
+    servidor = getattr(settings, 'ARCHIVOS_DESCARGA_SERVIDOR', '')
+    if servidor == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = campo.path
+        return response
+    if servidor == 'x-accel-redirect':
+        response = HttpResponse()
+        # Nginx decodifica la URI: espacios, %, ?, # y no ASCII van escapados
+        response['X-Accel-Redirect'] = settings.ARCHIVOS_X_ACCEL_PREFIJO.rstrip('/') + '/' + quote(campo.name)
+        return response
+
+    rango = None
+    if 'Range' in request.headers and if_range_vigente(request, etag, modificado):
+        rango = rango_solicitado(request.headers['Range'], tamaño)
+
+    if rango is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{tamaño}'
+        return response
+
+    inicio, fin = rango or (0, tamaño - 1)
+    response = StreamingHttpResponse(
+        leer_bytes(campo, inicio, fin - inicio + 1), status=206 if rango else 200
+    )
+    response['Content-Length'] = fin - inicio + 1
+    response['Accept-Ranges'] = 'bytes'
+    if rango:
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{tamaño}'
+    return response
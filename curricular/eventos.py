@@ -0,0 +1,201 @@
+"""
+Actualizaciones en vivo del progreso por Server-Sent Events.
+
+Un único Difusor por proceso reparte cada evento entre todas las conexiones
+abiertas: las señales anotan los rediseños y seguimientos modificados en la
+publicación pendiente de la transacción, y al confirmarse se calculan una
+sola vez los contadores del dashboard y el progreso de esos rediseños. El mensaje se serializa una vez y
+se encola tal cual para cada navegador, de modo que N dashboards abiertos
+cuestan un evento en lugar de N recargas completas.
+
+Las conexiones se mantienen abiertas solo con un servidor ASGI (ver
+config/asgi.py). Cada proceso difunde los cambios hechos en él: con varios
+procesos, un cliente conectado a otro no los recibe hasta recargar.
+"""
+import asyncio
+import json
+import threading
+from collections import deque
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import RediseñoCurricular, SeguimientoFase
+
+
+class Difusor:
+    """Reparte los eventos publicados desde cualquier hilo entre las colas
+    asyncio de los suscriptores, cada una en el bucle donde se creó.
+
+    Un suscriptor lento no frena a los demás: si su cola está llena se
+    descarta el evento más antiguo, que los siguientes reemplazan porque
+    cada evento lleva los contadores completos.
+    """
+
+    def __init__(self, historial=100, capacidad=100):
+        self._suscriptores = {}
+        self._historial = deque(maxlen=historial)
+        self._capacidad = capacidad
+        self._ultimo_id = 0
+        self._bloqueo = threading.Lock()
+
+    @property
+    def suscriptores(self):
+        return len(self._suscriptores)
+
+    def suscribir(self, ultimo_id=None):
+        """Cola con los eventos siguientes. Con `ultimo_id` (cabecera
+        Last-Event-ID de una reconexión) se reenvían los perdidos, o se
+        pide recargar la página si ya no están en el historial."""
+        cola = asyncio.Queue(self._capacidad)
+        with self._bloqueo:
+            self._suscriptores[cola] = asyncio.get_running_loop()
+            if ultimo_id is not None and ultimo_id != self._ultimo_id:
+                perdidos = [mensaje for id_evento, mensaje in self._historial if id_evento > ultimo_id]
+                primero = self._historial[0][0] if self._historial else None
+                if ultimo_id > self._ultimo_id or primero is None or primero > ultimo_id + 1:
+                    perdidos = [self._mensaje(self._ultimo_id, 'recargar', {})]
+                for mensaje in perdidos[-self._capacidad:]:
+                    cola.put_nowait(mensaje)
+        return cola
+
+    def desuscribir(self, cola):
+        with self._bloqueo:
+            self._suscriptores.pop(cola, None)
+
+    def publicar(self, tipo, calcular):
+        """Publica el evento `tipo` con los datos que retorna `calcular()`,
+        que solo se llama si hay alguien escuchando"""
+        with self._bloqueo:
+            if not self._suscriptores:
+                # Los clientes que se reconecten después sabrán que perdieron algo
+                self._ultimo_id += 1
+                self._historial.clear()
+                return None
+        datos = calcular()
+        with self._bloqueo:
+            self._ultimo_id += 1
+            mensaje = self._mensaje(self._ultimo_id, tipo, datos)
+            self._historial.append((self._ultimo_id, mensaje))
+            self._repartir(mensaje)
+            return self._ultimo_id
+
+    def cerrar(self):
+        """Termina todos los flujos abiertos, al apagar el servidor"""
+        with self._bloqueo:
+            self._repartir(None)
+
+    def _repartir(self, mensaje):
+        for cola, bucle in list(self._suscriptores.items()):
+            try:
+                bucle.call_soon_threadsafe(self._entregar, cola, mensaje)
+            except RuntimeError:
+                # El bucle ya se cerró
+                del self._suscriptores[cola]
+
+    @staticmethod
+    def _entregar(cola, mensaje):
+        if cola.full():
+            cola.get_nowait()
+        cola.put_nowait(mensaje)
+
+    @staticmethod
+    def _mensaje(id_evento, tipo, datos):
+        contenido = json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False)
+        return f'id: {id_evento}\nevent: {tipo}\ndata: {contenido}\n\n'.encode()
+
+
+difusor = Difusor()
+
+
+class Publicacion:
+    """Cambios de una transacción, registrada como su callback on_commit.
+    Si la transacción se revierte, Django la descarta junto con lo anotado."""
+
+    def __init__(self):
+        self.rediseño_ids, self.seguimiento_ids = set(), set()
+        self.publicada = False
+
+    def __call__(self):
+        self.publicada = True
+        return difusor.publicar('progreso', lambda: datos_progreso(self.rediseño_ids, self.seguimiento_ids))
+
+def publicacion_pendiente():
+    """Publicación aún no ejecutada de la transacción actual, o None"""
+    conexion = transaction.get_connection()
+    if not conexion.in_atomic_block:
+        return None
+    for _, callback, _ in conexion.run_on_commit:
+        if isinstance(callback, Publicacion) and not callback.publicada:
+            return callback
+    return None
+
+def notificar(rediseño_ids=(), seguimiento_ids=()):
+    """Anota los cambios para publicarlos en un solo evento cuando se
+    confirme la transacción actual. Sin ids solo se publican los contadores,
+    por ejemplo al activar o desactivar una carrera."""
+    publicacion = publicacion_pendiente()
+    nueva = publicacion is None
+    if nueva:
+        publicacion = Publicacion()
+    publicacion.rediseño_ids.update(rediseño_ids)
+    publicacion.seguimiento_ids.update(seguimiento_ids)
+    if nueva:
+        # Fuera de una transacción on_commit la ejecuta en el acto
+        transaction.on_commit(publicacion)
+
+def datos_progreso(rediseño_ids, seguimiento_ids):
+    """Contadores del dashboard y estado actual de lo modificado.
+
+    Los contadores no salen de la caché: fuera de una transacción el evento
+    se publica dentro de la señal, antes de que invalidar_caches cambie la
+    versión, y la entrada cacheada aún tendría los valores anteriores.
+    """
+    from .views import estadisticas_dashboard
+
+    rediseños = RediseñoCurricular.objects.filter(pk__in=rediseño_ids).values(
+        'pk', 'estado', 'fases_completadas', 'fases_totales'
+    )
+    fases = SeguimientoFase.objects.filter(pk__in=seguimiento_ids).values(
+        'pk', 'rediseño_id', 'fase__nombre', 'completado', 'fecha_conclusion'
+    )
+    return {
+        'totales': estadisticas_dashboard(),
+        'rediseños': [
+            {
+                'id': fila['pk'],
+                'estado': fila['estado'],
+                'fases_completadas': fila['fases_completadas'],
+                'fases_totales': fila['fases_totales'],
+                'progreso': int(fila['fases_completadas'] * 100 / fila['fases_totales']) if fila['fases_totales'] else 0,
+            }
+            for fila in rediseños
+        ],
+        'fases': [
+            {
+                'id': fila['pk'],
+                'rediseño_id': fila['rediseño_id'],
+                'fase': fila['fase__nombre'],
+                'completado': fila['completado'],
+                'fecha_conclusion': fila['fecha_conclusion'],
+            }
+            for fila in fases
+        ],
+    }
+
+async def flujo_eventos(ultimo_id, latido, reintento_ms):
+    """Contenido de la respuesta text/event-stream; el comentario de latido
+    mantiene viva la conexión a través de proxies"""
+    cola = difusor.suscribir(ultimo_id)
+    try:
+        yield f'retry: {reintento_ms}\n\n'.encode()
+        while True:
+            try:
+                mensaje = await asyncio.wait_for(cola.get(), latido)
+            except asyncio.TimeoutError:
+                mensaje = b': latido\n\n'
+            if mensaje is None:
+                return
+            yield mensaje
+    finally:
+        difusor.desuscribir(cola)
@@ -0,0 +1,219 @@
+"""
+Exportación de rediseños y seguimientos para hojas de cálculo y análisis.
+
+Los datos se leen con values_list() y .iterator(), en un número constante de
+consultas y sin crear instancias de modelos, por lo que la memoria no crece
+con los años de historial.
+"""
+import csv
+import json
+from datetime import date
+from io import StringIO
+from itertools import groupby
+from operator import itemgetter
+
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from .models import RediseñoCurricular, SeguimientoFase, Fase
+from .tareas import tipo_reporte
+
+MIME_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+TAMAÑO_LOTE = 2000
+
+ESTADOS_REDISEÑO = dict(RediseñoCurricular._meta.get_field('estado').choices)
+
+def nombre_usuario(username, nombres, apellidos):
+    """Equivalente a get_full_name() con respaldo en el nombre de usuario"""
+    return f'{nombres} {apellidos}'.strip() or username or ''
+
+def fecha_local(valor):
+    """Excel no admite zonas horarias: se exporta la hora local sin tzinfo"""
+    return timezone.localtime(valor).replace(tzinfo=None) if valor else None
+
+def seguimientos_por_rediseño(tamaño_lote=TAMAÑO_LOTE):
+    """Itera (rediseño, seguimientos) a partir de una sola consulta con
+    LEFT JOIN, ordenada por rediseño y fase.
+
+    `rediseño` es la tupla (año, sede, facultad, carrera, estado,
+    fases_completadas, fases_totales) y cada seguimiento la tupla
+    (fase_id, completado, fecha_inicio, fecha_conclusion, responsable,
+    actualizado_por, actualizado_el).
+    """
+    filas = RediseñoCurricular.objects.order_by(
+        '-año', 'carrera__sede__nombre', 'carrera__nombre', 'pk', 'seguimientos__fase__orden'
+    ).values_list(
+        'pk', 'año', 'carrera__sede__nombre', 'carrera__facultad__nombre', 'carrera__nombre',
+        'estado', 'fases_completadas', 'fases_totales',
+        'seguimientos__fase_id', 'seguimientos__completado',
+        'seguimientos__fecha_inicio', 'seguimientos__fecha_conclusion',
+        'seguimientos__responsable__username', 'seguimientos__responsable__first_name',
+        'seguimientos__responsable__last_name',
+        'seguimientos__actualizado_por__username', 'seguimientos__actualizado_por__first_name',
+        'seguimientos__actualizado_por__last_name',
+        'seguimientos__actualizado_el',
+    ).iterator(chunk_size=tamaño_lote)
+
+    for _, grupo in groupby(filas, key=itemgetter(0)):
+        grupo = list(grupo)
+        seguimientos = [
+            (
+                fila[8], fila[9], fila[10], fila[11],
+                nombre_usuario(*fila[12:15]), nombre_usuario(*fila[15:18]), fila[18],
+            )
+            for fila in grupo
+            if fila[8] is not None
+        ]
+        yield grupo[0][1:8], seguimientos
+
+def encabezado(hoja, titulos):
+    relleno = PatternFill('solid', fgColor='1A5490')
+    fuente = Font(bold=True, color='FFFFFF')
+    celdas = []
+    for titulo in titulos:
+        celda = WriteOnlyCell(hoja, value=titulo)
+        celda.font = fuente
+        celda.fill = relleno
+        celdas.append(celda)
+    hoja.append(celdas)
+
+def construir_reporte_xlsx(destino, tarea=None):
+    """Escribe en `destino` un libro con la matriz de fases por rediseño y el
+    detalle de cada seguimiento, usando el modo de solo escritura de openpyxl"""
+    fases = list(Fase.objects.order_by('orden', 'numero').values_list('pk', 'codigo', 'nombre'))
+    total = RediseñoCurricular.objects.count() if tarea else 0
+
+    libro = Workbook(write_only=True)
+    matriz = libro.create_sheet('Matriz de Fases')
+    detalle = libro.create_sheet('Seguimientos')
+
+    columnas_rediseño = ['Año', 'Sede', 'Facultad', 'Carrera', 'Estado', 'Progreso (%)']
+    for hoja, anchos in ((matriz, [8, 16, 40, 45, 12, 12]), (detalle, [8, 16, 40, 45, 12, 12, 45])):
+        for columna, ancho in enumerate(anchos, 1):
+            hoja.column_dimensions[get_column_letter(columna)].width = ancho
+        hoja.freeze_panes = 'E2'
+
+    encabezado(matriz, columnas_rediseño + [codigo for _, codigo, _ in fases])
+    encabezado(detalle, columnas_rediseño + [
+        'Fase', 'Completado', 'Fecha de Inicio', 'Fecha de Conclusión',
+        'Responsable', 'Actualizado por', 'Actualizado el',
+    ])
+
+    nombres_fases = {pk: f'{codigo} - {nombre}' for pk, codigo, nombre in fases}
+    for procesados, (rediseño, seguimientos) in enumerate(seguimientos_por_rediseño(), 1):
+        año, sede, facultad, carrera, estado, completadas, totales = rediseño
+        datos = [
+            año, sede, facultad, carrera, ESTADOS_REDISEÑO.get(estado, estado),
+            int(completadas / totales * 100) if totales else 0,
+        ]
+
+        # Matriz: fecha de conclusión de cada fase completada ('Sí' si no tiene fecha)
+        por_fase = {seguimiento[0]: seguimiento for seguimiento in seguimientos}
+        celdas = []
+        for fase_id, _, _ in fases:
+            seguimiento = por_fase.get(fase_id)
+            if seguimiento is None or not seguimiento[1]:
+                celdas.append(None)
+            else:
+                celdas.append(seguimiento[3] or 'Sí')
+        matriz.append(datos + celdas)
+
+        for fase_id, completado, inicio, conclusion, responsable, actualizado_por, actualizado_el in seguimientos:
+            detalle.append(datos + [
+                nombres_fases.get(fase_id), 'Sí' if completado else 'No', inicio, conclusion,
+                responsable, actualizado_por, fecha_local(actualizado_el),
+            ])
+
+        if tarea and procesados % 500 == 0:
+            tarea.reportar_progreso(10 + 80 * procesados // max(total, 1))
+
+    libro.save(destino)
+
+@tipo_reporte('reporte_xlsx', 'rediseños_curriculares.xlsx', MIME_XLSX)
+def tarea_reporte_xlsx(tarea, destino):
+    tarea.reportar_progreso(10)
+    construir_reporte_xlsx(destino, tarea)
+
+
+# Seguimientos en CSV / NDJSON
+
+COLUMNAS_SEGUIMIENTOS = [
+    ('seguimiento_id', 'pk'),
+    ('rediseño_id', 'rediseño_id'),
+    ('año', 'rediseño__año'),
+    ('estado_rediseño', 'rediseño__estado'),
+    ('sede', 'rediseño__carrera__sede__nombre'),
+    ('facultad', 'rediseño__carrera__facultad__nombre'),
+    ('carrera_id', 'rediseño__carrera_id'),
+    ('carrera', 'rediseño__carrera__nombre'),
+    ('grado_academico', 'rediseño__carrera__grado_academico'),
+    ('fase_numero', 'fase__numero'),
+    ('fase_codigo', 'fase__codigo'),
+    ('fase', 'fase__nombre'),
+    ('completado', 'completado'),
+    ('fecha_inicio', 'fecha_inicio'),
+    ('fecha_conclusion', 'fecha_conclusion'),
+    ('medio_verificacion', 'medio_verificacion'),
+    ('observaciones', 'observaciones'),
+    ('responsable', 'responsable__username'),
+    ('actualizado_por', 'actualizado_por__username'),
+    ('actualizado_el', 'actualizado_el'),
+]
+
+FORMATOS_SEGUIMIENTOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+def filtrar_seguimientos(filtros):
+    """Aplica los filtros validados por FiltroSeguimientosForm"""
+    seguimientos = SeguimientoFase.objects.all()
+    campos = {
+        'año': 'rediseño__año',
+        'sede': 'rediseño__carrera__sede_id',
+        'facultad': 'rediseño__carrera__facultad_id',
+        'carrera': 'rediseño__carrera_id',
+        'fase': 'fase__codigo',
+        'completado': 'completado',
+        'desde': 'actualizado_el__gte',
+    }
+    for nombre, lookup in campos.items():
+        if filtros.get(nombre) not in (None, ''):
+            seguimientos = seguimientos.filter(**{lookup: filtros[nombre]})
+    return seguimientos
+
+def filas_seguimientos(seguimientos, tamaño_lote=TAMAÑO_LOTE):
+    """Tuplas de COLUMNAS_SEGUIMIENTOS en orden de id, leídas por lotes"""
+    return seguimientos.order_by('pk').values_list(
+        *(lookup for _, lookup in COLUMNAS_SEGUIMIENTOS)
+    ).iterator(chunk_size=tamaño_lote)
+
+def valor_exportable(valor):
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+def exportar_seguimientos(seguimientos, formato, tamaño_lote=TAMAÑO_LOTE):
+    """Genera el contenido en `formato` ('csv' o 'ndjson') en bloques de
+    texto de `tamaño_lote` filas, para StreamingHttpResponse o un archivo"""
+    nombres = [nombre for nombre, _ in COLUMNAS_SEGUIMIENTOS]
+    buffer = StringIO()
+    escritor = csv.writer(buffer)
+    if formato == 'csv':
+        escritor.writerow(nombres)
+
+    for numero, fila in enumerate(filas_seguimientos(seguimientos, tamaño_lote), 1):
+        fila = [valor_exportable(valor) for valor in fila]
+        if formato == 'csv':
+            escritor.writerow(fila)
+        else:
+            buffer.write(json.dumps(dict(zip(nombres, fila)), ensure_ascii=False) + '\n')
+        if numero % tamaño_lote == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
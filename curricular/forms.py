@@ -1,5 +1,23 @@
 from django import forms
-from .models import SeguimientoFase, ArchivoComisionAcademica
+from .models import Fase, RediseñoCurricular, SeguimientoFase, ArchivoComisionAcademica
+
+# Archivos de Comisión Académica
+TAMAÑO_MAXIMO_ARCHIVO_CA = 50 * 1024 * 1024
+EXTENSIONES_PERMITIDAS_CA = [
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx',
+    '.ppt', '.pptx', '.txt', '.zip', '.rar'
+]
+
+def validar_archivo_ca(nombre, tamaño):
+    # Validar tamaño máximo (50MB)
+    if tamaño > TAMAÑO_MAXIMO_ARCHIVO_CA:
+        raise forms.ValidationError('El archivo no puede ser mayor a 50MB')
+    
+    # Validar extensiones permitidas
+    if not any(nombre.lower().endswith(ext) for ext in EXTENSIONES_PERMITIDAS_CA):
+        raise forms.ValidationError(
+            'Formato de archivo no permitido. Formatos aceptados: PDF, Word, Excel, PowerPoint, TXT, ZIP, RAR'
+        )
 
 class SeguimientoFaseForm(forms.ModelForm):
     class Meta:
@@ -26,6 +44,70 @@ class SeguimientoFaseForm(forms.ModelForm):
             'observaciones': 'Observaciones',
         }
 
+class CambiosLoteMixin:
+    """Campos editables en lote; los que quedan vacíos no se modifican"""
+    CAMPOS_LOTE = ['completado', 'fecha_inicio', 'fecha_conclusion']
+    
+    def cambios(self):
+        return {
+            campo: self.cleaned_data[campo]
+            for campo in self.CAMPOS_LOTE
+            if self.cleaned_data.get(campo) is not None
+        }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors and not self.cambios():
+            raise forms.ValidationError('Indique al menos un cambio.')
+        return cleaned_data
+
+class ActualizacionLoteForm(CambiosLoteMixin, forms.Form):
+    """Aplica los mismos cambios a una fase de varios rediseños"""
+    fase = forms.ModelChoiceField(
+        queryset=Fase.objects.all(),
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    rediseños = forms.ModelMultipleChoiceField(
+        queryset=RediseñoCurricular.objects.filter(estado='en_proceso').select_related('carrera__sede'),
+        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'}),
+        label='Rediseños',
+    )
+    completado = forms.NullBooleanField(
+        required=False,
+        widget=forms.Select(
+            choices=[('unknown', 'Sin cambios'), ('true', 'Completada'), ('false', 'Pendiente')],
+            attrs={'class': 'form-select'},
+        ),
+        label='Estado de la Fase',
+    )
+    fecha_inicio = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+        label='Fecha de Inicio',
+    )
+    fecha_conclusion = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+        label='Fecha de Conclusión',
+    )
+
+class SeguimientoLoteForm(CambiosLoteMixin, forms.Form):
+    """Un elemento de la API de actualización en lote"""
+    rediseño = forms.IntegerField()
+    completado = forms.NullBooleanField(required=False)
+    fecha_inicio = forms.DateField(required=False)
+    fecha_conclusion = forms.DateField(required=False)
+
+class FiltroSeguimientosForm(forms.Form):
+    """Filtros de la exportación de seguimientos (vista y comando)"""
+    año = forms.IntegerField(required=False)
+    sede = forms.IntegerField(required=False)
+    facultad = forms.IntegerField(required=False)
+    carrera = forms.IntegerField(required=False)
+    fase = forms.CharField(required=False, help_text='Código de la fase, por ejemplo CA')
+    completado = forms.NullBooleanField(required=False)
+    desde = forms.DateTimeField(required=False, help_text='Solo seguimientos actualizados desde esta fecha')
+
 class ArchivoComisionAcademicaForm(forms.ModelForm):
     class Meta:
         model = ArchivoComisionAcademica
@@ -42,18 +124,18 @@ class ArchivoComisionAcademicaForm(forms.ModelForm):
     def clean_archivo(self):
         archivo = self.cleaned_data.get('archivo')
         if archivo:
-            # Validar tamaño máximo (50MB)
-            if archivo.size > 50 * 1024 * 1024:
-                raise forms.ValidationError('El archivo no puede ser mayor a 50MB')
-            
-            # Validar extensiones permitidas
-            extensiones_permitidas = [
-                '.pdf', '.doc', '.docx', '.xls', '.xlsx', 
-                '.ppt', '.pptx', '.txt', '.zip', '.rar'
-            ]
-            nombre = archivo.name.lower()
-            if not any(nombre.endswith(ext) for ext in extensiones_permitidas):
-                raise forms.ValidationError(
-                    'Formato de archivo no permitido. Formatos aceptados: PDF, Word, Excel, PowerPoint, TXT, ZIP, RAR'
-                )
-        return archivo
\ No newline at end of file
+            validar_archivo_ca(archivo.name, archivo.size)
+        return archivo
+
+class InicioSubidaForm(forms.Form):
+    """Primer paso de la subida por fragmentos: se valida el archivo antes
+    de recibir su contenido"""
+    nombre = forms.CharField(max_length=255)
+    tamaño = forms.IntegerField(min_value=1)
+    descripcion = forms.CharField(max_length=500, required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors:
+            validar_archivo_ca(cleaned_data['nombre'], cleaned_data['tamaño'])
+        return cleaned_data
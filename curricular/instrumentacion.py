@@ -0,0 +1,175 @@
+"""
+Medición del costo de cada petición: tiempo total, cantidad y tiempo de las
+consultas SQL y consultas repetidas (el patrón N+1).
+
+InstrumentacionMiddleware publica los valores en la cabecera Server-Timing y
+los acumula por vista en un resumen en memoria del proceso, consultable en
+/curricular/instrumentacion/ por el personal administrativo. Con
+INSTRUMENTACION_MUESTREO < 1 solo una fracción de las peticiones registra
+las consultas; el resto apenas mide el tiempo, por lo que puede quedar
+activo en producción.
+
+El tiempo de las respuestas en streaming cubre hasta que se crea la
+respuesta, no el envío del contenido.
+"""
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_resumen = {}
+_bloqueo = threading.Lock()
+
+
+class MedicionConsultas:
+    """execute_wrapper que cuenta las consultas y su duración, y agrupa por
+    SQL (sin parámetros) para detectar las que se repiten"""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.duracion = 0.0
+        self.por_sql = Counter()
+        self._pila = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duracion += time.perf_counter() - inicio
+            self.cantidad += 1
+            self.por_sql[sql] += 1
+
+    def __enter__(self):
+        for conexion in connections.all():
+            self._pila.enter_context(conexion.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pila.close()
+
+    def duplicadas(self):
+        """Cantidad de ejecuciones repetidas y la consulta más repetida"""
+        repetidas = sum(veces - 1 for veces in self.por_sql.values())
+        if not repetidas:
+            return 0, None
+        sql, veces = self.por_sql.most_common(1)[0]
+        return repetidas, (sql, veces)
+
+
+def registrar(vista, duracion, medicion=None):
+    ventana = settings.INSTRUMENTACION_VENTANA
+    with _bloqueo:
+        datos = _resumen.setdefault(vista, {
+            'peticiones': 0,
+            'tiempos': deque(maxlen=ventana),
+            'consultas': deque(maxlen=ventana),
+            'tiempos_sql': deque(maxlen=ventana),
+            'consulta_mas_repetida': None,
+        })
+        datos['peticiones'] += 1
+        datos['tiempos'].append(duracion)
+        if medicion is not None:
+            datos['consultas'].append(medicion.cantidad)
+            datos['tiempos_sql'].append(medicion.duracion)
+            _, peor = medicion.duplicadas()
+            anterior = datos['consulta_mas_repetida']
+            if peor and (anterior is None or peor[1] >= anterior[1]):
+                datos['consulta_mas_repetida'] = peor
+
+def percentil(valores, porcentaje):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * porcentaje / 100))]
+
+def ms(segundos):
+    return round(segundos * 1000, 2)
+
+def resumen():
+    """Estadísticas por vista de las últimas INSTRUMENTACION_VENTANA
+    peticiones, ordenadas por tiempo total consumido"""
+    with _bloqueo:
+        copia = {
+            vista: {clave: list(valor) if isinstance(valor, deque) else valor for clave, valor in datos.items()}
+            for vista, datos in _resumen.items()
+        }
+
+    vistas = []
+    for vista, datos in copia.items():
+        tiempos, consultas, tiempos_sql = datos['tiempos'], datos['consultas'], datos['tiempos_sql']
+        repetida = datos['consulta_mas_repetida']
+        vistas.append({
+            'vista': vista,
+            'peticiones': datos['peticiones'],
+            'muestras_sql': len(consultas),
+            'tiempo_ms': {
+                'mediana': ms(statistics.median(tiempos)),
+                'p95': ms(percentil(tiempos, 95)),
+                'maximo': ms(max(tiempos)),
+                'total': ms(sum(tiempos)),
+            },
+            'consultas': {
+                'promedio': round(statistics.mean(consultas), 1),
+                'maximo': max(consultas),
+                'tiempo_ms_promedio': ms(statistics.mean(tiempos_sql)),
+            } if consultas else None,
+            'consulta_mas_repetida': {'sql': repetida[0], 'veces': repetida[1]} if repetida else None,
+        })
+    vistas.sort(key=lambda datos: datos['tiempo_ms']['total'], reverse=True)
+    return {'muestreo': settings.INSTRUMENTACION_MUESTREO, 'vistas': vistas}
+
+def reiniciar():
+    with _bloqueo:
+        _resumen.clear()
+
+
+class InstrumentacionMiddleware:
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTACION_ACTIVA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        muestreada = random.random() < settings.INSTRUMENTACION_MUESTREO
+        inicio = time.perf_counter()
+        if muestreada:
+            with MedicionConsultas() as medicion:
+                response = self.get_response(request)
+        else:
+            medicion = None
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        vista = request.resolver_match.view_name if request.resolver_match else 'sin_ruta'
+        registrar(vista, duracion, medicion)
+
+        metricas = [f'app;dur={ms(duracion)}']
+        if medicion is not None:
+            repetidas, peor = medicion.duplicadas()
+            metricas.append(f'sql;dur={ms(medicion.duracion)};desc="{medicion.cantidad} consultas"')
+            if repetidas:
+                metricas.append(f'sql-repetidas;desc="{repetidas}"')
+            if peor and peor[1] >= settings.INSTRUMENTACION_UMBRAL_REPETIDAS:
+                logger.warning(
+                    'Consulta repetida %s veces en %s (posible N+1): %s', peor[1], vista, peor[0]
+                )
+        if exponer_server_timing(request):
+            response['Server-Timing'] = ', '.join(metricas)
+        return response
+
+def exponer_server_timing(request):
+    """Server-Timing revela cuántas consultas hace cada vista y cuánto
+    tardan: solo se envía al personal administrativo, con DEBUG o si
+    INSTRUMENTACION_SERVER_TIMING_PUBLICO lo permite a todos"""
+    if settings.DEBUG or settings.INSTRUMENTACION_SERVER_TIMING_PUBLICO:
+        return True
+    usuario = getattr(request, 'user', None)
+    return bool(usuario and usuario.is_staff)
@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from curricular.models import RediseñoCurricular
+
+class Command(BaseCommand):
+    help = 'Abre los rediseños de una gestión: uno por carrera activa, con un seguimiento por fase'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--año', type=int, default=timezone.now().year)
+        parser.add_argument('--usuario', help='Nombre de usuario que figura como creador')
+
+    def handle(self, *args, **options):
+        creado_por = None
+        if options['usuario']:
+            try:
+                creado_por = get_user_model().objects.get(username=options['usuario'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        inicio = time.perf_counter()
+        with transaction.atomic():
+            rediseños, seguimientos = RediseñoCurricular.objects.abrir_año(options['año'], creado_por)
+
+        self.stdout.write(f'  rediseños creados: {rediseños}')
+        self.stdout.write(f'  seguimientos creados: {seguimientos}')
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Gestión {options['año']} abierta en {time.perf_counter() - inicio:.2f} s"
+        ))
@@ -0,0 +1,166 @@
+import json
+import statistics
+import subprocess
+import tempfile
+import time
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from curricular.datos_sinteticos import poblar_datos_sinteticos
+from curricular.instrumentacion import MedicionConsultas
+from curricular.models import RediseñoCurricular
+
+class Command(BaseCommand):
+    help = (
+        'Pobla datos sintéticos a la escala indicada y mide con el cliente de pruebas '
+        'el tiempo y las consultas de cada vista; el resultado en JSON puede '
+        'compararse entre commits con --comparar'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sedes', type=int, default=8)
+        parser.add_argument('--facultades', type=int, default=13)
+        parser.add_argument('--carreras', type=int, default=3, help='Carreras por sede y facultad')
+        parser.add_argument('--años', type=int, default=3)
+        parser.add_argument('--fases', type=int, default=12)
+        parser.add_argument('--archivos', type=int, default=2, help='Archivos por seguimiento CA')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--comparar', help='Resultados JSON anteriores con los que comparar')
+        parser.add_argument(
+            '--conservar',
+            action='store_true',
+            help='Conserva los datos sintéticos en lugar de revertirlos al terminar',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticiones'] < 1:
+            raise CommandError('--repeticiones debe ser al menos 1')
+        anterior = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                anterior = json.load(archivo)
+
+        escala = {
+            clave: options[clave]
+            for clave in ('sedes', 'facultades', 'carreras', 'años', 'fases', 'archivos')
+        }
+        # Los reportes se generan en línea y sus archivos y la caché no
+        # sobreviven a la medición
+        with tempfile.TemporaryDirectory() as media, override_settings(
+            ALLOWED_HOSTS=['testserver'],
+            MEDIA_ROOT=media,
+            REPORTES_EJECUCION_SINCRONA=True,
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark'}},
+        ), transaction.atomic():
+            inicio = time.perf_counter()
+            creados = poblar_datos_sinteticos(**escala)
+            resumen = ', '.join(f'{total} {modelo}' for modelo, total in creados.items())
+            self.stdout.write(f'Datos sintéticos: {resumen} ({time.perf_counter() - inicio:.1f} s)')
+            self.stdout.write(f'Motor de base de datos: {connection.vendor}\n')
+
+            # Con --conservar el usuario queda de una ejecución anterior
+            usuario, _ = get_user_model().objects.update_or_create(
+                username='benchmark', defaults={'rol': 'admin', 'is_staff': True, 'is_superuser': True},
+            )
+            usuario.set_unusable_password()
+            usuario.save(update_fields=['password'])
+            cliente = Client()
+            cliente.force_login(usuario)
+            vistas = {}
+            for nombre, url in self.vistas():
+                vistas[nombre] = self.medir(cliente, url, options['repeticiones'])
+                self.mostrar(nombre, vistas[nombre], (anterior or {}).get('vistas', {}).get(nombre))
+
+            if not options['conservar']:
+                transaction.set_rollback(True)
+                self.stdout.write('Datos sintéticos revertidos.')
+
+        resultados = {
+            'fecha': timezone.now().isoformat(),
+            'commit': self.commit_actual(),
+            'motor': connection.vendor,
+            'escala': escala,
+            'datos': creados,
+            'repeticiones': options['repeticiones'],
+            'vistas': vistas,
+        }
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'✅ Resultados guardados en {options["salida"]}'))
+
+    def vistas(self):
+        rediseño = RediseñoCurricular.objects.order_by('pk').last()
+        urls = [
+            ('dashboard', reverse('curricular:dashboard')),
+            ('lista_carreras', reverse('curricular:lista_carreras')),
+            ('lista_carreras (búsqueda)', reverse('curricular:lista_carreras') + '?buscar=sintetica'),
+            ('detalle_rediseño', reverse('curricular:detalle_rediseño', args=[rediseño.pk])),
+            ('generar_reporte_pdf', reverse('curricular:generar_reporte_pdf')),
+        ]
+        for modelo in admin.site._registry:
+            if modelo._meta.app_label == 'curricular':
+                urls.append((
+                    f'admin {modelo._meta.model_name}',
+                    reverse(f'admin:curricular_{modelo._meta.model_name}_changelist'),
+                ))
+        return urls
+
+    def medir(self, cliente, url, repeticiones):
+        """La primera petición (caché fría) se informa aparte de las demás"""
+        tiempos, tiempos_sql = [], []
+        for _ in range(repeticiones + 1):
+            with MedicionConsultas() as medicion:
+                inicio = time.perf_counter()
+                response = cliente.get(url, secure=True)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            tiempos_sql.append(medicion.duracion * 1000)
+
+        repetidas, _ = medicion.duplicadas()
+        medidos = tiempos[1:]
+        return {
+            'url': url,
+            'status': response.status_code,
+            'consultas': medicion.cantidad,
+            'consultas_repetidas': repetidas,
+            'tiempo_ms': {
+                'primera': round(tiempos[0], 2),
+                'mediana': round(statistics.median(medidos), 2),
+                'minimo': round(min(medidos), 2),
+                'maximo': round(max(medidos), 2),
+            },
+            'sql_ms_mediana': round(statistics.median(tiempos_sql[1:]), 2),
+        }
+
+    def mostrar(self, nombre, datos, anterior):
+        estilo = self.style.MIGRATE_HEADING if datos['status'] < 400 else self.style.ERROR
+        self.stdout.write(estilo(f'[{nombre}] {datos["url"]} ({datos["status"]})'))
+        tiempo = datos['tiempo_ms']
+        linea = (
+            f'  mediana {tiempo["mediana"]:.2f} ms (primera {tiempo["primera"]:.2f} ms), '
+            f'{datos["consultas"]} consultas ({datos["consultas_repetidas"]} repetidas), '
+            f'SQL {datos["sql_ms_mediana"]:.2f} ms'
+        )
+        if anterior:
+            cambio = (tiempo['mediana'] - anterior['tiempo_ms']['mediana']) / max(anterior['tiempo_ms']['mediana'], 0.01)
+            linea += (
+                f' | antes {anterior["tiempo_ms"]["mediana"]:.2f} ms ({cambio:+.0%}), '
+                f'{anterior["consultas"]} consultas ({datos["consultas"] - anterior["consultas"]:+d})'
+            )
+        self.stdout.write(linea)
+
+    def commit_actual(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ''
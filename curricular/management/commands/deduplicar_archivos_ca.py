@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from curricular.almacenamiento import PREFIJO_CONTENIDO
+from curricular.models import ArchivoComisionAcademica
+
+class Command(BaseCommand):
+    help = (
+        'Mueve los archivos de Comisión Académica subidos antes del almacenamiento '
+        'por contenido a su ubicación SHA-256, eliminando las copias duplicadas'
+    )
+
+    def handle(self, *args, **options):
+        almacenamiento = ArchivoComisionAcademica._meta.get_field('archivo').storage
+        anteriores = ArchivoComisionAcademica.objects.exclude(
+            archivo__startswith=PREFIJO_CONTENIDO + '/'
+        ).order_by('archivo').values_list('pk', 'archivo')
+
+        migrados, faltantes, eliminados = 0, [], 0
+        contenidos = set()
+        for pk, nombre in list(anteriores):
+            if not almacenamiento.exists(nombre):
+                faltantes.append(nombre)
+                continue
+
+            with almacenamiento.open(nombre) as contenido:
+                nuevo = almacenamiento.save(nombre, contenido)
+            ArchivoComisionAcademica.objects.filter(pk=pk).update(archivo=nuevo)
+            almacenamiento.liberar_reserva(nuevo)
+            contenidos.add(nuevo)
+            migrados += 1
+
+            if not ArchivoComisionAcademica.objects.filter(archivo=nombre).exists():
+                almacenamiento.delete(nombre)
+                eliminados += 1
+
+        for nombre in faltantes:
+            self.stdout.write(self.style.WARNING(f'  ⚠️ No existe en el almacenamiento: {nombre}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {migrados} archivos migrados a {len(contenidos)} contenidos únicos; '
+            f'{eliminados} archivos anteriores eliminados.'
+        ))
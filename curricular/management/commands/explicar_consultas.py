@@ -0,0 +1,129 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Case, Count, When
+from curricular.busqueda import obtener_motor, terminos
+from curricular.datos_sinteticos import poblar_datos_sinteticos
+from curricular.models import (
+    Sede, Facultad, Carrera, RediseñoCurricular, ArchivoComisionAcademica
+)
+
+class ConsultaSQL:
+    """SQL propio de un motor de búsqueda, con la misma interfaz que usa el
+    comando de los querysets"""
+
+    def __init__(self, sql, parametros):
+        self.sql = sql
+        self.parametros = parametros
+
+    def all(self):
+        with connection.cursor() as cursor:
+            cursor.execute(self.sql, self.parametros)
+            return cursor.fetchall()
+
+    def explain(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {self.sql}', self.parametros)
+            return '\n'.join(' '.join(str(columna) for columna in fila) for fila in cursor.fetchall())
+
+class Command(BaseCommand):
+    help = (
+        'Pobla un conjunto de datos sintéticos y muestra el plan de ejecución (EXPLAIN) '
+        'y el tiempo de las consultas de cada vista'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sedes', type=int, default=8)
+        parser.add_argument('--facultades', type=int, default=13)
+        parser.add_argument('--carreras', type=int, default=10, help='Carreras por sede y facultad')
+        parser.add_argument('--años', type=int, default=5)
+        parser.add_argument('--archivos', type=int, default=2, help='Archivos por seguimiento CA')
+        parser.add_argument('--repeticiones', type=int, default=5)
+        parser.add_argument(
+            '--conservar',
+            action='store_true',
+            help='Conserva los datos sintéticos en lugar de revertirlos al terminar',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            inicio = time.perf_counter()
+            creados = poblar_datos_sinteticos(
+                sedes=options['sedes'],
+                facultades=options['facultades'],
+                carreras=options['carreras'],
+                años=options['años'],
+                archivos=options['archivos'],
+            )
+            resumen = ', '.join(f'{total} {modelo}' for modelo, total in creados.items())
+            self.stdout.write(f'Datos sintéticos: {resumen} ({time.perf_counter() - inicio:.1f} s)')
+            self.stdout.write(f'Motor de base de datos: {connection.vendor}\n')
+
+            for vista, descripcion, queryset in self.consultas_por_vista():
+                tiempos = []
+                for _ in range(options['repeticiones']):
+                    inicio = time.perf_counter()
+                    list(queryset.all())
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f'[{vista}] {descripcion}'))
+                self.stdout.write(
+                    f'  mediana {statistics.median(tiempos):.2f} ms, mínimo {min(tiempos):.2f} ms'
+                )
+                for linea in queryset.explain().splitlines():
+                    self.stdout.write(f'  {linea}')
+                self.stdout.write('')
+
+            if not options['conservar']:
+                transaction.set_rollback(True)
+                self.stdout.write('Datos sintéticos revertidos.')
+
+    def consultas_por_vista(self):
+        """Consultas equivalentes a las que ejecuta cada vista"""
+        sede = Sede.objects.order_by('pk').last()
+        facultad = Facultad.objects.order_by('pk').last()
+        rediseño = RediseñoCurricular.objects.order_by('pk').last()
+        carreras = Carrera.objects.select_related('facultad', 'sede').filter(activo=True)
+        en_proceso = RediseñoCurricular.objects.filter(estado='en_proceso')
+        
+        # Búsqueda de texto completo: la consulta del motor y luego las carreras por relevancia
+        motor = obtener_motor()
+        palabras = terminos('sintetica')
+        indice = motor.consulta(palabras, 200)
+        if isinstance(indice, tuple):
+            indice = ConsultaSQL(*indice)
+        carrera_ids = motor.buscar(palabras, 200)
+        encontradas = carreras.filter(pk__in=carrera_ids)
+        if carrera_ids:
+            encontradas = encontradas.order_by(
+                Case(*[When(pk=pk, then=posicion) for posicion, pk in enumerate(carrera_ids)])
+            )
+
+        return [
+            ('dashboard', 'COUNT de carreras activas', Carrera.objects.filter(activo=True).order_by().values('pk')),
+            ('dashboard', 'COUNT de rediseños en proceso', en_proceso.order_by().values('pk')),
+            ('dashboard', 'Rediseños por sede', en_proceso.values('carrera__sede__nombre').annotate(
+                total=Count('id')
+            ).order_by('-total')),
+            ('dashboard', 'Últimos rediseños actualizados', RediseñoCurricular.objects.with_progreso().select_related(
+                'carrera', 'carrera__sede', 'carrera__facultad'
+            ).order_by('-actualizado_el')[:10]),
+            ('lista_carreras', 'Primera página', carreras[:20]),
+            ('lista_carreras', 'Filtro por sede', carreras.filter(sede=sede)[:20]),
+            ('lista_carreras', 'Filtro por facultad', carreras.filter(facultad=facultad)[:20]),
+            ('lista_carreras', f'Búsqueda en el índice ({type(motor).__name__})', indice),
+            ('lista_carreras', 'Búsqueda: carreras encontradas', encontradas[:20]),
+            ('detalle_rediseño', 'Seguimientos', rediseño.seguimientos.select_related('fase').order_by('fase__orden')),
+            ('detalle_rediseño', 'Archivos CA (prefetch)', ArchivoComisionAcademica.objects.select_related(
+                'subido_por'
+            ).filter(seguimiento__rediseño=rediseño)),
+            ('generar_reporte_pdf', 'Rediseños en proceso con progreso', en_proceso.with_progreso().order_by(
+                'carrera__sede__nombre', 'carrera__nombre'
+            ).values_list('carrera__sede__nombre', 'carrera__nombre', 'carrera__facultad__nombre', 'progreso')),
+            ('admin', 'Changelist de rediseños', RediseñoCurricular.objects.with_progreso().select_related(
+                'carrera', 'carrera__sede'
+            ).order_by('-año', 'carrera', '-pk')[:100]),
+            ('admin', 'Changelist de archivos CA', ArchivoComisionAcademica.objects.order_by('-subido_el')[:100]),
+        ]
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from curricular.exportaciones import FORMATOS_SEGUIMIENTOS, exportar_seguimientos, filtrar_seguimientos
+from curricular.forms import FiltroSeguimientosForm
+
+class Command(BaseCommand):
+    help = 'Exporta los seguimientos de fases en CSV o NDJSON para análisis'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=sorted(FORMATOS_SEGUIMIENTOS), default='csv')
+        parser.add_argument('--salida', help='Archivo de destino (por defecto, la salida estándar)')
+        parser.add_argument('--lote', type=int, default=2000, help='Filas leídas por lote')
+        for campo, definicion in FiltroSeguimientosForm.base_fields.items():
+            parser.add_argument(f'--{campo}', help=definicion.help_text or None)
+
+    def handle(self, *args, **options):
+        form = FiltroSeguimientosForm({campo: options[campo] for campo in FiltroSeguimientosForm.base_fields})
+        if not form.is_valid():
+            errores = '; '.join(f'{campo}: {" ".join(mensajes)}' for campo, mensajes in form.errors.items())
+            raise CommandError(f'Filtros inválidos: {errores}')
+
+        inicio = time.perf_counter()
+        bloques = exportar_seguimientos(filtrar_seguimientos(form.cleaned_data), options['formato'], options['lote'])
+        if not options['salida']:
+            for bloque in bloques:
+                self.stdout.write(bloque, ending='')
+            return
+
+        with open(options['salida'], 'w', encoding='utf-8', newline='') as destino:
+            for bloque in bloques:
+                destino.write(bloque)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seguimientos exportados a {options['salida']} en {time.perf_counter() - inicio:.2f} s"
+        ))
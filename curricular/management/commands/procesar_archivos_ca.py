@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from curricular.models import ArchivoComisionAcademica
+from curricular.procesamiento import procesar_archivo
+
+class Command(BaseCommand):
+    help = (
+        'Procesa los archivos de Comisión Académica pendientes o fallidos: tipo MIME '
+        'real, texto para la búsqueda, páginas y miniatura'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help='Vuelve a procesar también los ya completados')
+
+    def handle(self, *args, **options):
+        archivos = ArchivoComisionAcademica.objects.all()
+        if not options['todos']:
+            archivos = archivos.exclude(estado_procesamiento='completado')
+
+        ids = list(archivos.order_by('pk').values_list('pk', flat=True))
+        for pk in ids:
+            procesar_archivo(pk)
+
+        fallidos = ArchivoComisionAcademica.objects.filter(pk__in=ids, estado_procesamiento='fallido')
+        for nombre, error in fallidos.values_list('nombre_original', 'error_procesamiento'):
+            self.stdout.write(self.style.WARNING(f'  ⚠️ {nombre}: {error}'))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(ids) - fallidos.count()} de {len(ids)} archivos procesados.'
+        ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from curricular.models import RediseñoCurricular
+
+class Command(BaseCommand):
+    help = 'Reconstruye y verifica los contadores de fases de cada rediseño curricular'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-verificar',
+            action='store_true',
+            help='Solo reporta los contadores inconsistentes, sin corregirlos',
+        )
+
+    def handle(self, *args, **options):
+        inconsistentes = self.buscar_inconsistencias()
+        
+        for rediseño in inconsistentes:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {rediseño}: guardado {rediseño.fases_completadas}/{rediseño.fases_totales}, '
+                f'real {rediseño.completadas_real}/{rediseño.totales_real}'
+            ))
+        
+        if options['solo_verificar']:
+            if inconsistentes:
+                raise CommandError(f'{len(inconsistentes)} rediseños con contadores inconsistentes.')
+            self.stdout.write(self.style.SUCCESS('✅ Todos los contadores son consistentes.'))
+            return
+        
+        actualizados = RediseñoCurricular.objects.recalcular_progreso()
+        self.stdout.write(f'Contadores recalculados para {actualizados} rediseños.')
+        
+        if self.buscar_inconsistencias():
+            raise CommandError('Los contadores siguen inconsistentes tras recalcularlos.')
+        self.stdout.write(self.style.SUCCESS('✅ Contadores de progreso verificados.'))
+    
+    def buscar_inconsistencias(self):
+        rediseños = RediseñoCurricular.objects.select_related('carrera__sede').annotate(
+            completadas_real=Count('seguimientos', filter=Q(seguimientos__completado=True)),
+            totales_real=Count('seguimientos'),
+        )
+        return [
+            rediseño for rediseño in rediseños
+            if (rediseño.fases_completadas, rediseño.fases_totales)
+            != (rediseño.completadas_real, rediseño.totales_real)
+        ]
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from curricular.busqueda import reindexar_todo
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de texto completo'
+
+    def handle(self, *args, **kwargs):
+        with transaction.atomic():
+            total = reindexar_todo()
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} documentos indexados.'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:59
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recalcular_contadores(apps, schema_editor):
+    RediseñoCurricular = apps.get_model('curricular', 'RediseñoCurricular')
+    SeguimientoFase = apps.get_model('curricular', 'SeguimientoFase')
+
+    def contar(**filtros):
+        subconsulta = SeguimientoFase.objects.filter(
+            rediseño=OuterRef('pk'), **filtros
+        ).order_by().values('rediseño').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(subconsulta), 0)
+
+    RediseñoCurricular.objects.update(
+        fases_completadas=contar(completado=True),
+        fases_totales=contar(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rediseñocurricular',
+            name='fases_completadas',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='rediseñocurricular',
+            name='fases_totales',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recalcular_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0002_contadores_progreso'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TareaReporte',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=50)),
+                ('version', models.CharField(blank=True, help_text='Sello de los datos usados para generar el reporte', max_length=100)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En Proceso'), ('completada', 'Completada'), ('fallida', 'Fallida')], default='pendiente', max_length=20)),
+                ('progreso', models.PositiveSmallIntegerField(default=0)),
+                ('archivo', models.FileField(blank=True, upload_to='reportes/%Y/%m/')),
+                ('nombre_archivo', models.CharField(max_length=255)),
+                ('tipo_mime', models.CharField(max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('creado_el', models.DateTimeField(auto_now_add=True)),
+                ('finalizado_el', models.DateTimeField(blank=True, null=True)),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Tarea de Reporte',
+                'verbose_name_plural': 'Tareas de Reportes',
+                'ordering': ['-creado_el'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0003_tareareporte'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivocomisionacademica',
+            index=models.Index(fields=['seguimiento', '-subido_el'], name='archivo_ca_seguimiento_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivocomisionacademica',
+            index=models.Index(fields=['-subido_el'], name='archivo_ca_subido_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carrera',
+            index=models.Index(fields=['activo', 'sede', 'facultad', 'nombre'], name='carrera_activo_sede_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='carrera',
+            index=models.Index(fields=['activo', 'facultad', 'nombre'], name='carrera_activo_facultad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rediseñocurricular',
+            index=models.Index(fields=['estado', 'carrera'], name='rediseno_estado_carrera_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rediseñocurricular',
+            index=models.Index(fields=['-actualizado_el'], name='rediseno_actualizado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rediseñocurricular',
+            index=models.Index(fields=['-año', 'carrera'], name='rediseno_anio_carrera_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientofase',
+            index=models.Index(fields=['rediseño', 'completado'], name='seguimiento_completado_idx'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:07
+
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+FTS5_SQL = [
+    """CREATE VIRTUAL TABLE curricular_busqueda_fts USING fts5(
+        texto, content='curricular_indicebusqueda', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER curricular_busqueda_ai AFTER INSERT ON curricular_indicebusqueda BEGIN
+        INSERT INTO curricular_busqueda_fts(rowid, texto) VALUES (new.id, new.texto);
+    END""",
+    """CREATE TRIGGER curricular_busqueda_ad AFTER DELETE ON curricular_indicebusqueda BEGIN
+        INSERT INTO curricular_busqueda_fts(curricular_busqueda_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+    END""",
+    """CREATE TRIGGER curricular_busqueda_au AFTER UPDATE ON curricular_indicebusqueda BEGIN
+        INSERT INTO curricular_busqueda_fts(curricular_busqueda_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+        INSERT INTO curricular_busqueda_fts(rowid, texto) VALUES (new.id, new.texto);
+    END""",
+]
+
+FTS5_REVERSO_SQL = [
+    'DROP TRIGGER IF EXISTS curricular_busqueda_ai',
+    'DROP TRIGGER IF EXISTS curricular_busqueda_ad',
+    'DROP TRIGGER IF EXISTS curricular_busqueda_au',
+    'DROP TABLE IF EXISTS curricular_busqueda_fts',
+]
+
+POSTGRES_SQL = [
+    "CREATE INDEX curricular_busqueda_gin ON curricular_indicebusqueda USING GIN (to_tsvector('simple', texto))",
+]
+
+POSTGRES_REVERSO_SQL = [
+    'DROP INDEX IF EXISTS curricular_busqueda_gin',
+]
+
+
+def crear_indice_texto(apps, schema_editor):
+    sentencias = {'sqlite': FTS5_SQL, 'postgresql': POSTGRES_SQL}
+    for sql in sentencias.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def eliminar_indice_texto(apps, schema_editor):
+    sentencias = {'sqlite': FTS5_REVERSO_SQL, 'postgresql': POSTGRES_REVERSO_SQL}
+    for sql in sentencias.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def normalizar(*textos):
+    texto = unicodedata.normalize('NFKD', ' '.join(t for t in textos if t).lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def poblar_indice(apps, schema_editor):
+    Carrera = apps.get_model('curricular', 'Carrera')
+    RediseñoCurricular = apps.get_model('curricular', 'RediseñoCurricular')
+    SeguimientoFase = apps.get_model('curricular', 'SeguimientoFase')
+    IndiceBusqueda = apps.get_model('curricular', 'IndiceBusqueda')
+
+    documentos = [
+        IndiceBusqueda(tipo='carrera', objeto_id=pk, carrera_id=pk, texto=normalizar(nombre, facultad))
+        for pk, nombre, facultad in Carrera.objects.values_list('pk', 'nombre', 'facultad__nombre')
+    ]
+    documentos += [
+        IndiceBusqueda(tipo='rediseño', objeto_id=pk, carrera_id=carrera_id, texto=normalizar(observaciones))
+        for pk, carrera_id, observaciones in RediseñoCurricular.objects.exclude(
+            observaciones=''
+        ).values_list('pk', 'carrera_id', 'observaciones')
+    ]
+    documentos += [
+        IndiceBusqueda(tipo='seguimiento', objeto_id=pk, carrera_id=carrera_id, texto=normalizar(observaciones, medio))
+        for pk, carrera_id, observaciones, medio in SeguimientoFase.objects.exclude(
+            observaciones='', medio_verificacion=''
+        ).values_list('pk', 'rediseño__carrera_id', 'observaciones', 'medio_verificacion')
+    ]
+    IndiceBusqueda.objects.bulk_create(documentos, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0004_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBusqueda',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('carrera', 'Carrera'), ('rediseño', 'Rediseño Curricular'), ('seguimiento', 'Seguimiento de Fase')], max_length=20)),
+                ('objeto_id', models.PositiveBigIntegerField()),
+                ('texto', models.TextField()),
+                ('carrera', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='curricular.carrera')),
+            ],
+            options={
+                'verbose_name': 'Índice de Búsqueda',
+                'verbose_name_plural': 'Índice de Búsqueda',
+                'unique_together': {('tipo', 'objeto_id')},
+            },
+        ),
+        migrations.RunPython(crear_indice_texto, eliminar_indice_texto),
+        migrations.RunPython(poblar_indice, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:23
+
+import curricular.almacenamiento
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0005_indice_busqueda'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivocomisionacademica',
+            name='archivo',
+            field=models.FileField(storage=curricular.almacenamiento.almacenamiento_ca, upload_to='comision_academica/%Y/%m/'),
+        ),
+        migrations.AddIndex(
+            model_name='archivocomisionacademica',
+            index=models.Index(fields=['archivo'], name='archivo_ca_contenido_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:25
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0006_almacenamiento_contenido'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubidaParcial',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nombre_original', models.CharField(max_length=255)),
+                ('descripcion', models.CharField(blank=True, max_length=500)),
+                ('tamaño', models.PositiveIntegerField(help_text='Tamaño total esperado en bytes')),
+                ('recibido', models.PositiveIntegerField(default=0, help_text='Bytes recibidos hasta ahora')),
+                ('creado_el', models.DateTimeField(auto_now_add=True)),
+                ('actualizado_el', models.DateTimeField(auto_now=True)),
+                ('seguimiento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas_parciales', to='curricular.seguimientofase')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subidas_parciales', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Subida Parcial',
+                'verbose_name_plural': 'Subidas Parciales',
+            },
+        ),
+    ]
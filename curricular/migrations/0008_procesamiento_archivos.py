@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0007_subidaparcial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='error_procesamiento',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='estado_procesamiento',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En Proceso'), ('completado', 'Completado'), ('fallido', 'Fallido')], default='pendiente', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='miniatura',
+            field=models.ImageField(blank=True, upload_to='comision_academica/miniaturas/'),
+        ),
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='paginas',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='procesado_el',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivocomisionacademica',
+            name='texto_extraido',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='indicebusqueda',
+            name='tipo',
+            field=models.CharField(choices=[('carrera', 'Carrera'), ('rediseño', 'Rediseño Curricular'), ('seguimiento', 'Seguimiento de Fase'), ('archivo', 'Archivo Comisión Académica')], max_length=20),
+        ),
+    ]
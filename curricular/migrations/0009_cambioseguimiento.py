@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0008_procesamiento_archivos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CambioSeguimiento',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('seguimiento_id', models.PositiveBigIntegerField()),
+                ('rediseño_id', models.PositiveBigIntegerField()),
+                ('origen', models.CharField(choices=[('formulario', 'Formulario'), ('admin', 'Administración'), ('lote', 'Actualización en lote'), ('sistema', 'Sistema')], max_length=20)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('antes', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('despues', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Cambio de Seguimiento',
+                'verbose_name_plural': 'Cambios de Seguimientos',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['rediseño_id', 'id'], name='cambio_rediseno_idx')],
+            },
+        ),
+    ]
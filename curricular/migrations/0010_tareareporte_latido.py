@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0009_cambioseguimiento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tareareporte',
+            name='latido',
+            field=models.DateTimeField(blank=True, help_text='Última señal de vida del trabajo en ejecución', null=True),
+        ),
+    ]
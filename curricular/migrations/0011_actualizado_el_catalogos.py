@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('curricular', '0010_tareareporte_latido'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carrera',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='facultad',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='sede',
+            name='actualizado_el',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
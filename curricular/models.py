@@ -1,13 +1,28 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, NullIf
+from django.dispatch import Signal
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+from django.utils.http import quote_etag
+
+from .almacenamiento import almacenamiento_ca, digest_de
 
 User = get_user_model()
 
+# Se envía tras update()/bulk_create() de seguimientos, que no disparan
+# post_save; argumentos: rediseño_ids y, si update() cambió `completado`,
+# seguimiento_ids
+seguimientos_actualizados_en_lote = Signal()
+
 class Sede(models.Model):
     nombre = models.CharField(max_length=100, unique=True)
     direccion = models.TextField(blank=True)
     telefono = models.CharField(max_length=20, blank=True)
+    actualizado_el = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Sede"
@@ -20,6 +35,7 @@ class Sede(models.Model):
 class Facultad(models.Model):
     nombre = models.CharField(max_length=200, unique=True)
     descripcion = models.TextField(blank=True)
+    actualizado_el = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Facultad"
@@ -41,12 +57,17 @@ class Carrera(models.Model):
     nombre = models.CharField(max_length=200)
     grado_academico = models.CharField(max_length=20, choices=GRADO_CHOICES, default='licenciatura')
     activo = models.BooleanField(default=True)
+    actualizado_el = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Carrera"
         verbose_name_plural = "Carreras"
         ordering = ['sede', 'facultad', 'nombre']
         unique_together = ['facultad', 'sede', 'nombre']
+        indexes = [
+            models.Index(fields=['activo', 'sede', 'facultad', 'nombre'], name='carrera_activo_sede_idx'),
+            models.Index(fields=['activo', 'facultad', 'nombre'], name='carrera_activo_facultad_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nombre} - {self.sede.nombre}"
@@ -66,6 +87,69 @@ class Fase(models.Model):
     def __str__(self):
         return f"{self.numero}. {self.nombre} ({self.codigo})"
 
+def contar_seguimientos(**filtros):
+    """Subconsulta correlacionada con la cantidad de seguimientos del rediseño"""
+    subconsulta = SeguimientoFase.objects.filter(
+        rediseño=OuterRef('pk'), **filtros
+    ).order_by().values('rediseño').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(subconsulta), 0)
+
+class RediseñoCurricularQuerySet(models.QuerySet):
+    def with_progreso(self):
+        """Anota el porcentaje de progreso a partir de los contadores
+        fases_completadas/fases_totales, sin subconsultas por fila. Los
+        mantienen las señales y las operaciones en lote de SeguimientoFase
+        (ver recalcular_progreso)."""
+        return self.annotate(
+            progreso=Coalesce(
+                F('fases_completadas') * 100 / NullIf(F('fases_totales'), 0),
+                0,
+                output_field=models.IntegerField(),
+            ),
+        )
+    
+    def recalcular_progreso(self):
+        """Recalcula los contadores de fases en una sola sentencia UPDATE"""
+        return self.update(
+            fases_completadas=contar_seguimientos(completado=True),
+            fases_totales=contar_seguimientos(),
+        )
+    
+    def crear_seguimientos(self):
+        """Crea en lote los seguimientos faltantes, uno por cada fase, de los
+        rediseños del queryset. Retorna los seguimientos creados."""
+        fase_ids = list(Fase.objects.order_by().values_list('pk', flat=True))
+        rediseño_ids = list(self.order_by().values_list('pk', flat=True))
+        existentes = set(
+            SeguimientoFase.objects.filter(rediseño__in=rediseño_ids).values_list('rediseño_id', 'fase_id')
+        )
+        nuevos = [
+            SeguimientoFase(rediseño_id=rediseño_id, fase_id=fase_id)
+            for rediseño_id in rediseño_ids
+            for fase_id in fase_ids
+            if (rediseño_id, fase_id) not in existentes
+        ]
+        if not nuevos:
+            return []
+        return SeguimientoFase.objects.bulk_create(nuevos, batch_size=1000, ignore_conflicts=True)
+    
+    def abrir_año(self, año, creado_por=None):
+        """Abre el rediseño del año para cada carrera activa que aún no lo
+        tenga, con todos sus seguimientos. Retorna (rediseños, seguimientos)
+        creados."""
+        con_rediseño = self.filter(año=año).values('carrera_id')
+        carrera_ids = list(
+            Carrera.objects.filter(activo=True).exclude(pk__in=con_rediseño).values_list('pk', flat=True)
+        )
+        # bulk_create no dispara post_save: los seguimientos se crean aquí
+        self.bulk_create(
+            [self.model(carrera_id=carrera_id, año=año, creado_por=creado_por) for carrera_id in carrera_ids],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        seguimientos = self.filter(año=año).crear_seguimientos()
+        return len(carrera_ids), len(seguimientos)
+
 class RediseñoCurricular(models.Model):
     carrera = models.ForeignKey(Carrera, on_delete=models.CASCADE, related_name='rediseños')
     año = models.IntegerField(default=2025)
@@ -81,23 +165,97 @@ class RediseñoCurricular(models.Model):
         default='en_proceso'
     )
     observaciones = models.TextField(blank=True)
+    fases_completadas = models.PositiveIntegerField(default=0, editable=False)
+    fases_totales = models.PositiveIntegerField(default=0, editable=False)
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='rediseños_creados')
     creado_el = models.DateTimeField(auto_now_add=True)
     actualizado_el = models.DateTimeField(auto_now=True)
     
+    objects = RediseñoCurricularQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Rediseño Curricular"
         verbose_name_plural = "Rediseños Curriculares"
         ordering = ['-año', 'carrera']
         unique_together = ['carrera', 'año']
+        indexes = [
+            models.Index(fields=['estado', 'carrera'], name='rediseno_estado_carrera_idx'),
+            models.Index(fields=['-actualizado_el'], name='rediseno_actualizado_idx'),
+            models.Index(fields=['-año', 'carrera'], name='rediseno_anio_carrera_idx'),
+        ]
     
     def __str__(self):
         return f"Rediseño {self.año} - {self.carrera}"
     
+    def crear_seguimientos(self):
+        """Crea los seguimientos de las fases que aún no tiene"""
+        return type(self).objects.filter(pk=self.pk).crear_seguimientos()
+    
     def progreso_porcentaje(self):
-        total_fases = 10
-        fases_completadas = self.seguimientos.filter(completado=True).count()
-        return int((fases_completadas / total_fases) * 100)
+        if not self.fases_totales:
+            return 0
+        return int((self.fases_completadas / self.fases_totales) * 100)
+
+class SeguimientoFaseQuerySet(models.QuerySet):
+    """Mantiene los contadores de progreso en las operaciones en lote,
+    que no disparan las señales post_save/post_delete"""
+    
+    CAMPOS_PROGRESO = {'completado', 'rediseño', 'rediseño_id'}
+    
+    def update(self, **kwargs):
+        auditados = [
+            campo for campo in SeguimientoFase.CAMPOS_AUDITADOS
+            if campo in kwargs or campo.removesuffix('_id') in kwargs
+        ]
+        if not self.CAMPOS_PROGRESO.intersection(kwargs) and not auditados:
+            return super().update(**kwargs)
+        
+        antes = {fila['pk']: fila for fila in self.order_by().values('pk', 'rediseño_id', *auditados)}
+        filas = super().update(**kwargs)
+        rediseño_ids = {fila['rediseño_id'] for fila in antes.values()}
+        if 'rediseño' in kwargs or 'rediseño_id' in kwargs:
+            rediseño_ids.update(
+                self.model.objects.filter(pk__in=antes).values_list('rediseño_id', flat=True)
+            )
+        if auditados:
+            con_usuario = 'actualizado_por' in kwargs or 'actualizado_por_id' in kwargs
+            CambioSeguimiento.registrar_lote(antes, auditados, con_usuario)
+        RediseñoCurricular.objects.filter(pk__in=rediseño_ids).recalcular_progreso()
+        seguimientos_actualizados_en_lote.send(
+            sender=self.model,
+            rediseño_ids=rediseño_ids,
+            seguimiento_ids=set(antes) if 'completado' in kwargs else set(),
+            campos=set(kwargs),
+            actualizados=set(antes),
+        )
+        return filas
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_update delega en update(), por lo que solo falta cubrir bulk_create
+        objs = super().bulk_create(objs, *args, **kwargs)
+        rediseño_ids = {obj.rediseño_id for obj in objs}
+        RediseñoCurricular.objects.filter(pk__in=rediseño_ids).recalcular_progreso()
+        seguimientos_actualizados_en_lote.send(sender=self.model, rediseño_ids=rediseño_ids)
+        return objs
+    
+    def actualizar_en_lote(self, cambios, usuario):
+        """Aplica `cambios` ({rediseño_id: {campo: valor}}) a los seguimientos
+        del queryset con un solo bulk_update, registrando quién los actualizó.
+        Retorna los seguimientos modificados."""
+        seguimientos = list(self.filter(rediseño_id__in=cambios))
+        campos = {'actualizado_por', 'actualizado_el'}
+        ahora = timezone.now()
+        for seguimiento in seguimientos:
+            for campo, valor in cambios[seguimiento.rediseño_id].items():
+                setattr(seguimiento, campo, valor)
+                campos.add(campo)
+            seguimiento.actualizado_por = usuario
+            # bulk_update no aplica auto_now
+            seguimiento.actualizado_el = ahora
+        
+        with transaction.atomic():
+            self.bulk_update(seguimientos, sorted(campos))
+        return seguimientos
 
 class SeguimientoFase(models.Model):
     rediseño = models.ForeignKey(RediseñoCurricular, on_delete=models.CASCADE, related_name='seguimientos')
@@ -111,14 +269,108 @@ class SeguimientoFase(models.Model):
     actualizado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='seguimientos_actualizados')
     actualizado_el = models.DateTimeField(auto_now=True)
     
+    objects = SeguimientoFaseQuerySet.as_manager()
+    
+    # Campos cuyos cambios se registran en CambioSeguimiento
+    CAMPOS_AUDITADOS = (
+        'completado', 'fecha_inicio', 'fecha_conclusion',
+        'medio_verificacion', 'observaciones', 'responsable_id',
+    )
+    
     class Meta:
         verbose_name = "Seguimiento de Fase"
         verbose_name_plural = "Seguimientos de Fases"
         ordering = ['rediseño', 'fase__orden']
         unique_together = ['rediseño', 'fase']
+        indexes = [
+            models.Index(fields=['rediseño', 'completado'], name='seguimiento_completado_idx'),
+        ]
     
     def __str__(self):
         return f"{self.rediseño} - {self.fase.nombre}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Valores leídos de la base, para registrar los cambios al guardar sin otra consulta
+        instancia = super().from_db(db, field_names, values)
+        instancia._valores_cargados = {
+            campo: valor for campo, valor in zip(field_names, values)
+            if campo in cls.CAMPOS_AUDITADOS and valor is not models.DEFERRED
+        }
+        return instancia
+    
+    def cambios_pendientes(self):
+        """(antes, después) de los campos auditados que difieren de los leídos"""
+        cargados = getattr(self, '_valores_cargados', {})
+        antes = {campo: valor for campo, valor in cargados.items() if getattr(self, campo) != valor}
+        return antes, {campo: getattr(self, campo) for campo in antes}
+
+class CambioSeguimiento(models.Model):
+    """Registro de solo inserción de los cambios en los seguimientos, para
+    sincronización incremental y auditoría. Los ids se guardan sin clave
+    foránea para que el historial sobreviva a las eliminaciones."""
+    ORIGENES = [
+        ('formulario', 'Formulario'),
+        ('admin', 'Administración'),
+        ('lote', 'Actualización en lote'),
+        ('sistema', 'Sistema'),
+    ]
+    
+    id = models.BigAutoField(primary_key=True)
+    seguimiento_id = models.PositiveBigIntegerField()
+    rediseño_id = models.PositiveBigIntegerField()
+    origen = models.CharField(max_length=20, choices=ORIGENES)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    fecha = models.DateTimeField(auto_now_add=True)
+    antes = models.JSONField(encoder=DjangoJSONEncoder)
+    despues = models.JSONField(encoder=DjangoJSONEncoder)
+    
+    class Meta:
+        verbose_name = "Cambio de Seguimiento"
+        verbose_name_plural = "Cambios de Seguimientos"
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['rediseño_id', 'id'], name='cambio_rediseno_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Seguimiento #{self.seguimiento_id} ({self.get_origen_display()}, {self.fecha:%d/%m/%Y %H:%M})"
+    
+    @classmethod
+    def registrar(cls, seguimiento, origen='sistema'):
+        """Registra los cambios pendientes de un seguimiento recién guardado;
+        el usuario es `actualizado_por` salvo en los cambios del sistema"""
+        antes, despues = seguimiento.cambios_pendientes()
+        if not antes:
+            return None
+        return cls.objects.create(
+            seguimiento_id=seguimiento.pk,
+            rediseño_id=seguimiento.rediseño_id,
+            origen=origen,
+            usuario_id=seguimiento.actualizado_por_id if origen != 'sistema' else None,
+            antes=antes,
+            despues=despues,
+        )
+    
+    @classmethod
+    def registrar_lote(cls, antes, campos, con_usuario):
+        """Compara los valores `antes` ({pk: fila de values()}) con los
+        actuales y registra un cambio por cada seguimiento modificado"""
+        despues = SeguimientoFase.objects.filter(pk__in=antes).values('pk', 'actualizado_por_id', *campos)
+        cambios = []
+        for fila in despues:
+            previa = antes[fila['pk']]
+            diferentes = [campo for campo in campos if fila[campo] != previa[campo]]
+            if diferentes:
+                cambios.append(cls(
+                    seguimiento_id=fila['pk'],
+                    rediseño_id=previa['rediseño_id'],
+                    origen='lote',
+                    usuario_id=fila['actualizado_por_id'] if con_usuario else None,
+                    antes={campo: previa[campo] for campo in diferentes},
+                    despues={campo: fila[campo] for campo in diferentes},
+                ))
+        cls.objects.bulk_create(cambios, batch_size=500)
 
 class ArchivoComisionAcademica(models.Model):
     seguimiento = models.ForeignKey(
@@ -127,7 +379,8 @@ class ArchivoComisionAcademica(models.Model):
         related_name='archivos',
         limit_choices_to={'fase__codigo': 'CA'}
     )
-    archivo = models.FileField(upload_to='comision_academica/%Y/%m/')
+    # El nombre final es el SHA-256 del contenido; upload_to queda para los archivos anteriores
+    archivo = models.FileField(upload_to='comision_academica/%Y/%m/', storage=almacenamiento_ca)
     nombre_original = models.CharField(max_length=255)
     descripcion = models.CharField(max_length=500, blank=True)
     tamaño = models.IntegerField(help_text="Tamaño en bytes")
@@ -135,14 +388,44 @@ class ArchivoComisionAcademica(models.Model):
     subido_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     subido_el = models.DateTimeField(auto_now_add=True)
     
+    # Resultados del procesamiento en segundo plano (curricular.procesamiento)
+    ESTADOS_PROCESAMIENTO = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En Proceso'),
+        ('completado', 'Completado'),
+        ('fallido', 'Fallido'),
+    ]
+    estado_procesamiento = models.CharField(max_length=20, choices=ESTADOS_PROCESAMIENTO, default='pendiente')
+    paginas = models.PositiveIntegerField(null=True, blank=True)
+    texto_extraido = models.TextField(blank=True)
+    miniatura = models.ImageField(upload_to='comision_academica/miniaturas/', blank=True)
+    error_procesamiento = models.TextField(blank=True)
+    procesado_el = models.DateTimeField(null=True, blank=True)
+    
     class Meta:
         verbose_name = "Archivo Comisión Académica"
         verbose_name_plural = "Archivos Comisión Académica"
         ordering = ['-subido_el']
+        indexes = [
+            models.Index(fields=['seguimiento', '-subido_el'], name='archivo_ca_seguimiento_idx'),
+            models.Index(fields=['-subido_el'], name='archivo_ca_subido_idx'),
+            models.Index(fields=['archivo'], name='archivo_ca_contenido_idx'),
+        ]
     
     def __str__(self):
         return f"{self.nombre_original} - {self.seguimiento.rediseño.carrera}"
     
+    @property
+    def digest(self):
+        return digest_de(self.archivo.name)
+    
+    def etag(self):
+        """ETag fuerte: el SHA-256 del contenido, o un sello para los
+        archivos anteriores al almacenamiento por contenido"""
+        if self.digest:
+            return quote_etag(self.digest)
+        return quote_etag(f'{self.pk}-{self.tamaño}-{int(self.subido_el.timestamp())}')
+    
     def tamaño_legible(self):
         """Retorna el tamaño del archivo en formato legible"""
         tamaño = self.tamaño
@@ -150,4 +433,83 @@ class ArchivoComisionAcademica(models.Model):
             if tamaño < 1024.0:
                 return f"{tamaño:.1f} {unidad}"
             tamaño /= 1024.0
-        return f"{tamaño:.1f} TB"
\ No newline at end of file
+        return f"{tamaño:.1f} TB"
+
+class SubidaParcial(models.Model):
+    """Subida por fragmentos en curso de un archivo de Comisión Académica;
+    ver curricular.subidas"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    seguimiento = models.ForeignKey(SeguimientoFase, on_delete=models.CASCADE, related_name='subidas_parciales')
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subidas_parciales')
+    nombre_original = models.CharField(max_length=255)
+    descripcion = models.CharField(max_length=500, blank=True)
+    tamaño = models.PositiveIntegerField(help_text="Tamaño total esperado en bytes")
+    recibido = models.PositiveIntegerField(default=0, help_text="Bytes recibidos hasta ahora")
+    creado_el = models.DateTimeField(auto_now_add=True)
+    actualizado_el = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Subida Parcial"
+        verbose_name_plural = "Subidas Parciales"
+    
+    def __str__(self):
+        return f"{self.nombre_original} ({self.recibido}/{self.tamaño} bytes)"
+
+class TareaReporte(models.Model):
+    """Reporte generado en segundo plano por curricular.tareas"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En Proceso'),
+        ('completada', 'Completada'),
+        ('fallida', 'Fallida'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=50)
+    version = models.CharField(max_length=100, blank=True, help_text="Sello de los datos usados para generar el reporte")
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    progreso = models.PositiveSmallIntegerField(default=0)
+    archivo = models.FileField(upload_to='reportes/%Y/%m/', blank=True)
+    nombre_archivo = models.CharField(max_length=255)
+    tipo_mime = models.CharField(max_length=100)
+    error = models.TextField(blank=True)
+    solicitado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    creado_el = models.DateTimeField(auto_now_add=True)
+    latido = models.DateTimeField(null=True, blank=True, help_text="Última señal de vida del trabajo en ejecución")
+    finalizado_el = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "Tarea de Reporte"
+        verbose_name_plural = "Tareas de Reportes"
+        ordering = ['-creado_el']
+    
+    def __str__(self):
+        return f"{self.tipo} ({self.get_estado_display()})"
+    
+    def reportar_progreso(self, progreso):
+        self.progreso = progreso
+        self.latido = timezone.now()
+        TareaReporte.objects.filter(pk=self.pk).update(progreso=progreso, latido=self.latido)
+
+class IndiceBusqueda(models.Model):
+    """Documento de texto normalizado (minúsculas, sin acentos) para la
+    búsqueda de texto completo; ver curricular.busqueda"""
+    TIPOS = [
+        ('carrera', 'Carrera'),
+        ('rediseño', 'Rediseño Curricular'),
+        ('seguimiento', 'Seguimiento de Fase'),
+        ('archivo', 'Archivo Comisión Académica'),
+    ]
+    
+    tipo = models.CharField(max_length=20, choices=TIPOS)
+    objeto_id = models.PositiveBigIntegerField()
+    carrera = models.ForeignKey(Carrera, on_delete=models.CASCADE, related_name='+')
+    texto = models.TextField()
+    
+    class Meta:
+        verbose_name = "Índice de Búsqueda"
+        verbose_name_plural = "Índice de Búsqueda"
+        unique_together = ['tipo', 'objeto_id']
+    
+    def __str__(self):
+        return f"{self.get_tipo_display()} #{self.objeto_id}"
@@ -0,0 +1,93 @@
+"""
+Paginación por cursor (keyset).
+
+En lugar de COUNT(*) + OFFSET, cada página filtra las filas posteriores a la
+última fila vista según el orden indicado, por lo que las páginas profundas
+cuestan lo mismo que la primera.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class PaginaCursor:
+    def __init__(self, object_list, siguiente):
+        self.object_list = object_list
+        self.siguiente = siguiente
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.siguiente is not None
+
+
+class PaginadorCursor:
+    """Pagina `queryset` por los campos de `orden`, todos ascendentes.
+
+    El último campo debe identificar la fila de forma única (normalmente 'pk').
+    Las filas pueden ser instancias de modelo o diccionarios de values().
+    """
+
+    def __init__(self, queryset, orden, por_pagina):
+        self.queryset = queryset.order_by(*orden)
+        self.orden = list(orden)
+        self.por_pagina = por_pagina
+
+    def get_page(self, cursor=None):
+        """Retorna la página que sigue a `cursor`; un cursor vacío o inválido
+        retorna la primera página"""
+        queryset = self.queryset
+        valores = self.decodificar(cursor)
+        if valores is not None:
+            try:
+                queryset = queryset.filter(self.posteriores_a(valores))
+            except (TypeError, ValueError, ValidationError):
+                # Valores que no corresponden al tipo de su campo
+                queryset = self.queryset
+
+        filas = list(queryset[:self.por_pagina + 1])
+        siguiente = None
+        if len(filas) > self.por_pagina:
+            filas = filas[:self.por_pagina]
+            siguiente = self.codificar(filas[-1])
+        return PaginaCursor(filas, siguiente)
+
+    def posteriores_a(self, valores):
+        """(a, b, c) > (x, y, z) expresado como OR de prefijos iguales"""
+        condicion = Q()
+        for i, campo in enumerate(self.orden):
+            iguales = dict(zip(self.orden[:i], valores[:i]))
+            condicion |= Q(**iguales, **{f'{campo}__gt': valores[i]})
+        return condicion
+
+    def codificar(self, fila):
+        valores = [self.valor(fila, campo) for campo in self.orden]
+        return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+    def decodificar(self, cursor):
+        if not cursor:
+            return None
+        try:
+            valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (binascii.Error, UnicodeError, ValueError):
+            return None
+        if not isinstance(valores, list) or len(valores) != len(self.orden):
+            return None
+        if not all(isinstance(valor, (str, int, float)) for valor in valores):
+            return None
+        return valores
+
+    @staticmethod
+    def valor(fila, campo):
+        if isinstance(fila, dict):
+            return fila[campo]
+        for atributo in campo.split('__'):
+            fila = getattr(fila, atributo)
+        return fila
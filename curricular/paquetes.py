@@ -0,0 +1,106 @@
+"""
+Descarga en un solo ZIP de los archivos de Comisión Académica de un
+rediseño, una sede o un año.
+
+El ZIP se arma mientras se envía la respuesta: zipfile escribe sobre un
+destino no posicionable (con descriptores de datos tras cada archivo) y cada
+bloque producido se entrega de inmediato, sin archivo temporal y con memoria
+acotada al tamaño de bloque. Los formatos que ya vienen comprimidos se
+guardan sin volver a comprimir.
+"""
+import logging
+import posixpath
+import zipfile
+
+from django.utils import timezone
+
+from .models import ArchivoComisionAcademica
+
+logger = logging.getLogger(__name__)
+
+TAMAÑO_BLOQUE = 64 * 1024
+
+EXTENSIONES_COMPRIMIDAS = {
+    '.zip', '.rar', '.7z', '.gz',
+    '.docx', '.xlsx', '.pptx',
+    '.jpg', '.jpeg', '.png',
+}
+
+class SalidaZip:
+    """Destino de escritura no posicionable: acumula lo que escribe zipfile
+    hasta que el generador lo retira"""
+
+    def __init__(self):
+        self.bloques = []
+
+    def write(self, datos):
+        self.bloques.append(bytes(datos))
+        return len(datos)
+
+    def flush(self):
+        pass
+
+    def retirar(self):
+        datos = b''.join(self.bloques)
+        self.bloques = []
+        return datos
+
+def compresion_para(nombre):
+    extension = posixpath.splitext(nombre.lower())[1]
+    if extension in EXTENSIONES_COMPRIMIDAS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def nombre_unico(ruta, usados):
+    """Agrega ' (2)', ' (3)'... cuando dos archivos comparten ruta en el ZIP"""
+    base, extension = posixpath.splitext(ruta)
+    candidato, numero = ruta, 1
+    while candidato in usados:
+        numero += 1
+        candidato = f'{base} ({numero}){extension}'
+    usados.add(candidato)
+    return candidato
+
+def limpiar(nombre):
+    return nombre.replace('/', '-').replace('\\', '-').strip() or 'sin_nombre'
+
+def archivos_del_paquete(filtros):
+    """(nombre almacenado, ruta en el ZIP, fecha) de los archivos que cumplen
+    `filtros`, agrupados por año, sede y carrera"""
+    filas = ArchivoComisionAcademica.objects.filter(**filtros).order_by(
+        '-seguimiento__rediseño__año', 'seguimiento__rediseño__carrera__sede__nombre',
+        'seguimiento__rediseño__carrera__nombre', 'subido_el',
+    ).values_list(
+        'archivo', 'nombre_original', 'subido_el', 'seguimiento__rediseño__año',
+        'seguimiento__rediseño__carrera__sede__nombre', 'seguimiento__rediseño__carrera__nombre',
+    ).iterator()
+
+    usados = set()
+    for archivo, nombre, subido_el, año, sede, carrera in filas:
+        ruta = posixpath.join(str(año), limpiar(sede), limpiar(carrera), limpiar(nombre))
+        yield archivo, nombre_unico(ruta, usados), subido_el
+
+def generar_zip(filtros):
+    """Genera el ZIP por bloques para StreamingHttpResponse"""
+    almacenamiento = ArchivoComisionAcademica._meta.get_field('archivo').storage
+    salida = SalidaZip()
+
+    with zipfile.ZipFile(salida, 'w') as paquete:
+        for archivo, ruta, subido_el in archivos_del_paquete(filtros):
+            try:
+                contenido = almacenamiento.open(archivo, 'rb')
+            except FileNotFoundError:
+                logger.warning('Archivo de Comisión Académica no encontrado: %s', archivo)
+                continue
+
+            info = zipfile.ZipInfo(ruta, timezone.localtime(subido_el).timetuple()[:6])
+            info.compress_type = compresion_para(ruta)
+            with contenido, paquete.open(info, 'w') as destino:
+                while bloque := contenido.read(TAMAÑO_BLOQUE):
+                    destino.write(bloque)
+                    if salida.bloques:
+                        yield salida.retirar()
+            yield salida.retirar()
+
+    # Directorio central
+    yield salida.retirar()
@@ -0,0 +1,276 @@
+"""
+Procesamiento en segundo plano de los archivos de Comisión Académica.
+
+Después de cada subida, en el pool de procesamiento de curricular.tareas:
+
+1. Se detecta el tipo MIME real a partir del contenido, en lugar de confiar
+   en el Content-Type enviado por el navegador.
+2. Se extrae el texto de los PDF, DOCX y TXT y se agrega al índice de
+   búsqueda de la carrera.
+3. Se cuentan las páginas (PDF, y DOCX según docProps/app.xml).
+4. Se genera una miniatura con Pillow. No es una representación de la
+   primera página: se reduce una imagen que el documento ya trae, la
+   primera imagen de la página 1 de un PDF (la página escaneada en las
+   resoluciones digitalizadas) o docProps/thumbnail de los documentos de
+   Office. Los PDF vectoriales no se rasterizan y quedan sin miniatura.
+
+Los archivos con el mismo contenido reutilizan el resultado ya calculado.
+El archivo se lee por bloques hasta TAMAÑO_MAXIMO_ARCHIVO_CA y lo que se
+descomprime de él (flujos de PDF, partes de DOCX) no puede superar
+LIMITE_DESCOMPRIMIDO, además del límite de pypdf para cada flujo: una
+bomba de descompresión marca el archivo como fallido sin agotar la memoria
+del proceso.
+"""
+import logging
+import mimetypes
+import zipfile
+from io import BytesIO
+from xml.etree import ElementTree
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.utils import timezone
+from PIL import Image
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+
+from . import busqueda
+from .forms import TAMAÑO_MAXIMO_ARCHIVO_CA
+from .models import ArchivoComisionAcademica
+from .tareas import en_segundo_plano
+
+logger = logging.getLogger(__name__)
+
+TAMAÑO_MINIATURA = (256, 256)
+LIMITE_TEXTO = 200_000
+LIMITE_DESCOMPRIMIDO = 100 * 1024 * 1024
+
+MIME_OFFICE = {
+    'word/': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'xl/': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'ppt/': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+}
+MIME_OLE = {'application/msword', 'application/vnd.ms-excel', 'application/vnd.ms-powerpoint'}
+
+class ContenidoExcesivo(Exception):
+    pass
+
+
+class Presupuesto:
+    """Bytes que aún pueden descomprimirse de un mismo archivo"""
+
+    def __init__(self, limite=None):
+        self.limite = LIMITE_DESCOMPRIMIDO if limite is None else limite
+        self.restante = self.limite
+
+    def consumir(self, cantidad):
+        self.restante -= cantidad
+        if self.restante < 0:
+            raise ContenidoExcesivo(f'El contenido descomprimido supera {self.limite} bytes')
+
+def encolar_procesamiento(archivo):
+    en_segundo_plano(procesar_archivo, archivo.pk, cola='procesamiento')
+
+
+# Detección del tipo
+
+def detectar_tipo_mime(cabecera, paquete, nombre):
+    """Tipo MIME según los primeros bytes del contenido; `paquete` es el
+    ZipFile abierto cuando el contenido es un ZIP"""
+    if cabecera.startswith(b'%PDF-'):
+        return 'application/pdf'
+    if paquete is not None:
+        for nombre_interno in paquete.namelist():
+            for prefijo, tipo in MIME_OFFICE.items():
+                if nombre_interno.startswith(prefijo):
+                    return tipo
+        return 'application/zip'
+    if cabecera.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        # Documentos de Office 97-2003: el contenedor OLE no distingue el programa
+        tipo, _ = mimetypes.guess_type(nombre)
+        return tipo if tipo in MIME_OLE else 'application/x-ole-storage'
+    if cabecera.startswith(b'Rar!\x1a\x07'):
+        return 'application/vnd.rar'
+    if cabecera.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if cabecera.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    try:
+        cabecera.decode('utf-8')
+    except UnicodeDecodeError as exc:
+        # Un carácter multibyte cortado al final de la cabecera no descarta UTF-8
+        if exc.start < len(cabecera) - 3:
+            return 'application/octet-stream'
+    return 'text/plain'
+
+
+# PDF
+
+def analizar_pdf(datos, presupuesto):
+    """Retorna (texto, páginas, bytes de la imagen de la primera página).
+
+    pypdf ubica los objetos por la tabla xref, o la reconstruye en una sola
+    pasada si falta, y decodifica el texto según la codificación y el
+    /ToUnicode de cada fuente. Cada flujo decodificado se descuenta del
+    presupuesto antes de seguir con el siguiente. Un PDF que pypdf no puede
+    leer queda sin texto ni páginas, como un formato no reconocido.
+    """
+    try:
+        lector = PdfReader(BytesIO(datos))
+        paginas = lector.pages
+        textos, largo = [], 0
+        for pagina in paginas:
+            if largo > LIMITE_TEXTO:
+                break
+            contenido = pagina.get_contents()
+            if contenido is not None:
+                presupuesto.consumir(len(contenido.get_data()))
+            texto = pagina.extract_text()
+            textos.append(texto)
+            largo += len(texto)
+        imagen = imagen_primera_pagina(paginas[0], presupuesto) if len(paginas) else None
+        return '\n'.join(texto.strip() for texto in textos if texto.strip()), len(paginas) or None, imagen
+    except PyPdfError:
+        return '', None, None
+
+def imagen_primera_pagina(pagina, presupuesto):
+    """Primera imagen dibujada en la página, que en los documentos
+    digitalizados es la página escaneada. Las páginas vectoriales no se
+    rasterizan y quedan sin imagen."""
+    for imagen in pagina.images:
+        presupuesto.consumir(len(imagen.data))
+        return imagen.data
+    return None
+
+
+# DOCX
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+def leer_parte(paquete, nombre, presupuesto):
+    """Lee una parte del ZIP si su tamaño declarado cabe en el presupuesto;
+    zipfile no entrega más bytes que los declarados"""
+    presupuesto.consumir(paquete.getinfo(nombre).file_size)
+    return paquete.read(nombre)
+
+def texto_docx(paquete, presupuesto):
+    raiz = ElementTree.fromstring(leer_parte(paquete, 'word/document.xml', presupuesto))
+    parrafos = []
+    for parrafo in raiz.iter(f'{W}p'):
+        texto = ''.join(nodo.text or '' for nodo in parrafo.iter(f'{W}t'))
+        if texto.strip():
+            parrafos.append(texto)
+    return '\n'.join(parrafos)
+
+def paginas_office(paquete, presupuesto):
+    try:
+        raiz = ElementTree.fromstring(leer_parte(paquete, 'docProps/app.xml', presupuesto))
+    except (KeyError, ElementTree.ParseError):
+        return None
+    for nodo in raiz:
+        if nodo.tag.endswith('}Pages') or nodo.tag.endswith('}Slides'):
+            return int(nodo.text) if (nodo.text or '').isdigit() else None
+    return None
+
+def vista_previa_office(paquete, presupuesto):
+    for nombre in paquete.namelist():
+        if nombre.lower().startswith('docprops/thumbnail.'):
+            return leer_parte(paquete, nombre, presupuesto)
+    return None
+
+
+# Pipeline
+
+def miniatura_de(imagen):
+    """JPEG de a lo sumo TAMAÑO_MINIATURA a partir de los bytes de una
+    imagen, o None si Pillow no la reconoce"""
+    try:
+        with Image.open(BytesIO(imagen)) as original:
+            original.draft('RGB', TAMAÑO_MINIATURA)
+            miniatura = original.convert('RGB')
+            miniatura.thumbnail(TAMAÑO_MINIATURA)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    salida = BytesIO()
+    miniatura.save(salida, 'JPEG', quality=80)
+    return salida.getvalue()
+
+def analizar(datos, nombre):
+    """Retorna (tipo_mime, texto, páginas, bytes de la miniatura)"""
+    paquete = None
+    if datos.startswith(b'PK\x03\x04'):
+        try:
+            paquete = zipfile.ZipFile(BytesIO(datos))
+        except zipfile.BadZipFile:
+            pass
+
+    tipo_mime = detectar_tipo_mime(datos[:8192], paquete, nombre)
+    texto, paginas, imagen = '', None, None
+    presupuesto = Presupuesto()
+    if tipo_mime == 'application/pdf':
+        texto, paginas, imagen = analizar_pdf(datos, presupuesto)
+    elif paquete is not None and tipo_mime in MIME_OFFICE.values():
+        if tipo_mime == MIME_OFFICE['word/']:
+            texto = texto_docx(paquete, presupuesto)
+        paginas = paginas_office(paquete, presupuesto)
+        imagen = vista_previa_office(paquete, presupuesto)
+    elif tipo_mime == 'text/plain':
+        texto = datos.decode('utf-8', errors='replace')
+    elif tipo_mime.startswith('image/'):
+        imagen = datos
+
+    return tipo_mime, texto[:LIMITE_TEXTO], paginas, imagen and miniatura_de(imagen)
+
+def leer_archivo(campo, limite=None):
+    """Contenido del FileField leído por bloques, sin pasar de `limite`"""
+    limite = TAMAÑO_MAXIMO_ARCHIVO_CA if limite is None else limite
+    datos = bytearray()
+    with campo.open('rb') as contenido:
+        for bloque in contenido.chunks():
+            datos += bloque
+            if len(datos) > limite:
+                raise ContenidoExcesivo(f'El archivo supera {limite} bytes')
+    return bytes(datos)
+
+def procesar_archivo(archivo_id, en_hilo=False):
+    if en_hilo:
+        close_old_connections()
+    try:
+        archivo = ArchivoComisionAcademica.objects.select_related('seguimiento__rediseño').get(pk=archivo_id)
+        archivo.estado_procesamiento = 'en_proceso'
+        archivo.save(update_fields=['estado_procesamiento'])
+
+        previo = ArchivoComisionAcademica.objects.filter(
+            archivo=archivo.archivo.name, estado_procesamiento='completado'
+        ).exclude(pk=archivo.pk).first()
+        if previo:
+            archivo.tipo_mime = previo.tipo_mime
+            archivo.texto_extraido = previo.texto_extraido
+            archivo.paginas = previo.paginas
+            archivo.miniatura = previo.miniatura.name
+        else:
+            datos = leer_archivo(archivo.archivo)
+            tipo_mime, texto, paginas, miniatura = analizar(datos, archivo.nombre_original)
+            archivo.tipo_mime = tipo_mime
+            archivo.texto_extraido = texto
+            archivo.paginas = paginas
+            if miniatura:
+                archivo.miniatura.save(f'{archivo.digest or archivo.pk}.jpg', ContentFile(miniatura), save=False)
+
+        archivo.estado_procesamiento = 'completado'
+        archivo.procesado_el = timezone.now()
+        archivo.save(update_fields=[
+            'tipo_mime', 'texto_extraido', 'paginas', 'miniatura', 'estado_procesamiento', 'procesado_el'
+        ])
+        busqueda.indexar(busqueda.documentos_archivos(ArchivoComisionAcademica.objects.filter(pk=archivo.pk)))
+    except ArchivoComisionAcademica.DoesNotExist:
+        # Eliminado antes de procesarse
+        pass
+    except Exception as exc:
+        logger.exception('Error al procesar el archivo de Comisión Académica %s', archivo_id)
+        ArchivoComisionAcademica.objects.filter(pk=archivo_id).update(
+            estado_procesamiento='fallido', error_procesamiento=str(exc), procesado_el=timezone.now()
+        )
+    finally:
+        if en_hilo:
+            close_old_connections()
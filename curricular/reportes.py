@@ -0,0 +1,169 @@
+import hashlib
+import threading
+from io import BytesIO
+from itertools import groupby
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.utils.http import quote_etag
+from reportlab.lib.pagesizes import A4
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.enums import TA_CENTER
+
+from .models import RediseñoCurricular, SeguimientoFase, Carrera
+from .tareas import tipo_reporte
+
+CLAVE_CACHE_REPORTE = 'curricular:reporte_pdf'
+
+# Evita que varias peticiones simultáneas generen el mismo PDF en un proceso
+_bloqueo_reporte = threading.Lock()
+
+def etag_reporte():
+    """ETag del reporte, derivado solo de los datos que imprime.
+    
+    Los conteos detectan altas y bajas, y la última actualización de cada
+    tabla cualquier modificación, incluidos los nombres de carreras, sedes y
+    facultades. No usa la versión de cache_datos, propia de cada proceso con
+    LocMemCache, para que todos los workers calculen el mismo ETag.
+    """
+    sello = (
+        RediseñoCurricular.objects.aggregate(
+            total=Count('pk'),
+            ultimo=Max('actualizado_el'),
+            completadas=Sum('fases_completadas'),
+        ),
+        SeguimientoFase.objects.aggregate(total=Count('pk'), ultimo=Max('actualizado_el')),
+        # Sedes y facultades se imprimen a través de sus carreras
+        Carrera.objects.aggregate(
+            total=Count('pk'),
+            activas=Count('pk', filter=Q(activo=True)),
+            ultimo=Max('actualizado_el'),
+            sede=Max('sede__actualizado_el'),
+            facultad=Max('facultad__actualizado_el'),
+        ),
+    )
+    return quote_etag(hashlib.md5(repr(sello).encode(), usedforsecurity=False).hexdigest())
+
+def reporte_pdf_en_cache(etag):
+    """Retorna el PDF en caché si corresponde a `etag`, o None"""
+    en_cache = cache.get(CLAVE_CACHE_REPORTE)
+    if en_cache and en_cache[0] == etag:
+        return en_cache[1]
+    return None
+
+def obtener_reporte_pdf(etag):
+    """Retorna el PDF correspondiente a `etag`, generándolo solo si no está en caché"""
+    pdf = reporte_pdf_en_cache(etag)
+    if pdf is not None:
+        return pdf
+    
+    with _bloqueo_reporte:
+        pdf = reporte_pdf_en_cache(etag)
+        if pdf is not None:
+            return pdf
+        
+        buffer = BytesIO()
+        construir_reporte_pdf(buffer)
+        pdf = buffer.getvalue()
+        cache.set(CLAVE_CACHE_REPORTE, (etag, pdf), None)
+        return pdf
+
+@tipo_reporte('reporte_pdf', 'reporte_rediseño_curricular.pdf', 'application/pdf')
+def tarea_reporte_pdf(tarea, destino):
+    tarea.reportar_progreso(10)
+    destino.write(obtener_reporte_pdf(tarea.version))
+
+def invalidar_reporte_pdf():
+    cache.delete(CLAVE_CACHE_REPORTE)
+
+def construir_reporte_pdf(destino):
+    """Escribe en `destino` el reporte PDF del estado de todos los rediseños.
+    
+    Los rediseños se obtienen en una sola consulta anotada y se agrupan por
+    sede en Python, sin consultas adicionales por sede ni por fila.
+    """
+    doc = SimpleDocTemplate(destino, pagesize=A4)
+    elements = []
+    
+    # Estilos
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#1a5490'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    
+    # Título
+    title = Paragraph("REPORTE DE REDISEÑO CURRICULAR 2025<br/>UATF - POTOSÍ", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # Rediseños en proceso, ordenados para agruparlos por sede
+    rediseños = list(
+        RediseñoCurricular.objects.with_progreso().filter(
+            estado='en_proceso'
+        ).order_by('carrera__sede__nombre', 'carrera__nombre').values_list(
+            'carrera__sede__nombre', 'carrera__nombre', 'carrera__facultad__nombre', 'progreso'
+        )
+    )
+    
+    # Estadísticas generales
+    total_carreras = Carrera.objects.filter(activo=True).count()
+    total_rediseños = len(rediseños)
+    
+    stats_data = [
+        ['Total de Carreras:', str(total_carreras)],
+        ['Rediseños en Proceso:', str(total_rediseños)],
+    ]
+    
+    stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0f0f0')),
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ]))
+    elements.append(stats_table)
+    elements.append(Spacer(1, 0.3*inch))
+    
+    # Tabla de rediseños por sede
+    for sede_nombre, filas in groupby(rediseños, key=lambda fila: fila[0]):
+        elements.append(Paragraph(f"<b>SEDE: {sede_nombre.upper()}</b>", styles['Heading2']))
+        elements.append(Spacer(1, 0.2*inch))
+        
+        data = [['#', 'Carrera', 'Facultad', 'Progreso']]
+        
+        for idx, (_, carrera, facultad, progreso) in enumerate(filas, 1):
+            data.append([
+                str(idx),
+                carrera,
+                facultad[:30] + '...' if len(facultad) > 30 else facultad,
+                f"{progreso}%"
+            ])
+        
+        table = Table(data, colWidths=[0.5*inch, 2.5*inch, 2.5*inch, 1*inch])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ]))
+        elements.append(table)
+        elements.append(Spacer(1, 0.3*inch))
+    
+    doc.build(elements)
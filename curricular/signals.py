@@ -0,0 +1,183 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import busqueda, eventos, procesamiento
+from .cache_datos import incrementar_version
+from .models import (
+    Sede, Facultad, Carrera, RediseñoCurricular, SeguimientoFase, ArchivoComisionAcademica,
+    CambioSeguimiento, seguimientos_actualizados_en_lote
+)
+from .reportes import invalidar_reporte_pdf
+from .tareas import al_confirmar_una_vez
+
+@receiver(post_save, sender=SeguimientoFase)
+@receiver(post_delete, sender=SeguimientoFase)
+def actualizar_progreso_rediseño(sender, instance, **kwargs):
+    """Mantiene sincronizados los contadores de fases del rediseño"""
+    RediseñoCurricular.objects.filter(pk=instance.rediseño_id).recalcular_progreso()
+
+@receiver(post_save, sender=SeguimientoFase)
+@receiver(post_delete, sender=SeguimientoFase)
+def notificar_progreso(sender, instance, created=False, raw=False, **kwargs):
+    """Publica en vivo los cambios de estado de las fases. Va antes de
+    registrar_cambio_seguimiento, que reinicia los valores leídos."""
+    if raw:
+        return
+    if kwargs['signal'] is post_delete:
+        eventos.notificar(rediseño_ids=[instance.rediseño_id])
+    elif created or 'completado' in instance.cambios_pendientes()[1]:
+        eventos.notificar(rediseño_ids=[instance.rediseño_id], seguimiento_ids=[instance.pk])
+
+@receiver(post_save, sender=SeguimientoFase)
+def indexar_seguimiento(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Reindexa el seguimiento solo si cambió su texto, leyendo la carrera
+    sin cargar el rediseño. Va antes de registrar_cambio_seguimiento, que
+    reinicia los valores leídos."""
+    campos = busqueda.CAMPOS_SEGUIMIENTO
+    if raw or (update_fields is not None and not campos.intersection(update_fields)):
+        return
+    if created:
+        if not (instance.observaciones or instance.medio_verificacion):
+            return
+    else:
+        cargados = getattr(instance, '_valores_cargados', None)
+        # Sin los valores leídos (instancia construida a mano o campos diferidos) no se puede comparar
+        comparables = cargados is not None and campos <= cargados.keys()
+        if comparables and not campos.intersection(instance.cambios_pendientes()[1]):
+            return
+    carrera_id = RediseñoCurricular.objects.filter(pk=instance.rediseño_id).values_list('carrera_id', flat=True).get()
+    busqueda.indexar([
+        busqueda.documento(
+            'seguimiento', instance.pk, carrera_id, instance.observaciones, instance.medio_verificacion,
+        )
+    ])
+
+@receiver(seguimientos_actualizados_en_lote)
+def notificar_progreso_lote(sender, rediseño_ids, seguimiento_ids=(), **kwargs):
+    eventos.notificar(rediseño_ids=rediseño_ids, seguimiento_ids=seguimiento_ids)
+
+@receiver(post_save, sender=RediseñoCurricular)
+@receiver(post_delete, sender=RediseñoCurricular)
+def notificar_estado_rediseño(sender, instance, raw=False, **kwargs):
+    """El estado del rediseño cambia los contadores del dashboard"""
+    if not raw:
+        eventos.notificar(rediseño_ids=[instance.pk])
+
+@receiver(post_save, sender=Sede)
+@receiver(post_delete, sender=Sede)
+@receiver(post_save, sender=Carrera)
+@receiver(post_delete, sender=Carrera)
+def notificar_totales(sender, raw=False, **kwargs):
+    """Las carreras activas y los nombres de sede también se muestran en
+    los contadores del dashboard"""
+    if not raw:
+        eventos.notificar()
+
+@receiver(post_save, sender=SeguimientoFase)
+def registrar_cambio_seguimiento(sender, instance, created=False, raw=False, **kwargs):
+    """Historial de cambios; las vistas y el admin indican el origen en
+    `origen_cambio`. Las operaciones en lote se registran en update()."""
+    if created or raw:
+        return
+    CambioSeguimiento.registrar(instance, getattr(instance, 'origen_cambio', 'sistema'))
+    # Un segundo save() de la misma instancia solo registra lo nuevo
+    instance._valores_cargados = {
+        campo: getattr(instance, campo) for campo in getattr(instance, '_valores_cargados', {})
+    }
+
+@receiver(post_save, sender=RediseñoCurricular)
+def crear_seguimientos_rediseño(sender, instance, created=False, raw=False, **kwargs):
+    """Todo rediseño nuevo nace con un seguimiento por cada fase"""
+    if created and not raw:
+        instance.crear_seguimientos()
+
+@receiver(post_delete, sender=ArchivoComisionAcademica)
+def eliminar_contenido_sin_referencias(sender, instance, **kwargs):
+    """El contenido puede estar compartido por varios archivos: se borra del
+    almacenamiento cuando ya ninguna fila lo referencia"""
+    nombre = instance.archivo.name
+    almacenamiento = instance.archivo.storage
+    miniatura = instance.miniatura.name
+    
+    def eliminar():
+        if nombre and not ArchivoComisionAcademica.objects.filter(archivo=nombre).exists():
+            almacenamiento.eliminar_sin_reservas(nombre)
+        if miniatura and not ArchivoComisionAcademica.objects.filter(miniatura=miniatura).exists():
+            instance.miniatura.storage.delete(miniatura)
+    
+    transaction.on_commit(eliminar)
+
+@receiver(post_save, sender=ArchivoComisionAcademica)
+def liberar_reserva_contenido(sender, instance, created=False, raw=False, **kwargs):
+    """Con la fila confirmada, el contenido ya no necesita la reserva que
+    hizo el almacenamiento al guardarlo"""
+    if created and not raw and instance.archivo.name:
+        nombre = instance.archivo.name
+        transaction.on_commit(lambda: instance.archivo.storage.liberar_reserva(nombre))
+
+@receiver(post_save, sender=ArchivoComisionAcademica)
+def procesar_archivo_subido(sender, instance, created=False, raw=False, **kwargs):
+    """Tipo real, texto, páginas y miniatura se calculan en segundo plano"""
+    if created and not raw:
+        procesamiento.encolar_procesamiento(instance)
+
+@receiver(post_save, sender=Sede)
+@receiver(post_delete, sender=Sede)
+@receiver(post_save, sender=Facultad)
+@receiver(post_delete, sender=Facultad)
+@receiver(post_save, sender=Carrera)
+@receiver(post_delete, sender=Carrera)
+@receiver(post_save, sender=RediseñoCurricular)
+@receiver(post_delete, sender=RediseñoCurricular)
+@receiver(post_save, sender=SeguimientoFase)
+@receiver(post_delete, sender=SeguimientoFase)
+@receiver(seguimientos_actualizados_en_lote)
+def invalidar_caches(sender, **kwargs):
+    """Descarta el reporte PDF y las entradas versionadas de la caché
+    cuando cambian los datos que muestran, una vez confirmada la
+    transacción: antes, una solicitud simultánea leería las filas anteriores
+    y las guardaría bajo la versión nueva"""
+    al_confirmar_una_vez(descartar_caches)
+
+def descartar_caches():
+    invalidar_reporte_pdf()
+    incrementar_version()
+
+# Índice de búsqueda de texto completo
+
+@receiver(post_save, sender=Carrera)
+def indexar_carrera(sender, instance, raw=False, **kwargs):
+    if not raw:
+        busqueda.indexar(busqueda.documentos_carreras(Carrera.objects.filter(pk=instance.pk)))
+
+@receiver(post_save, sender=Facultad)
+def indexar_carreras_facultad(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        busqueda.indexar(busqueda.documentos_carreras(instance.carreras.all()))
+
+@receiver(post_save, sender=RediseñoCurricular)
+def indexar_rediseño(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'observaciones' not in update_fields):
+        return
+    busqueda.indexar([
+        busqueda.documento('rediseño', instance.pk, instance.carrera_id, instance.observaciones)
+    ])
+
+@receiver(seguimientos_actualizados_en_lote)
+def indexar_seguimientos_lote(sender, campos=(), actualizados=(), **kwargs):
+    """update() y bulk_update() no disparan post_save"""
+    if actualizados and (busqueda.CAMPOS_SEGUIMIENTO | {'rediseño', 'rediseño_id'}).intersection(campos):
+        busqueda.indexar(busqueda.documentos_seguimientos(SeguimientoFase.objects.filter(pk__in=actualizados)))
+
+@receiver(post_delete, sender=RediseñoCurricular)
+def desindexar_rediseño(sender, instance, **kwargs):
+    busqueda.desindexar('rediseño', instance.pk)
+
+@receiver(post_delete, sender=SeguimientoFase)
+def desindexar_seguimiento(sender, instance, **kwargs):
+    busqueda.desindexar('seguimiento', instance.pk)
+
+@receiver(post_delete, sender=ArchivoComisionAcademica)
+def desindexar_archivo(sender, instance, **kwargs):
+    busqueda.desindexar('archivo', instance.pk)
@@ -0,0 +1,120 @@
+"""
+Subida reanudable por fragmentos de archivos de Comisión Académica.
+
+1. POST con nombre, tamaño y descripción: se valida el archivo y se crea una
+   SubidaParcial, sin recibir aún contenido.
+2. POST de cada fragmento como cuerpo crudo con la cabecera
+   `X-Subida-Offset`, que debe coincidir con los bytes ya recibidos; los
+   fragmentos se agregan al archivo .part en disco.
+3. GET informa los bytes recibidos, para reanudar tras un corte.
+
+Al recibir el último byte se crea el ArchivoComisionAcademica y se descartan
+el archivo parcial y la SubidaParcial.
+"""
+import mimetypes
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivoComisionAcademica, SubidaParcial
+
+TAMAÑO_BLOQUE = 64 * 1024
+
+class FragmentoInvalido(Exception):
+    pass
+
+def ruta_parcial(subida):
+    return os.path.join(settings.MEDIA_ROOT, 'subidas_parciales', f'{subida.pk}.part')
+
+def iniciar_subida(seguimiento, usuario, nombre, tamaño, descripcion=''):
+    purgar_subidas()
+    subida = SubidaParcial.objects.create(
+        seguimiento=seguimiento,
+        usuario=usuario,
+        nombre_original=nombre,
+        tamaño=tamaño,
+        descripcion=descripcion,
+    )
+    os.makedirs(os.path.dirname(ruta_parcial(subida)), exist_ok=True)
+    open(ruta_parcial(subida), 'wb').close()
+    return subida
+
+def validar_fragmento(subida, offset, largo):
+    if offset != subida.recibido:
+        raise FragmentoInvalido(f'Se esperaba el offset {subida.recibido}')
+    if largo > settings.SUBIDAS_TAMAÑO_FRAGMENTO or subida.recibido + largo > subida.tamaño:
+        raise FragmentoInvalido('El fragmento excede el tamaño permitido')
+
+def recibir_fragmento(subida_id, offset, flujo, largo):
+    """Agrega `largo` bytes leídos de `flujo` a partir de `offset`.
+
+    El fragmento se recibe primero en un archivo temporal, sin bloqueos, y
+    la fila de SubidaParcial solo se bloquea para verificar el offset y
+    agregarlo al .part: un cliente lento no retiene la transacción.
+
+    Retorna (subida, archivo); `archivo` es el ArchivoComisionAcademica
+    creado al completarse la subida, o None si aún faltan fragmentos.
+    """
+    validar_fragmento(SubidaParcial.objects.get(pk=subida_id), offset, largo)
+
+    with tempfile.TemporaryFile() as fragmento:
+        escritos = 0
+        while escritos < largo:
+            bloque = flujo.read(min(TAMAÑO_BLOQUE, largo - escritos))
+            if not bloque:
+                break
+            fragmento.write(bloque)
+            escritos += len(bloque)
+        # Un fragmento cortado a medias se descarta por completo
+        if escritos != largo:
+            raise FragmentoInvalido('Fragmento incompleto')
+        fragmento.seek(0)
+
+        with transaction.atomic():
+            # Otra petición pudo agregar el mismo fragmento mientras tanto
+            subida = SubidaParcial.objects.select_for_update().get(pk=subida_id)
+            validar_fragmento(subida, offset, largo)
+            with open(ruta_parcial(subida), 'r+b') as destino:
+                destino.seek(offset)
+                shutil.copyfileobj(fragmento, destino, TAMAÑO_BLOQUE)
+                destino.truncate(offset + largo)
+
+            subida.recibido += largo
+            subida.save(update_fields=['recibido', 'actualizado_el'])
+            if subida.recibido < subida.tamaño:
+                return subida, None
+            return subida, completar_subida(subida)
+
+def completar_subida(subida):
+    tipo_mime, _ = mimetypes.guess_type(subida.nombre_original)
+    archivo = ArchivoComisionAcademica(
+        seguimiento=subida.seguimiento,
+        nombre_original=subida.nombre_original,
+        descripcion=subida.descripcion,
+        tamaño=subida.tamaño,
+        tipo_mime=tipo_mime or 'application/octet-stream',
+        subido_por=subida.usuario,
+    )
+    with open(ruta_parcial(subida), 'rb') as contenido:
+        archivo.archivo.save(subida.nombre_original, File(contenido), save=False)
+    archivo.save()
+    descartar_subida(subida)
+    return archivo
+
+def descartar_subida(subida):
+    try:
+        os.remove(ruta_parcial(subida))
+    except FileNotFoundError:
+        pass
+    subida.delete()
+
+def purgar_subidas(antiguedad=timedelta(days=1)):
+    """Descarta las subidas sin actividad durante más de `antiguedad`"""
+    for subida in SubidaParcial.objects.filter(actualizado_el__lt=timezone.now() - antiguedad):
+        descartar_subida(subida)
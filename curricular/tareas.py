@@ -0,0 +1,169 @@
+"""
+Cola de tareas en segundo plano para la generación de reportes.
+
+Las tareas se ejecutan en pools de hilos locales al proceso, sin broker
+externo. El estado se guarda en TareaReporte, por lo que cualquier proceso
+puede consultarlo y servir el archivo generado. Cada cola tiene su propio
+pool: REPORTES_MAX_WORKERS limita cuántos reportes se generan a la vez y
+PROCESAMIENTO_MAX_WORKERS cuántos archivos subidos se analizan (ver
+curricular.procesamiento), de modo que un archivo lento no detiene los
+reportes.
+
+Si el proceso se reinicia, los trabajos encolados en él se pierden: una
+tarea pendiente o en proceso sin señales de vida durante
+REPORTES_TAREA_VIGENCIA segundos se marca como fallida y se vuelve a
+encolar en la siguiente solicitud.
+"""
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import TareaReporte
+
+logger = logging.getLogger(__name__)
+
+_tipos = {}
+_executors = {}
+_bloqueo_executor = threading.Lock()
+
+def tipo_reporte(tipo, nombre_archivo, tipo_mime):
+    """Registra una función generadora de reportes.
+
+    La función recibe la tarea y un archivo destino donde escribir el
+    contenido; puede llamar a `tarea.reportar_progreso()` mientras trabaja.
+    """
+    def decorador(funcion):
+        _tipos[tipo] = (funcion, nombre_archivo, tipo_mime)
+        return funcion
+    return decorador
+
+def _obtener_executor(cola):
+    with _bloqueo_executor:
+        if cola not in _executors:
+            _executors[cola] = ThreadPoolExecutor(
+                max_workers=getattr(settings, f'{cola.upper()}_MAX_WORKERS'),
+                thread_name_prefix=cola,
+            )
+        return _executors[cola]
+
+def encolar_tarea(tipo, version='', usuario=None):
+    """Encola un reporte y retorna su tarea sin esperar a que se genere.
+
+    Si ya existe una tarea del mismo tipo y versión completada, o aún
+    activa, se reutiliza en lugar de generar el reporte otra vez, por lo que
+    `version` debe cambiar con cada invalidación de los datos, como
+    etag_reporte().
+    """
+    if version:
+        existente = TareaReporte.objects.filter(
+            tipo=tipo, version=version
+        ).exclude(estado='fallida').first()
+        if existente and (
+            existente.estado == 'completada'
+            or not marcar_huerfanas(TareaReporte.objects.filter(pk=existente.pk))
+        ):
+            return existente
+
+    _, nombre_archivo, tipo_mime = _tipos[tipo]
+    tarea = TareaReporte.objects.create(
+        tipo=tipo,
+        version=version,
+        nombre_archivo=nombre_archivo,
+        tipo_mime=tipo_mime,
+        solicitado_por=usuario,
+    )
+
+    en_segundo_plano(ejecutar_tarea, tarea.pk)
+    if settings.REPORTES_EJECUCION_SINCRONA:
+        tarea.refresh_from_db()
+    return tarea
+
+def marcar_huerfanas(tareas):
+    """Marca como fallidas las tareas pendientes o en proceso sin señales de
+    vida recientes: el proceso que debía ejecutarlas ya no existe. Retorna
+    cuántas se marcaron."""
+    limite = timezone.now() - timedelta(seconds=settings.REPORTES_TAREA_VIGENCIA)
+    return tareas.filter(estado__in=['pendiente', 'en_proceso']).filter(
+        Q(latido__lt=limite) | Q(latido__isnull=True, creado_el__lt=limite)
+    ).update(
+        estado='fallida', error='La tarea se interrumpió sin terminar', finalizado_el=timezone.now()
+    )
+
+def en_segundo_plano(funcion, *args, cola='reportes'):
+    """Ejecuta `funcion(*args, en_hilo=True)` en el pool de `cola` una vez
+    confirmada la transacción actual, o de inmediato con
+    REPORTES_EJECUCION_SINCRONA.
+
+    La función debe cerrar las conexiones a la base de datos cuando
+    `en_hilo` es verdadero, como ejecutar_tarea.
+    """
+    if settings.REPORTES_EJECUCION_SINCRONA:
+        funcion(*args)
+    else:
+        transaction.on_commit(lambda: _obtener_executor(cola).submit(funcion, *args, en_hilo=True))
+
+def al_confirmar_una_vez(funcion):
+    """Como transaction.on_commit, pero registra `funcion` una sola vez por
+    transacción. Si la transacción se revierte, Django descarta el registro
+    junto con ella."""
+    conexion = transaction.get_connection()
+    # Las ya ejecutadas no cuentan: captureOnCommitCallbacks las ejecuta sin
+    # quitarlas de la conexión
+    if conexion.in_atomic_block and any(
+        getattr(registrada, 'funcion', None) is funcion and not registrada.ejecutada
+        for _, registrada, _ in conexion.run_on_commit
+    ):
+        return
+
+    def ejecutar():
+        ejecutar.ejecutada = True
+        funcion()
+
+    ejecutar.funcion, ejecutar.ejecutada = funcion, False
+    transaction.on_commit(ejecutar)
+
+def ejecutar_tarea(tarea_id, en_hilo=False):
+    if en_hilo:
+        close_old_connections()
+    try:
+        tarea = TareaReporte.objects.get(pk=tarea_id)
+        tarea.estado = 'en_proceso'
+        tarea.latido = timezone.now()
+        tarea.save(update_fields=['estado', 'latido'])
+
+        funcion = _tipos[tarea.tipo][0]
+        with tempfile.TemporaryFile() as destino:
+            funcion(tarea, destino)
+            destino.seek(0)
+            tarea.archivo.save(tarea.nombre_archivo, File(destino), save=False)
+
+        tarea.estado = 'completada'
+        tarea.progreso = 100
+        tarea.finalizado_el = timezone.now()
+        tarea.save(update_fields=['estado', 'progreso', 'archivo', 'finalizado_el'])
+        purgar_tareas(tarea.tipo)
+    except Exception as exc:
+        logger.exception('Error al generar la tarea de reporte %s', tarea_id)
+        TareaReporte.objects.filter(pk=tarea_id).update(
+            estado='fallida', error=str(exc), finalizado_el=timezone.now()
+        )
+    finally:
+        if en_hilo:
+            close_old_connections()
+
+def purgar_tareas(tipo, antiguedad=timedelta(days=1)):
+    """Elimina las tareas finalizadas hace más de `antiguedad` y sus archivos"""
+    antiguas = TareaReporte.objects.filter(
+        tipo=tipo, finalizado_el__lt=timezone.now() - antiguedad
+    )
+    for tarea in antiguas:
+        tarea.archivo.delete(save=False)
+    antiguas.delete()
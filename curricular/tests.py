@@ -1,3 +1,1642 @@
-from django.test import TestCase
+import asyncio
+import base64
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+import zlib
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from config import asgi
+
+from .models import (
+    Sede, Facultad, Carrera, Fase, RediseñoCurricular, SeguimientoFase,
+    ArchivoComisionAcademica, TareaReporte, IndiceBusqueda, SubidaParcial, CambioSeguimiento
+)
+from . import cache_datos, eventos, instrumentacion, procesamiento, tareas
+from .busqueda import buscar_carreras, obtener_motor
+from .datos_sinteticos import poblar_datos_sinteticos
+from .exportaciones import MIME_XLSX, construir_reporte_xlsx
+from .subidas import FragmentoInvalido, recibir_fragmento, ruta_parcial
+from .tareas import ejecutar_tarea
+
+MEDIA_PRUEBAS = tempfile.mkdtemp()
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_PRUEBAS, ignore_errors=True)
+
+def crear_rediseño(total_fases=12, nombre='Ingeniería Informática', sede='Potosí'):
+    """Crea un rediseño con un seguimiento por cada fase"""
+    sede, _ = Sede.objects.get_or_create(nombre=sede)
+    facultad, _ = Facultad.objects.get_or_create(nombre='Facultad de Ciencias Puras')
+    carrera = Carrera.objects.create(facultad=facultad, sede=sede, nombre=nombre)
+    for numero in range(Fase.objects.count() + 1, total_fases + 1):
+        Fase.objects.create(numero=numero, nombre=f'Fase {numero}', codigo=f'F{numero}', orden=numero)
+    return RediseñoCurricular.objects.create(carrera=carrera)
+
+
+class ContadoresProgresoTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño()
+    
+    def test_contadores_al_guardar_y_eliminar(self):
+        seguimiento = self.rediseño.seguimientos.first()
+        seguimiento.completado = True
+        seguimiento.save()
+        
+        self.rediseño.refresh_from_db()
+        self.assertEqual((self.rediseño.fases_completadas, self.rediseño.fases_totales), (1, 12))
+        self.assertEqual(self.rediseño.progreso_porcentaje(), 8)
+        
+        seguimiento.delete()
+        self.rediseño.refresh_from_db()
+        self.assertEqual((self.rediseño.fases_completadas, self.rediseño.fases_totales), (0, 11))
+    
+    def test_contadores_en_operaciones_en_lote(self):
+        self.rediseño.seguimientos.update(completado=True)
+        self.rediseño.refresh_from_db()
+        self.assertEqual(self.rediseño.progreso_porcentaje(), 100)
+        
+        seguimientos = list(self.rediseño.seguimientos.all()[:6])
+        for seguimiento in seguimientos:
+            seguimiento.completado = False
+        SeguimientoFase.objects.bulk_update(seguimientos, ['completado'])
+        self.rediseño.refresh_from_db()
+        self.assertEqual(self.rediseño.progreso_porcentaje(), 50)
+    
+    def test_progreso_sin_consultas(self):
+        self.rediseño.refresh_from_db()
+        with self.assertNumQueries(0):
+            self.rediseño.progreso_porcentaje()
+    
+    def test_comando_recalcular_progreso(self):
+        RediseñoCurricular.objects.update(fases_completadas=5, fases_totales=10)
+        
+        with self.assertRaises(CommandError):
+            call_command('recalcular_progreso', '--solo-verificar', stdout=StringIO())
+        
+        call_command('recalcular_progreso', stdout=StringIO())
+        self.rediseño.refresh_from_db()
+        self.assertEqual((self.rediseño.fases_completadas, self.rediseño.fases_totales), (0, 12))
+        call_command('recalcular_progreso', '--solo-verificar', stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, REPORTES_EJECUCION_SINCRONA=True)
+class ProgresoAnotadoTests(TestCase):
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_superuser(
+            'admin', 'admin@uatf.edu.bo', 'clave', rol='admin'
+        )
+        self.client.force_login(self.usuario)
+        cache.clear()
+    
+    def crear_rediseños(self, cantidad):
+        inicio = RediseñoCurricular.objects.count()
+        for i in range(inicio, inicio + cantidad):
+            rediseño = crear_rediseño(nombre=f'Carrera {i}')
+            rediseño.seguimientos.filter(fase__numero__lte=i % 12).update(completado=True)
+    
+    def assertConsultasConstantes(self, url, consultas):
+        for cantidad in (3, 12):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.crear_rediseños(cantidad)
+            with self.assertNumQueries(consultas):
+                response = self.client.get(url, secure=True)
+            self.assertEqual(response.status_code, 200)
+    
+    def test_with_progreso_coincide_con_contadores(self):
+        self.crear_rediseños(13)
+        rediseños = RediseñoCurricular.objects.with_progreso()
+        self.assertEqual(str(rediseños.query).count('SELECT'), 1)
+        for rediseño in rediseños:
+            self.assertEqual(rediseño.progreso, rediseño.progreso_porcentaje())
+            self.assertEqual(rediseño.fases_completadas, rediseño.seguimientos.filter(completado=True).count())
+            self.assertEqual(rediseño.fases_totales, rediseño.seguimientos.count())
+    
+    def test_dashboard(self):
+        self.assertConsultasConstantes(reverse('curricular:dashboard'), 6)
+    
+    def test_reporte_pdf(self):
+        self.assertConsultasConstantes(reverse('curricular:generar_reporte_pdf'), 16)
+    
+    def test_reporte_pdf_no_consulta_por_sede(self):
+        for sede in ['Tupiza', 'Villazón', 'Uyuni', 'Uncía', 'Llica']:
+            crear_rediseño(nombre=f'Economía {sede}', sede=sede)
+        with self.assertNumQueries(16):
+            response = self.client.get(reverse('curricular:generar_reporte_pdf'), secure=True)
+        contenido = b''.join(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(contenido.startswith(b'%PDF'))
+    
+    def test_admin_changelist(self):
+        self.assertConsultasConstantes(
+            reverse('admin:curricular_rediseñocurricular_changelist'), 7
+        )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, REPORTES_EJECUCION_SINCRONA=True)
+class ReportePDFCacheTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño = crear_rediseño()
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(usuario)
+        self.url = reverse('curricular:generar_reporte_pdf')
+        cache.clear()
+    
+    def test_descargas_repetidas_usan_cache(self):
+        primera = self.client.get(self.url, secure=True)
+        with mock.patch('curricular.reportes.construir_reporte_pdf') as construir:
+            segunda = self.client.get(self.url, secure=True)
+        construir.assert_not_called()
+        self.assertEqual(primera['ETag'], segunda['ETag'])
+        self.assertEqual(b''.join(primera.streaming_content), b''.join(segunda.streaming_content))
+    
+    def test_get_condicional_responde_304(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+    
+    def test_cambios_invalidan_el_reporte(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        
+        seguimiento = self.rediseño.seguimientos.first()
+        seguimiento.completado = True
+        with self.captureOnCommitCallbacks(execute=True):
+            seguimiento.save()
+        self.assertIsNone(cache.get('curricular:reporte_pdf'))
+        
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_actualizacion_en_lote_cambia_etag(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        self.rediseño.seguimientos.update(completado=True)
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_renombrar_sede_cambia_etag(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        sede = self.rediseño.carrera.sede
+        sede.nombre = 'Uyuni'
+        with self.captureOnCommitCallbacks(execute=True):
+            sede.save()
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_etag_no_depende_de_la_cache_del_proceso(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        # Otro worker con LocMemCache tiene su propia caché, con otra versión
+        cache.clear()
+        response = self.client.get(self.url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_renombrar_facultad_cambia_etag(self):
+        etag = self.client.get(self.url, secure=True)['ETag']
+        facultad = self.rediseño.carrera.facultad
+        facultad.nombre = 'Facultad de Tecnología'
+        with self.captureOnCommitCallbacks(execute=True):
+            facultad.save()
+        self.assertNotEqual(self.client.get(self.url, secure=True)['ETag'], etag)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class TareaReporteTests(TestCase):
+    def setUp(self):
+        crear_rediseño()
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(usuario)
+        self.url = reverse('curricular:generar_reporte_pdf')
+        cache.clear()
+    
+    def test_reporte_se_genera_en_segundo_plano(self):
+        response = self.client.get(self.url, secure=True, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 202)
+        datos = response.json()
+        self.assertEqual(datos['estado'], 'pendiente')
+        
+        ejecutar_tarea(datos['id'])
+        
+        estado = self.client.get(datos['url_estado'], secure=True, HTTP_ACCEPT='application/json')
+        self.assertEqual(estado.json()['estado'], 'completada')
+        descarga = self.client.get(datos['url_descarga'], secure=True)
+        self.assertTrue(b''.join(descarga.streaming_content).startswith(b'%PDF'))
+        descarga.close()
+        
+        # El reporte ya generado se sirve directamente desde la caché
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+    
+    def test_solicitudes_simultaneas_comparten_tarea(self):
+        ids = {
+            self.client.get(self.url, secure=True, HTTP_ACCEPT='application/json').json()['id']
+            for _ in range(10)
+        }
+        self.assertEqual(len(ids), 1)
+        self.assertEqual(TareaReporte.objects.count(), 1)
+    
+    def test_pagina_de_espera(self):
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.status_code, 202)
+        self.assertContains(response, 'Generando Reporte', status_code=202)
+    
+    def test_tarea_huerfana_se_vuelve_a_encolar(self):
+        huerfana = self.client.get(self.url, secure=True, HTTP_ACCEPT='application/json').json()['id']
+        # El proceso que debía ejecutarla se reinició: nunca sale de pendiente
+        TareaReporte.objects.filter(pk=huerfana).update(creado_el=timezone.now() - timedelta(hours=1))
+        
+        nueva = self.client.get(self.url, secure=True, HTTP_ACCEPT='application/json').json()['id']
+        self.assertNotEqual(nueva, huerfana)
+        self.assertEqual(TareaReporte.objects.get(pk=huerfana).estado, 'fallida')
+        
+        # Una tarea en ejecución con señales de vida recientes se sigue reutilizando
+        TareaReporte.objects.filter(pk=nueva).update(
+            estado='en_proceso', creado_el=timezone.now() - timedelta(hours=1), latido=timezone.now()
+        )
+        self.assertEqual(self.client.get(self.url, secure=True, HTTP_ACCEPT='application/json').json()['id'], nueva)
+    
+    def test_reportes_y_archivos_usan_pools_separados(self):
+        self.assertIsNot(tareas._obtener_executor('reportes'), tareas._obtener_executor('procesamiento'))
+
+
+class DetalleRediseñoTests(TestCase):
+    def setUp(self):
+        self.usuario = get_user_model().objects.create_user('gestor', password='clave', rol='gestor')
+        self.client.force_login(self.usuario)
+    
+    def adjuntar_archivos(self, rediseño, cantidad):
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        seguimiento = rediseño.seguimientos.get(fase__codigo='CA')
+        for i in range(cantidad):
+            ArchivoComisionAcademica.objects.create(
+                seguimiento=seguimiento,
+                archivo=f'comision_academica/resolucion_{i}.pdf',
+                nombre_original=f'resolucion_{i}.pdf',
+                tamaño=1024,
+                tipo_mime='application/pdf',
+                subido_por=self.usuario,
+            )
+    
+    def test_consultas_constantes(self):
+        for cantidad in (1, 8):
+            rediseño = crear_rediseño(nombre=f'Carrera {cantidad}')
+            self.adjuntar_archivos(rediseño, cantidad)
+            url = reverse('curricular:detalle_rediseño', args=[rediseño.id])
+            with self.assertNumQueries(5):
+                response = self.client.get(url, secure=True)
+            self.assertContains(response, 'resolucion_0.pdf')
+            self.assertContains(response, 'Subido por gestor')
+
+
+class ExplicarConsultasTests(TestCase):
+    def test_muestra_planes_y_revierte_datos(self):
+        salida = StringIO()
+        call_command(
+            'explicar_consultas', '--sedes=2', '--facultades=2', '--carreras=2',
+            '--años=2', '--repeticiones=1', stdout=salida,
+        )
+        self.assertIn('[dashboard] Últimos rediseños actualizados', salida.getvalue())
+        self.assertIn('rediseno_actualizado_idx', salida.getvalue())
+        self.assertIn('Búsqueda en el índice (MotorFTS5)', salida.getvalue())
+        self.assertIn('curricular_busqueda_fts', salida.getvalue())
+        self.assertFalse(Carrera.objects.exists())
+
+    def test_datos_sinteticos_quedan_indexados(self):
+        obtener_motor.cache_clear()
+        poblar_datos_sinteticos(sedes=1, facultades=1, carreras=2, años=1)
+        
+        self.assertEqual(len(buscar_carreras('sintetica')), 2)
+        self.assertEqual(len(buscar_carreras('rediseño sintetico')), 2)
+
+
+
+class BenchmarkVistasTests(TestCase):
+    def test_mide_las_vistas_y_guarda_json(self):
+        salida = os.path.join(MEDIA_PRUEBAS, 'benchmark.json')
+        call_command(
+            'benchmark_vistas', '--sedes=1', '--facultades=2', '--carreras=1', '--años=2',
+            '--repeticiones=1', f'--salida={salida}', stdout=StringIO(),
+        )
+        with open(salida, encoding='utf-8') as archivo:
+            resultados = json.load(archivo)
+        
+        self.assertEqual(resultados['datos']['rediseños'], 4)
+        for nombre in ('dashboard', 'lista_carreras', 'detalle_rediseño', 'generar_reporte_pdf', 'admin carrera'):
+            self.assertEqual(resultados['vistas'][nombre]['status'], 200, nombre)
+            self.assertGreater(resultados['vistas'][nombre]['consultas'], 0)
+        self.assertFalse(Carrera.objects.exists())
+        
+        comparacion = StringIO()
+        call_command('benchmark_vistas', '--sedes=1', '--facultades=1', '--repeticiones=1',
+                     f'--comparar={salida}', stdout=comparacion)
+        self.assertIn('antes', comparacion.getvalue())
+    
+    def test_repetir_con_conservar(self):
+        for _ in range(2):
+            call_command(
+                'benchmark_vistas', '--sedes=1', '--facultades=1', '--carreras=1', '--años=1',
+                '--repeticiones=1', '--conservar', stdout=StringIO(),
+            )
+        usuario = get_user_model().objects.get(username='benchmark')
+        self.assertTrue(usuario.is_superuser)
+        self.assertFalse(usuario.has_usable_password())
+
+class PoblarDatosTests(TestCase):
+    def test_simulacion_no_escribe(self):
+        salida = StringIO()
+        call_command('poblar_datos', '--dry-run', stdout=salida)
+        self.assertIn('carreras: 69 se crearían', salida.getvalue())
+        self.assertFalse(Sede.objects.exists())
+        self.assertFalse(Carrera.objects.exists())
+
+    def test_idempotente(self):
+        call_command('poblar_datos', stdout=StringIO())
+        self.assertEqual(Sede.objects.count(), 8)
+        self.assertEqual(Facultad.objects.count(), 13)
+        self.assertEqual(Fase.objects.count(), 12)
+        self.assertEqual(Carrera.objects.count(), 69)
+        self.assertEqual(IndiceBusqueda.objects.filter(tipo='carrera').count(), 69)
+
+        salida = StringIO()
+        with self.assertNumQueries(6):
+            call_command('poblar_datos', stdout=salida)
+        self.assertEqual(salida.getvalue().count('sin cambios'), 4)
+        self.assertEqual(Carrera.objects.count(), 69)
+
+    def test_completa_datos_parciales(self):
+        Sede.objects.create(nombre='Potosí')
+        call_command('poblar_datos', stdout=StringIO())
+        self.assertEqual(Sede.objects.count(), 8)
+        self.assertIn(Carrera.objects.get(nombre='Ingeniería Informática').pk, buscar_carreras('informatica'))
+
+
+class CreacionSeguimientosTests(TestCase):
+    def setUp(self):
+        call_command('poblar_datos', stdout=StringIO())
+        self.carrera = Carrera.objects.get(nombre='Derecho', sede__nombre='Potosí')
+    
+    def test_rediseño_nuevo_crea_seguimientos_en_lote(self):
+        with self.assertNumQueries(7):
+            rediseño = RediseñoCurricular.objects.create(carrera=self.carrera)
+        self.assertEqual(rediseño.seguimientos.count(), 12)
+        rediseño.refresh_from_db()
+        self.assertEqual((rediseño.fases_completadas, rediseño.fases_totales), (0, 12))
+        self.assertEqual(rediseño.crear_seguimientos(), [])
+    
+    def test_admin_crea_seguimientos(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@uatf.edu.bo', 'clave')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:curricular_rediseñocurricular_add'), {
+            'carrera': self.carrera.pk,
+            'año': 2025,
+            'fecha_inicio': '2025-01-01',
+            'estado': 'en_proceso',
+            'creado_por': admin.pk,
+            'seguimientos-TOTAL_FORMS': 0,
+            'seguimientos-INITIAL_FORMS': 0,
+        }, secure=True)
+        self.assertEqual(response.status_code, 302)
+        rediseño = RediseñoCurricular.objects.get()
+        self.assertEqual(rediseño.creado_por, admin)
+        self.assertEqual(rediseño.seguimientos.count(), 12)
+    
+    def test_abrir_año(self):
+        RediseñoCurricular.objects.create(carrera=self.carrera, año=2026)
+        Carrera.objects.filter(nombre='Medicina').update(activo=False)
+        
+        salida = StringIO()
+        # SQLite admite 999 parámetros por sentencia: 804 seguimientos van en 9 INSERT
+        with self.assertNumQueries(17):
+            call_command('abrir_rediseños', '--año=2026', stdout=salida)
+        self.assertIn('rediseños creados: 67', salida.getvalue())
+        self.assertIn(f'seguimientos creados: {67 * 12}', salida.getvalue())
+        self.assertEqual(RediseñoCurricular.objects.filter(año=2026).count(), 68)
+        self.assertEqual(SeguimientoFase.objects.count(), 68 * 12)
+        self.assertFalse(RediseñoCurricular.objects.filter(fases_totales=0).exists())
+        
+        call_command('abrir_rediseños', '--año=2026', stdout=salida)
+        self.assertIn('rediseños creados: 0', salida.getvalue())
+
+
+class ActualizacionLoteTests(TestCase):
+    def setUp(self):
+        call_command('poblar_datos', stdout=StringIO())
+        call_command('abrir_rediseños', '--año=2025', stdout=StringIO())
+        self.fase = Fase.objects.get(codigo='VN')
+        self.rediseños = list(RediseñoCurricular.objects.order_by('pk').values_list('pk', flat=True)[:40])
+        self.usuario = get_user_model().objects.create_user('coordinador', password='clave', rol='coordinador')
+        self.client.force_login(self.usuario)
+    
+    def test_formulario_cierra_fase_en_lote(self):
+        url = reverse('curricular:actualizar_fase_lote')
+        datos = {
+            'fase': self.fase.pk,
+            'rediseños': self.rediseños,
+            'completado': 'true',
+            'fecha_conclusion': '2025-06-30',
+        }
+        # Incluye la lectura de los valores nuevos y la inserción del historial
+        with self.assertNumQueries(12):
+            response = self.client.post(url, datos, secure=True)
+        self.assertRedirects(response, f'{url}?fase={self.fase.pk}', fetch_redirect_response=False)
+        
+        seguimientos = SeguimientoFase.objects.filter(fase=self.fase, completado=True)
+        self.assertEqual(seguimientos.count(), 40)
+        self.assertEqual(set(seguimientos.values_list('actualizado_por', flat=True)), {self.usuario.pk})
+        self.assertEqual(str(seguimientos.first().fecha_conclusion), '2025-06-30')
+        self.assertEqual(RediseñoCurricular.objects.filter(fases_completadas=1).count(), 40)
+    
+    def test_formulario_requiere_algun_cambio(self):
+        response = self.client.post(reverse('curricular:actualizar_fase_lote'), {
+            'fase': self.fase.pk, 'rediseños': self.rediseños, 'completado': 'unknown',
+        }, secure=True)
+        self.assertContains(response, 'Indique al menos un cambio.')
+    
+    def test_api_valores_por_rediseño(self):
+        primero, segundo = self.rediseños[:2]
+        response = self.client.post(
+            reverse('curricular:api_actualizar_fase_lote'),
+            {'fase': self.fase.pk, 'seguimientos': [
+                {'rediseño': primero, 'completado': True},
+                {'rediseño': segundo, 'fecha_inicio': '2025-03-01'},
+            ]},
+            content_type='application/json', secure=True,
+        )
+        self.assertEqual(response.json(), {
+            'actualizados': 2,
+            'rediseños': [{'id': primero, 'progreso': 8}, {'id': segundo, 'progreso': 0}],
+        })
+        seguimiento = SeguimientoFase.objects.get(fase=self.fase, rediseño=segundo)
+        self.assertEqual(str(seguimiento.fecha_inicio), '2025-03-01')
+        self.assertFalse(seguimiento.completado)
+    
+    def test_api_es_atomica(self):
+        url = reverse('curricular:api_actualizar_fase_lote')
+        cuerpo = {'fase': self.fase.pk, 'seguimientos': [
+            {'rediseño': self.rediseños[0], 'completado': True},
+            {'rediseño': 0, 'completado': True},
+        ]}
+        response = self.client.post(url, cuerpo, content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['rediseños'], [0])
+        self.assertFalse(SeguimientoFase.objects.filter(completado=True).exists())
+        
+        cuerpo['seguimientos'] = [{'rediseño': self.rediseños[0], 'fecha_inicio': 'ayer'}]
+        response = self.client.post(url, cuerpo, content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fecha_inicio', response.json()['errores']['0'])
+    
+    def test_api_requiere_permisos(self):
+        self.usuario.rol = 'revisor'
+        self.usuario.save()
+        response = self.client.post(
+            reverse('curricular:api_actualizar_fase_lote'), {}, content_type='application/json', secure=True
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, REPORTES_EJECUCION_SINCRONA=True)
+class ExportacionXLSXTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño = crear_rediseño()
+            self.seguimiento = self.rediseño.seguimientos.get(fase__numero=1)
+            self.seguimiento.completado = True
+            self.seguimiento.fecha_conclusion = '2025-03-15'
+            self.seguimiento.responsable = get_user_model().objects.create_user(
+                'gestor', first_name='Ana', last_name='Quispe'
+            )
+            self.seguimiento.save()
+    
+    def leer_libro(self):
+        destino = BytesIO()
+        construir_reporte_xlsx(destino)
+        return load_workbook(destino, read_only=True)
+    
+    def test_consultas_constantes(self):
+        for i in range(2):
+            with self.assertNumQueries(2):
+                construir_reporte_xlsx(BytesIO())
+            crear_rediseño(nombre=f'Carrera {i}')
+    
+    def test_matriz_y_detalle(self):
+        libro = self.leer_libro()
+        matriz = list(libro['Matriz de Fases'].iter_rows(values_only=True))
+        self.assertEqual(matriz[0][:7], ('Año', 'Sede', 'Facultad', 'Carrera', 'Estado', 'Progreso (%)', 'F1'))
+        self.assertEqual(matriz[1][:6], (2025, 'Potosí', 'Facultad de Ciencias Puras', 'Ingeniería Informática', 'En Proceso', 8))
+        self.assertEqual(matriz[1][6].date().isoformat(), '2025-03-15')
+        self.assertFalse(any(matriz[1][7:]))
+        
+        detalle = list(libro['Seguimientos'].iter_rows(values_only=True))
+        self.assertEqual(len(detalle), 13)
+        self.assertEqual(detalle[1][6:9], ('F1 - Fase 1', 'Sí', None))
+        self.assertEqual(detalle[1][9].date().isoformat(), '2025-03-15')
+        self.assertEqual(detalle[1][10], 'Ana Quispe')
+        self.assertEqual(detalle[2][7], 'No')
+    
+    def test_vista_descarga_y_etag(self):
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(usuario)
+        url = reverse('curricular:exportar_xlsx')
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], MIME_XLSX)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'PK'))
+        
+        response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+    
+    def test_cambios_generan_un_archivo_nuevo(self):
+        self.client.force_login(get_user_model().objects.create_user('revisor', password='clave'))
+        url = reverse('curricular:exportar_xlsx')
+        self.client.get(url, secure=True)
+        
+        carrera = self.rediseño.carrera
+        carrera.nombre = 'Ingeniería de Sistemas'
+        with self.captureOnCommitCallbacks(execute=True):
+            carrera.save()
+        response = self.client.get(url, secure=True)
+        self.assertEqual(TareaReporte.objects.filter(tipo='reporte_xlsx').count(), 2)
+        libro = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+        self.assertEqual(next(libro['Matriz de Fases'].iter_rows(min_row=2, values_only=True))[3], 'Ingeniería de Sistemas')
+
+
+class ExportacionSeguimientosTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño()
+        crear_rediseño(nombre='Derecho', sede='Tupiza')
+        self.rediseño.seguimientos.filter(fase__numero__lte=3).update(completado=True, observaciones='Acta, "firmada"')
+        usuario = get_user_model().objects.create_user('analista', password='clave')
+        self.client.force_login(usuario)
+    
+    def test_csv_en_flujo(self):
+        url = reverse('curricular:exportar_seguimientos_csv')
+        response = self.client.get(url, {'sede': self.rediseño.carrera.sede_id}, secure=True)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            contenido = b''.join(response.streaming_content).decode()
+        filas = list(csv.DictReader(StringIO(contenido)))
+        self.assertEqual(len(filas), 12)
+        self.assertEqual(filas[0]['carrera'], 'Ingeniería Informática')
+        self.assertEqual(filas[0]['observaciones'], 'Acta, "firmada"')
+        self.assertEqual(sum(fila['completado'] == 'True' for fila in filas), 3)
+    
+    def test_ndjson_filtrado(self):
+        url = reverse('curricular:exportar_seguimientos_ndjson')
+        response = self.client.get(url, {'completado': 'true', 'fase': 'F2'}, secure=True)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lineas = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lineas), 1)
+        registro = json.loads(lineas[0])
+        self.assertEqual((registro['fase_codigo'], registro['sede'], registro['año']), ('F2', 'Potosí', 2025))
+        
+        response = self.client.get(url, {'desde': 'ayer'}, secure=True)
+        self.assertEqual(response.status_code, 400)
+    
+    def test_comando(self):
+        salida = StringIO()
+        call_command('exportar_seguimientos', '--formato=ndjson', '--lote=5', '--año=2025', stdout=salida)
+        self.assertEqual(len(salida.getvalue().splitlines()), 24)
+        
+        with tempfile.NamedTemporaryFile(suffix='.csv') as destino:
+            call_command('exportar_seguimientos', f'--salida={destino.name}', '--completado=false', stdout=StringIO())
+            with open(destino.name, encoding='utf-8') as archivo:
+                self.assertEqual(len(list(csv.reader(archivo))), 1 + 21)
+        
+        with self.assertRaises(CommandError):
+            call_command('exportar_seguimientos', '--año=dos mil', stdout=StringIO())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class DescargaArchivoTests(TestCase):
+    CONTENIDO = bytes(range(256)) * 40
+    
+    def setUp(self):
+        rediseño = crear_rediseño()
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.archivo = ArchivoComisionAcademica.objects.create(
+            seguimiento=rediseño.seguimientos.get(fase__codigo='CA'),
+            archivo=SimpleUploadedFile('resolución.pdf', self.CONTENIDO),
+            nombre_original='resolución.pdf',
+            tamaño=len(self.CONTENIDO),
+            tipo_mime='application/pdf',
+        )
+        self.url = reverse('curricular:descargar_archivo_ca', args=[self.archivo.pk])
+        self.client.force_login(usuario)
+    
+    def descargar(self, **cabeceras):
+        response = self.client.get(self.url, secure=True, headers=cabeceras)
+        contenido = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, contenido
+    
+    def test_descarga_completa(self):
+        response, contenido = self.descargar()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(contenido, self.CONTENIDO)
+        self.assertEqual(response['Content-Length'], str(len(self.CONTENIDO)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], self.archivo.etag())
+        self.assertIn("filename*=utf-8''resoluci%C3%B3n.pdf", response['Content-Disposition'])
+    
+    def test_rangos(self):
+        response, contenido = self.descargar(Range='bytes=10000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(contenido, self.CONTENIDO[10000:])
+        self.assertEqual(response['Content-Range'], f'bytes 10000-10239/{len(self.CONTENIDO)}')
+        
+        response, contenido = self.descargar(Range='bytes=-16')
+        self.assertEqual(contenido, self.CONTENIDO[-16:])
+        response, contenido = self.descargar(Range='bytes=5-9')
+        self.assertEqual((response['Content-Length'], contenido), ('5', self.CONTENIDO[5:10]))
+        
+        response, _ = self.descargar(Range='bytes=20000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.CONTENIDO)}')
+    
+    def test_if_range_desactualizado_envia_todo(self):
+        response, contenido = self.descargar(Range='bytes=0-9', If_Range='"otra-version"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(contenido, self.CONTENIDO)
+        
+        response, _ = self.descargar(Range='bytes=0-9', If_Range=self.archivo.etag())
+        self.assertEqual(response.status_code, 206)
+    
+    def test_peticiones_condicionales(self):
+        response, _ = self.descargar()
+        self.assertEqual(self.descargar(If_None_Match=response['ETag'])[0].status_code, 304)
+        self.assertEqual(self.descargar(If_Modified_Since=response['Last-Modified'])[0].status_code, 304)
+    
+    @override_settings(ARCHIVOS_DESCARGA_SERVIDOR='x-accel-redirect', ARCHIVOS_X_ACCEL_PREFIJO='/protegido/')
+    def test_delegar_en_servidor_web(self):
+        response, contenido = self.descargar()
+        self.assertEqual(response['X-Accel-Redirect'], f'/protegido/{self.archivo.archivo.name}')
+        self.assertEqual(contenido, b'')
+        
+        with self.settings(ARCHIVOS_DESCARGA_SERVIDOR='x-sendfile'):
+            response, _ = self.descargar()
+        self.assertEqual(response['X-Sendfile'], self.archivo.archivo.path)
+        
+        ArchivoComisionAcademica.objects.filter(pk=self.archivo.pk).update(archivo='ca/año 2025/acta #1?50%.pdf')
+        response, _ = self.descargar()
+        self.assertEqual(response['X-Accel-Redirect'], '/protegido/ca/a%C3%B1o%202025/acta%20%231%3F50%25.pdf')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, REPORTES_EJECUCION_SINCRONA=True)
+class AlmacenamientoContenidoTests(TestCase):
+    CONTENIDO = b'%PDF-1.4 resolucion HCU 123/2025'
+    
+    def setUp(self):
+        rediseños = [crear_rediseño(nombre=nombre) for nombre in ('Derecho', 'Medicina')]
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        self.seguimientos = [rediseño.seguimientos.get(fase__codigo='CA') for rediseño in rediseños]
+        usuario = get_user_model().objects.create_user('gestor', password='clave', rol='gestor')
+        self.client.force_login(usuario)
+    
+    def subir(self, seguimiento, nombre='resolucion.pdf'):
+        # Como en una solicitud real, la fila se confirma al terminar
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('curricular:subir_archivo_ca', args=[seguimiento.pk]),
+                {'archivo': SimpleUploadedFile(nombre, self.CONTENIDO, 'application/pdf')},
+                secure=True,
+            )
+        return seguimiento.archivos.latest('pk')
+    
+    def test_contenido_repetido_se_guarda_una_vez(self):
+        primero = self.subir(self.seguimientos[0])
+        segundo = self.subir(self.seguimientos[1], 'copia.pdf')
+        digest = hashlib.sha256(self.CONTENIDO).hexdigest()
+        
+        self.assertEqual(primero.archivo.name, segundo.archivo.name)
+        self.assertEqual(primero.digest, digest)
+        self.assertEqual(primero.etag(), f'"{digest}"')
+        self.assertEqual(os.listdir(os.path.dirname(primero.archivo.path)), [digest])
+        with primero.archivo.open('rb') as archivo:
+            self.assertEqual(archivo.read(), self.CONTENIDO)
+    
+    def test_elimina_contenido_con_la_ultima_referencia(self):
+        primero = self.subir(self.seguimientos[0])
+        segundo = self.subir(self.seguimientos[1])
+        ruta = primero.archivo.path
+        url = 'curricular:eliminar_archivo_ca'
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse(url, args=[primero.pk]), secure=True)
+        self.assertTrue(os.path.exists(ruta))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse(url, args=[segundo.pk]), secure=True)
+        self.assertFalse(os.path.exists(ruta))
+    
+    def test_subida_simultanea_a_la_eliminacion_conserva_el_contenido(self):
+        primero = self.subir(self.seguimientos[0])
+        nombre, ruta = primero.archivo.name, primero.archivo.path
+        almacenamiento = primero.archivo.storage
+        
+        # Otra subida del mismo contenido reutiliza el archivo, pero su fila aún no se confirma
+        self.assertEqual(almacenamiento.save('copia.pdf', ContentFile(self.CONTENIDO)), nombre)
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.delete()
+        self.assertTrue(os.path.exists(ruta))
+        
+        # Con la fila confirmada la reserva se libera y el contenido vuelve a depender de sus filas
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo = ArchivoComisionAcademica.objects.create(
+                seguimiento=self.seguimientos[1], archivo=nombre, nombre_original='copia.pdf',
+                tamaño=len(self.CONTENIDO), tipo_mime='application/pdf',
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        self.assertFalse(os.path.exists(ruta))
+    
+    def test_subida_mientras_se_elimina_reescribe_el_contenido(self):
+        primero = self.subir(self.seguimientos[0])
+        almacenamiento = primero.archivo.storage
+        reservado = almacenamiento.reservado
+        
+        def subir_durante_la_eliminacion(nombre):
+            # La eliminación ya apartó el archivo cuando la subida mira el destino
+            almacenamiento.save('copia.pdf', ContentFile(self.CONTENIDO))
+            return reservado(nombre)
+        
+        with mock.patch.object(almacenamiento, 'reservado', side_effect=subir_durante_la_eliminacion):
+            with self.captureOnCommitCallbacks(execute=True):
+                primero.delete()
+        with primero.archivo.open('rb') as archivo:
+            self.assertEqual(archivo.read(), self.CONTENIDO)
+        self.assertEqual(os.listdir(os.path.dirname(primero.archivo.path)), [primero.digest])
+        almacenamiento.liberar_reserva(primero.archivo.name)
+    
+    def test_deduplicar_archivos_anteriores(self):
+        anteriores = []
+        for i, seguimiento in enumerate(self.seguimientos):
+            nombre = default_storage.save(f'comision_academica/2024/05/resolucion_{i}.pdf', ContentFile(self.CONTENIDO))
+            anteriores.append(nombre)
+            ArchivoComisionAcademica.objects.create(
+                seguimiento=seguimiento, archivo=nombre, nombre_original='resolucion.pdf',
+                tamaño=len(self.CONTENIDO), tipo_mime='application/pdf',
+            )
+        
+        salida = StringIO()
+        call_command('deduplicar_archivos_ca', stdout=salida)
+        self.assertIn('2 archivos migrados a 1 contenidos únicos; 2 archivos anteriores eliminados', salida.getvalue())
+        self.assertEqual(
+            set(ArchivoComisionAcademica.objects.values_list('archivo', flat=True)),
+            {f'comision_academica/sha256/{hashlib.sha256(self.CONTENIDO).hexdigest()[:2]}/'
+             f'{hashlib.sha256(self.CONTENIDO).hexdigest()}'},
+        )
+        self.assertFalse(any(default_storage.exists(nombre) for nombre in anteriores))
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, SUBIDAS_TAMAÑO_FRAGMENTO=16)
+class SubidaFragmentosTests(TestCase):
+    CONTENIDO = b'%PDF-1.4 acta de comision academica'
+    
+    def setUp(self):
+        crear_rediseño()
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        self.seguimiento = SeguimientoFase.objects.get(fase__codigo='CA')
+        self.usuario = get_user_model().objects.create_user('gestor', password='clave', rol='gestor')
+        self.client.force_login(self.usuario)
+    
+    def iniciar(self, nombre='acta.pdf', tamaño=None):
+        return self.client.post(
+            reverse('curricular:iniciar_subida_ca', args=[self.seguimiento.pk]),
+            {'nombre': nombre, 'tamaño': len(self.CONTENIDO) if tamaño is None else tamaño},
+            secure=True,
+        )
+    
+    def enviar(self, url, offset, fragmento):
+        return self.client.post(
+            url, data=fragmento, content_type='application/octet-stream',
+            headers={'X-Subida-Offset': str(offset)}, secure=True,
+        )
+    
+    def test_valida_antes_de_recibir_contenido(self):
+        self.assertEqual(self.iniciar(nombre='virus.exe').status_code, 400)
+        self.assertEqual(self.iniciar(tamaño=51 * 1024 * 1024).status_code, 400)
+        self.assertFalse(SubidaParcial.objects.exists())
+    
+    def test_subida_completa_por_fragmentos(self):
+        datos = self.iniciar().json()
+        url = datos['url']
+        
+        respuesta = self.enviar(url, 0, self.CONTENIDO[:16])
+        self.assertEqual(respuesta.json()['recibido'], 16)
+        
+        # Un offset desfasado se rechaza informando dónde reanudar
+        respuesta = self.enviar(url, 0, self.CONTENIDO[:16])
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['recibido'], 16)
+        self.assertEqual(self.client.get(url, secure=True).json()['recibido'], 16)
+        
+        self.enviar(url, 16, self.CONTENIDO[16:32])
+        subida = SubidaParcial.objects.get()
+        ruta = ruta_parcial(subida)
+        respuesta = self.enviar(url, 32, self.CONTENIDO[32:])
+        
+        self.assertEqual(respuesta.status_code, 201)
+        archivo = ArchivoComisionAcademica.objects.get(pk=respuesta.json()['archivo_id'])
+        self.assertEqual(archivo.seguimiento, self.seguimiento)
+        self.assertEqual(archivo.tipo_mime, 'application/pdf')
+        self.assertEqual(archivo.digest, hashlib.sha256(self.CONTENIDO).hexdigest())
+        with archivo.archivo.open('rb') as contenido:
+            self.assertEqual(contenido.read(), self.CONTENIDO)
+        self.assertFalse(SubidaParcial.objects.exists())
+        self.assertFalse(os.path.exists(ruta))
+    
+    def test_fragmento_mayor_al_permitido(self):
+        url = self.iniciar().json()['url']
+        respuesta = self.enviar(url, 0, self.CONTENIDO[:17])
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['recibido'], 0)
+    
+    def test_fragmento_se_recibe_fuera_de_la_transaccion(self):
+        self.iniciar()
+        subida = SubidaParcial.objects.get()
+        flujo = BytesIO(self.CONTENIDO[:16])
+        leer = flujo.read
+        
+        def leer_sin_bloqueo(tamaño):
+            self.assertFalse(any('SAVEPOINT' in consulta['sql'] for consulta in consultas.captured_queries))
+            return leer(tamaño)
+        
+        flujo.read = leer_sin_bloqueo
+        with CaptureQueriesContext(connection) as consultas:
+            recibir_fragmento(subida.pk, 0, flujo, 16)
+        self.assertTrue(any('SAVEPOINT' in consulta['sql'] for consulta in consultas.captured_queries))
+        self.assertEqual(SubidaParcial.objects.get().recibido, 16)
+    
+    def test_fragmento_concurrente_se_rechaza_al_bloquear(self):
+        self.iniciar()
+        subida = SubidaParcial.objects.get()
+        flujo = BytesIO(self.CONTENIDO[:16])
+        leer = flujo.read
+        
+        def leer_mientras_otro_agrega(tamaño):
+            SubidaParcial.objects.filter(pk=subida.pk).update(recibido=16)
+            return leer(tamaño)
+        
+        flujo.read = leer_mientras_otro_agrega
+        with self.assertRaises(FragmentoInvalido):
+            recibir_fragmento(subida.pk, 0, flujo, 16)
+        self.assertEqual(os.path.getsize(ruta_parcial(subida)), 0)
+    
+    def test_subida_de_otro_usuario(self):
+        url = self.iniciar().json()['url']
+        otro = get_user_model().objects.create_user('otro', password='clave', rol='gestor')
+        self.client.force_login(otro)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS)
+class PaqueteArchivosTests(TestCase):
+    def setUp(self):
+        rediseños = [crear_rediseño(nombre=nombre) for nombre in ('Derecho', 'Medicina')]
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        self.rediseño = rediseños[0]
+        self.archivos = {
+            'acta.pdf': b'%PDF-1.4 acta' * 100,
+            'plan.docx': b'PK contenido docx',
+        }
+        for rediseño in rediseños:
+            seguimiento = rediseño.seguimientos.get(fase__codigo='CA')
+            for nombre, contenido in self.archivos.items():
+                archivo = ArchivoComisionAcademica(
+                    seguimiento=seguimiento, nombre_original=nombre,
+                    tamaño=len(contenido), tipo_mime='application/octet-stream',
+                )
+                archivo.archivo.save(nombre, ContentFile(contenido))
+        usuario = get_user_model().objects.create_user('lector', password='clave')
+        self.client.force_login(usuario)
+    
+    def descargar(self, url):
+        respuesta = self.client.get(url, secure=True)
+        self.assertEqual(respuesta['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(BytesIO(b''.join(respuesta.streaming_content)))
+    
+    def test_zip_del_rediseño(self):
+        paquete = self.descargar(reverse('curricular:paquete_rediseño_ca', args=[self.rediseño.pk]))
+        self.assertIsNone(paquete.testzip())
+        
+        carpeta = f'{self.rediseño.año}/Potosí/Derecho/'
+        self.assertEqual(sorted(paquete.namelist()), [carpeta + 'acta.pdf', carpeta + 'plan.docx'])
+        self.assertEqual(paquete.read(carpeta + 'acta.pdf'), self.archivos['acta.pdf'])
+        self.assertEqual(paquete.getinfo(carpeta + 'acta.pdf').compress_type, zipfile.ZIP_DEFLATED)
+        self.assertEqual(paquete.getinfo(carpeta + 'plan.docx').compress_type, zipfile.ZIP_STORED)
+    
+    def test_zip_de_la_sede_y_del_año(self):
+        sede = self.rediseño.carrera.sede
+        for url in (
+            reverse('curricular:paquete_sede_ca', args=[sede.pk]),
+            reverse('curricular:paquete_año_ca', args=[self.rediseño.año]),
+        ):
+            paquete = self.descargar(url)
+            self.assertEqual(len(paquete.namelist()), 4)
+    
+    def test_nombres_repetidos(self):
+        seguimiento = self.rediseño.seguimientos.get(fase__codigo='CA')
+        archivo = ArchivoComisionAcademica(
+            seguimiento=seguimiento, nombre_original='acta.pdf', tamaño=4, tipo_mime='application/pdf',
+        )
+        archivo.archivo.save('acta.pdf', ContentFile(b'otra'))
+        
+        paquete = self.descargar(reverse('curricular:paquete_rediseño_ca', args=[self.rediseño.pk]))
+        self.assertIn(f'{self.rediseño.año}/Potosí/Derecho/acta (2).pdf', paquete.namelist())
+    
+    def test_rediseño_inexistente(self):
+        respuesta = self.client.get(reverse('curricular:paquete_rediseño_ca', args=[999]), secure=True)
+        self.assertEqual(respuesta.status_code, 404)
+
+@override_settings(MEDIA_ROOT=MEDIA_PRUEBAS, REPORTES_EJECUCION_SINCRONA=True)
+class ProcesamientoArchivosTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño(nombre='Derecho')
+        Fase.objects.filter(numero=10).update(codigo='CA')
+        self.seguimiento = self.rediseño.seguimientos.get(fase__codigo='CA')
+        usuario = get_user_model().objects.create_user('gestor', password='clave', rol='gestor')
+        self.client.force_login(usuario)
+    
+    def subir(self, nombre, contenido, content_type='application/octet-stream'):
+        self.client.post(
+            reverse('curricular:subir_archivo_ca', args=[self.seguimiento.pk]),
+            {'archivo': SimpleUploadedFile(nombre, contenido, content_type)},
+            secure=True,
+        )
+        return self.seguimiento.archivos.latest('pk')
+    
+    def pdf_escaneado(self):
+        from PIL import Image
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.utils import ImageReader
+        
+        imagen = BytesIO()
+        Image.new('RGB', (600, 800), 'white').save(imagen, 'JPEG')
+        imagen.seek(0)
+        pdf = BytesIO()
+        lienzo = canvas.Canvas(pdf)
+        lienzo.drawImage(ImageReader(imagen), 0, 0, 595, 842)
+        lienzo.drawString(72, 720, 'Resolución del Consejo de Carrera')
+        lienzo.showPage()
+        lienzo.drawString(72, 720, 'Anexo de jurisprudencia')
+        lienzo.save()
+        return pdf.getvalue()
+    
+    def test_pdf(self):
+        archivo = self.subir('resolucion.pdf', self.pdf_escaneado(), 'application/x-unknown')
+        
+        self.assertEqual(archivo.estado_procesamiento, 'completado')
+        self.assertEqual(archivo.tipo_mime, 'application/pdf')
+        self.assertEqual(archivo.paginas, 2)
+        self.assertIn('Resolución del Consejo de Carrera', archivo.texto_extraido)
+        self.assertTrue(archivo.miniatura)
+        self.assertEqual(buscar_carreras('jurisprudencia'), [self.rediseño.carrera_id])
+        
+        respuesta = self.client.get(reverse('curricular:miniatura_archivo_ca', args=[archivo.pk]), secure=True)
+        self.assertEqual(respuesta['Content-Type'], 'image/jpeg')
+        respuesta = self.client.get(reverse('curricular:detalle_rediseño', args=[self.rediseño.pk]), secure=True)
+        self.assertContains(respuesta, '2 páginas')
+    
+    def test_pdf_con_fuente_incrustada(self):
+        from PIL import Image
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.utils import ImageReader
+        
+        # Las fuentes TrueType se incrustan como subconjunto con /ToUnicode
+        pdfmetrics.registerFont(TTFont('Vera', 'Vera.ttf'))
+        imagen = BytesIO()
+        Image.new('RGB', (60, 80), 'white').save(imagen, 'JPEG')
+        imagen.seek(0)
+        pdf = BytesIO()
+        lienzo = canvas.Canvas(pdf)
+        lienzo.setFont('Vera', 12)
+        lienzo.drawString(72, 720, 'Resolución académica Nº 15')
+        lienzo.showPage()
+        lienzo.drawImage(ImageReader(imagen), 0, 0, 595, 842)
+        lienzo.save()
+        
+        tipo_mime, texto, paginas, miniatura = procesamiento.analizar(pdf.getvalue(), 'resolucion.pdf')
+        self.assertEqual((tipo_mime, texto, paginas), ('application/pdf', 'Resolución académica Nº 15', 2))
+        # La miniatura sale solo de una imagen de la primera página
+        self.assertIsNone(miniatura)
+    
+    def test_pdf_patologico_en_tiempo_acotado(self):
+        # Miles de objetos sin endobj ni tabla xref
+        datos = b'%PDF-1.4\n' + b'1 0 obj\n<< /Type /Page ' * 20_000
+        inicio = time.perf_counter()
+        with self.assertLogs('pypdf', 'WARNING'):
+            resultado = procesamiento.analizar(datos, 'roto.pdf')
+        self.assertLess(time.perf_counter() - inicio, 5)
+        self.assertEqual(resultado, ('application/pdf', '', None, None))
+    
+    def test_docx(self):
+        documento = BytesIO()
+        with zipfile.ZipFile(documento, 'w') as paquete:
+            paquete.writestr('[Content_Types].xml', '<Types/>')
+            paquete.writestr('word/document.xml', (
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                '<w:body><w:p><w:r><w:t>Plan de </w:t></w:r><w:r><w:t>estudios</w:t></w:r></w:p></w:body>'
+                '</w:document>'
+            ))
+            paquete.writestr('docProps/app.xml', (
+                '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+                '<Pages>7</Pages></Properties>'
+            ))
+        archivo = self.subir('plan.docx', documento.getvalue())
+        
+        self.assertEqual(archivo.tipo_mime, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
+        self.assertEqual(archivo.texto_extraido, 'Plan de estudios')
+        self.assertEqual(archivo.paginas, 7)
+        self.assertFalse(archivo.miniatura)
+    
+    def test_tipo_real_y_contenido_repetido(self):
+        primero = self.subir('acta.pdf', b'Texto plano con extension falsa', 'application/pdf')
+        self.assertEqual(primero.tipo_mime, 'text/plain')
+        
+        # El mismo contenido reutiliza el resultado sin volver a leerlo
+        with mock.patch('curricular.procesamiento.analizar') as analizar:
+            segundo = self.subir('copia.pdf', b'Texto plano con extension falsa', 'application/pdf')
+        analizar.assert_not_called()
+        self.assertEqual(segundo.tipo_mime, 'text/plain')
+        self.assertEqual(segundo.texto_extraido, primero.texto_extraido)
+    
+    @mock.patch('curricular.procesamiento.LIMITE_DESCOMPRIMIDO', 1024)
+    def test_bombas_de_descompresion(self):
+        flujo = zlib.compress(b'0' * 4096)
+        pdf = (
+            b'%%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n'
+            b'2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n'
+            b'3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R >>\nendobj\n'
+            b'4 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream\nendobj\n'
+            b'trailer\n<< /Root 1 0 R >>\nstartxref\n0\n%%%%EOF\n'
+        ) % (len(flujo), flujo)
+        documento = BytesIO()
+        with zipfile.ZipFile(documento, 'w', zipfile.ZIP_DEFLATED) as paquete:
+            paquete.writestr('word/document.xml', '<w:document>' + ' ' * 4096 + '</w:document>')
+        
+        for nombre, contenido in (('bomba.pdf', pdf), ('bomba.docx', documento.getvalue())):
+            with self.subTest(nombre=nombre), self.assertLogs('curricular.procesamiento', 'ERROR'):
+                archivo = self.subir(nombre, contenido)
+            self.assertEqual(archivo.estado_procesamiento, 'fallido')
+            self.assertIn('descomprimido supera 1024 bytes', archivo.error_procesamiento)
+    
+    @mock.patch('curricular.procesamiento.TAMAÑO_MAXIMO_ARCHIVO_CA', 1024)
+    def test_archivo_mayor_al_limite_de_lectura(self):
+        with self.assertLogs('curricular.procesamiento', 'ERROR'):
+            archivo = self.subir('notas.txt', b'texto ' * 500)
+        self.assertEqual(archivo.estado_procesamiento, 'fallido')
+        self.assertIn('supera 1024 bytes', archivo.error_procesamiento)
+    
+    def test_error_de_procesamiento(self):
+        with mock.patch('curricular.procesamiento.analizar', side_effect=ValueError('dañado')), \
+                self.assertLogs('curricular.procesamiento', 'ERROR'):
+            archivo = self.subir('acta.pdf', b'%PDF-1.4')
+        self.assertEqual(archivo.estado_procesamiento, 'fallido')
+        
+        respuesta = self.client.get(reverse('curricular:detalle_rediseño', args=[self.rediseño.pk]), secure=True)
+        self.assertContains(respuesta, 'Error al procesar')
+        
+        call_command('procesar_archivos_ca', stdout=StringIO())
+        archivo.refresh_from_db()
+        self.assertEqual(archivo.estado_procesamiento, 'completado')
+
+@override_settings(INSTRUMENTACION_ACTIVA=True, INSTRUMENTACION_MUESTREO=1.0)
+class InstrumentacionTests(TestCase):
+    def setUp(self):
+        instrumentacion.reiniciar()
+        self.rediseño = crear_rediseño()
+        self.admin = get_user_model().objects.create_user('admin', password='clave', is_staff=True)
+        self.client.force_login(self.admin)
+    
+    def test_server_timing_y_resumen(self):
+        url = reverse('curricular:detalle_rediseño', args=[self.rediseño.pk])
+        respuesta = self.client.get(url, secure=True)
+        self.assertRegex(respuesta['Server-Timing'], r'^app;dur=[\d.]+, sql;dur=[\d.]+;desc="\d+ consultas"')
+        
+        resumen = self.client.get(reverse('curricular:estadisticas_instrumentacion'), secure=True).json()
+        vista = next(datos for datos in resumen['vistas'] if datos['vista'] == 'curricular:detalle_rediseño')
+        self.assertEqual(vista['peticiones'], 1)
+        self.assertGreater(vista['consultas']['maximo'], 0)
+    
+    def test_detecta_consultas_repetidas(self):
+        with instrumentacion.MedicionConsultas() as medicion:
+            for seguimiento in SeguimientoFase.objects.all():
+                seguimiento.rediseño.carrera
+        _, (sql, veces) = medicion.duplicadas()
+        self.assertEqual(veces, 12)
+        self.assertIn('curricular_rediseñocurricular', sql)
+    
+    @override_settings(INSTRUMENTACION_MUESTREO=0.0)
+    def test_peticiones_no_muestreadas(self):
+        respuesta = self.client.get(reverse('curricular:dashboard'), secure=True)
+        self.assertNotIn('sql;', respuesta['Server-Timing'])
+        
+        resumen = self.client.get(reverse('curricular:estadisticas_instrumentacion'), secure=True).json()
+        vista = next(datos for datos in resumen['vistas'] if datos['vista'] == 'curricular:dashboard')
+        self.assertEqual(vista['muestras_sql'], 0)
+    
+    def test_server_timing_solo_para_el_personal(self):
+        url = reverse('curricular:dashboard')
+        self.client.logout()
+        self.assertNotIn('Server-Timing', self.client.get(url, secure=True))
+        
+        self.client.force_login(get_user_model().objects.create_user('lector', password='clave'))
+        self.assertNotIn('Server-Timing', self.client.get(url, secure=True))
+        with self.settings(INSTRUMENTACION_SERVER_TIMING_PUBLICO=True):
+            self.assertIn('Server-Timing', self.client.get(url, secure=True))
+        
+        # Las peticiones se siguen registrando aunque no lleven el encabezado
+        resumen = instrumentacion.resumen()
+        vista = next(datos for datos in resumen['vistas'] if datos['vista'] == 'curricular:dashboard')
+        self.assertEqual(vista['peticiones'], 3)
+    
+    def test_solo_personal_administrativo(self):
+        usuario = get_user_model().objects.create_user('lector', password='clave')
+        self.client.force_login(usuario)
+        respuesta = self.client.get(reverse('curricular:estadisticas_instrumentacion'), secure=True)
+        self.assertEqual(respuesta.status_code, 302)
+
+class ApiDatosTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño()
+        usuario = get_user_model().objects.create_user('lector', password='clave')
+        self.client.force_login(usuario)
+    
+    def get(self, nombre, **kwargs):
+        return self.client.get(reverse(f'curricular:{nombre}'), secure=True, **kwargs)
+    
+    def test_campos_y_filtros(self):
+        respuesta = self.client.get(
+            reverse('curricular:api_seguimientos'),
+            {'campos': 'id,fase_codigo,completado', 'rediseño': self.rediseño.pk, 'fase': 'F3'},
+            secure=True,
+        )
+        self.assertEqual(respuesta.json()['resultados'], [
+            {'id': self.rediseño.seguimientos.get(fase__codigo='F3').pk, 'fase_codigo': 'F3', 'completado': False}
+        ])
+        
+        respuesta = self.client.get(
+            reverse('curricular:api_datos_carreras'), {'campos': 'nombre,sede'}, secure=True
+        )
+        self.assertEqual(respuesta.json()['resultados'], [{'nombre': 'Ingeniería Informática', 'sede': 'Potosí'}])
+    
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(
+            reverse('curricular:api_rediseños'), {'campos': 'id,clave'}, secure=True
+        ).status_code, 400)
+        self.assertEqual(self.client.get(
+            reverse('curricular:api_rediseños'), {'año': 'dos mil'}, secure=True
+        ).status_code, 400)
+    
+    def test_paginacion(self):
+        primera = self.client.get(reverse('curricular:api_seguimientos'), {'limite': 5}, secure=True).json()
+        self.assertEqual(len(primera['resultados']), 5)
+        segunda = self.client.get(primera['url_siguiente'], secure=True).json()
+        self.assertGreater(segunda['resultados'][0]['id'], primera['resultados'][-1]['id'])
+    
+    def test_etag_debil_con_una_consulta(self):
+        respuesta = self.get('api_rediseños')
+        etag = respuesta['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        
+        with self.assertNumQueries(3):  # sesión, usuario y agregación
+            respuesta = self.get('api_rediseños', headers={'If-None-Match': etag})
+        self.assertEqual(respuesta.status_code, 304)
+        
+        # Una actualización en lote cambia el ETag aunque no toque actualizado_el
+        self.rediseño.seguimientos.filter(fase__numero=1).update(completado=True)
+        self.assertEqual(self.get('api_rediseños', headers={'If-None-Match': etag}).status_code, 200)
+    
+    def test_etag_de_catalogos(self):
+        etag = self.get('api_sedes')['ETag']
+        self.assertEqual(self.get('api_sedes', headers={'If-None-Match': etag}).status_code, 304)
+        
+        Sede.objects.update(telefono='62-27300')
+        self.assertEqual(self.get('api_sedes', headers={'If-None-Match': etag}).status_code, 200)
+
+class HistorialCambiosTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño()
+        self.seguimiento = self.rediseño.seguimientos.get(fase__numero=1)
+        self.usuario = get_user_model().objects.create_user(
+            'gestor', password='clave', rol='gestor', is_staff=True, is_superuser=True
+        )
+        self.client.force_login(self.usuario)
+    
+    def cambios(self, **parametros):
+        return self.client.get(reverse('curricular:api_cambios'), parametros, secure=True).json()
+    
+    def test_formulario_registra_antes_y_despues(self):
+        self.client.post(reverse('curricular:actualizar_fase', args=[self.seguimiento.pk]), {
+            'completado': 'on', 'fecha_inicio': '2025-03-01', 'observaciones': '',
+            'medio_verificacion': '',
+        }, secure=True)
+        
+        cambio = CambioSeguimiento.objects.get()
+        self.assertEqual(cambio.origen, 'formulario')
+        self.assertEqual(cambio.usuario, self.usuario)
+        self.assertEqual(cambio.antes, {'completado': False, 'fecha_inicio': None})
+        self.assertEqual(cambio.despues, {'completado': True, 'fecha_inicio': '2025-03-01'})
+    
+    def test_guardar_sin_cambios_no_registra(self):
+        seguimiento = SeguimientoFase.objects.get(pk=self.seguimiento.pk)
+        seguimiento.save()
+        self.assertFalse(CambioSeguimiento.objects.exists())
+    
+    def test_admin_y_lote(self):
+        self.client.post(reverse('admin:curricular_seguimientofase_change', args=[self.seguimiento.pk]), {
+            'rediseño': self.rediseño.pk, 'fase': self.seguimiento.fase_id,
+            'observaciones': 'Revisado por DUEA', 'medio_verificacion': '',
+        }, secure=True)
+        SeguimientoFase.objects.filter(rediseño=self.rediseño, fase__numero__lte=3).actualizar_en_lote(
+            {self.rediseño.pk: {'completado': True}}, self.usuario
+        )
+        
+        origenes = list(CambioSeguimiento.objects.values_list('origen', 'usuario_id'))
+        self.assertEqual(origenes, [('admin', self.usuario.pk)] + [('lote', self.usuario.pk)] * 3)
+    
+    def test_cambios_desde_cursor(self):
+        SeguimientoFase.objects.filter(pk=self.seguimiento.pk).update(observaciones='Primera')
+        inicial = self.cambios()
+        self.assertEqual([cambio['despues'] for cambio in inicial['cambios']], [{'observaciones': 'Primera'}])
+        
+        SeguimientoFase.objects.filter(pk=self.seguimiento.pk).update(observaciones='Segunda')
+        SeguimientoFase.objects.filter(pk=self.seguimiento.pk).update(observaciones='Segunda')
+        nuevos = self.cambios(desde=inicial['cursor'])
+        self.assertEqual([cambio['antes'] for cambio in nuevos['cambios']], [{'observaciones': 'Primera'}])
+        self.assertEqual(self.cambios(desde=nuevos['cursor'])['cambios'], [])
+        self.assertEqual(self.cambios(desde='ultimo')['cursor'], nuevos['cursor'])
+        
+        pagina = self.cambios(limite=1)
+        self.assertTrue(pagina['hay_mas'])
+    
+    def test_parametros_invalidos(self):
+        url = reverse('curricular:api_cambios')
+        self.assertEqual(self.client.get(url, {'rediseño': 'abc'}, secure=True).status_code, 400)
+        self.assertEqual(self.client.get(url, {'desde': 'abc'}, secure=True).status_code, 400)
+        self.assertEqual(self.cambios(rediseño=self.seguimiento.rediseño_id)['cambios'], [])
+
+class BusquedaTests(TestCase):
+    def setUp(self):
+        self.rediseño = crear_rediseño(nombre='Ingeniería Civil')
+        crear_rediseño(nombre='Derecho')
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(usuario)
+    
+    def test_busqueda_sin_acentos(self):
+        self.assertEqual(buscar_carreras('ingenieria'), [self.rediseño.carrera_id])
+        self.assertEqual(buscar_carreras('INGENIERÍA civ'), [self.rediseño.carrera_id])
+        self.assertEqual(buscar_carreras('ciencias puras'), buscar_carreras('Ciencias Puras'))
+        self.assertEqual(buscar_carreras('medicina'), [])
+    
+    def test_indexacion_incremental_de_observaciones(self):
+        seguimiento = self.rediseño.seguimientos.first()
+        seguimiento.medio_verificacion = 'Resolución del Consejo Facultativo'
+        seguimiento.save()
+        self.assertEqual(buscar_carreras('resolucion'), [self.rediseño.carrera_id])
+        
+        seguimiento.medio_verificacion = ''
+        seguimiento.save()
+        self.assertEqual(buscar_carreras('resolucion'), [])
+        
+        self.rediseño.observaciones = 'Pendiente la mesa multisectorial'
+        self.rediseño.save()
+        self.assertEqual(buscar_carreras('multisectorial'), [self.rediseño.carrera_id])
+    
+    def test_guardar_sin_cambiar_el_texto_no_reindexa(self):
+        seguimiento = SeguimientoFase.objects.get(pk=self.rediseño.seguimientos.first().pk)
+        seguimiento.completado = True
+        with CaptureQueriesContext(connection) as consultas:
+            seguimiento.save()
+        self.assertFalse([c for c in consultas if 'curricular_indicebusqueda' in c['sql']])
+        
+        seguimiento.observaciones = 'Acta de la comisión'
+        seguimiento.save()
+        seguimiento.observaciones = 'Acta de la comisión revisada'
+        with CaptureQueriesContext(connection) as consultas:
+            seguimiento.save()
+        self.assertEqual(len([c for c in consultas if 'curricular_indicebusqueda' in c['sql']]), 1)
+        self.assertEqual(buscar_carreras('revisada'), [self.rediseño.carrera_id])
+    
+    def test_actualizacion_en_lote_reindexa(self):
+        self.rediseño.seguimientos.filter(fase__codigo='F1').update(observaciones='Informe de autoevaluación')
+        self.assertEqual(buscar_carreras('autoevaluacion'), [self.rediseño.carrera_id])
+    
+    @override_settings(BUSQUEDA_LIMITE=1)
+    def test_lista_avisa_busqueda_limitada(self):
+        response = self.client.get(reverse('curricular:lista_carreras'), {'buscar': 'ciencias'}, secure=True)
+        self.assertTrue(response.context['busqueda_limitada'])
+        self.assertContains(response, 'precise la búsqueda')
+        
+        response = self.client.get(reverse('curricular:lista_carreras'), {'buscar': 'civil'}, secure=True)
+        self.assertFalse(response.context['busqueda_limitada'])
+    
+    def test_renombrar_facultad_reindexa_carreras(self):
+        facultad = self.rediseño.carrera.facultad
+        facultad.nombre = 'Facultad de Tecnología'
+        facultad.save()
+        self.assertEqual(len(buscar_carreras('tecnologia')), 2)
+    
+    def test_limite_cuenta_carreras_distintas(self):
+        for seguimiento in self.rediseño.seguimientos.all():
+            seguimiento.observaciones = 'Ciencias, ciencias'
+            seguimiento.save()
+        derecho = Carrera.objects.get(nombre='Derecho')
+        for motor in ('curricular.busqueda.MotorFTS5', 'curricular.busqueda.MotorBasico'):
+            with self.subTest(motor=motor), override_settings(BUSQUEDA_MOTOR=motor):
+                obtener_motor.cache_clear()
+                self.assertEqual(len(buscar_carreras('ciencias', limite=2)), 2)
+                self.assertIn(derecho.pk, buscar_carreras('ciencias', limite=2))
+        obtener_motor.cache_clear()
+    
+    def test_lista_carreras(self):
+        response = self.client.get(reverse('curricular:lista_carreras'), {'buscar': 'ingenieria'}, secure=True)
+        self.assertEqual([c.nombre for c in response.context['page_obj']], ['Ingeniería Civil'])
+    
+    def test_reindexar_busqueda(self):
+        IndiceBusqueda.objects.all().delete()
+        call_command('reindexar_busqueda', stdout=StringIO())
+        self.assertEqual(buscar_carreras('derecho'), [Carrera.objects.get(nombre='Derecho').pk])
+
+
+class PaginacionCursorTests(TestCase):
+    def setUp(self):
+        facultades = [Facultad.objects.create(nombre=f'Facultad {letra}') for letra in 'AB']
+        for sede in [Sede.objects.create(nombre='Potosí'), Sede.objects.create(nombre='Tupiza')]:
+            for facultad in facultades:
+                for i in range(12):
+                    Carrera.objects.create(sede=sede, facultad=facultad, nombre=f'Carrera {i:02d}')
+        self.esperadas = list(Carrera.objects.order_by('sede__nombre', 'facultad__nombre', 'nombre').values_list('pk', flat=True))
+        usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(usuario)
+    
+    def test_api_recorre_todas_las_carreras(self):
+        obtenidas = []
+        url = reverse('curricular:api_carreras') + '?limite=10'
+        while url:
+            with self.assertNumQueries(3):
+                datos = self.client.get(url, secure=True).json()
+            obtenidas += [carrera['id'] for carrera in datos['resultados']]
+            url = datos['url_siguiente']
+        self.assertEqual(obtenidas, self.esperadas)
+    
+    def test_api_con_filtros(self):
+        sede = Sede.objects.get(nombre='Tupiza')
+        datos = self.client.get(reverse('curricular:api_carreras'), {'sede': sede.pk, 'limite': 100}, secure=True).json()
+        self.assertEqual(len(datos['resultados']), 24)
+        self.assertIsNone(datos['siguiente'])
+    
+    def test_vista_html_con_cursor(self):
+        url = reverse('curricular:lista_carreras')
+        obtenidas = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(url, {'cursor': cursor}, secure=True)
+            self.assertIsNone(response.context['page_obj'])
+            obtenidas += [carrera.pk for carrera in response.context['carreras']]
+            cursor = response.context['pagina_cursor'].siguiente
+        self.assertEqual(obtenidas, self.esperadas)
+    
+    def test_cursor_invalido_retorna_primera_pagina(self):
+        datos = self.client.get(reverse('curricular:api_carreras'), {'cursor': 'no-es-un-cursor'}, secure=True).json()
+        self.assertEqual(datos['resultados'][0]['id'], self.esperadas[0])
+    
+    def test_cursor_con_valores_de_otro_tipo_retorna_primera_pagina(self):
+        for valores in (['a', 'b', 'c', 'abc'], ['a', 'b', 'c', {'id': 1}], ['a', 'b', None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+            with self.subTest(valores=valores):
+                datos = self.client.get(reverse('curricular:api_carreras'), {'cursor': cursor}, secure=True).json()
+                self.assertEqual(datos['resultados'][0]['id'], self.esperadas[0])
+                response = self.client.get(reverse('curricular:lista_carreras'), {'cursor': cursor}, secure=True)
+                self.assertEqual(next(iter(response.context['carreras'])).pk, self.esperadas[0])
+
+
+class CacheDashboardTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño = crear_rediseño()
+        self.usuario = get_user_model().objects.create_user('revisor', password='clave')
+        self.client.force_login(self.usuario)
+        self.url = reverse('curricular:dashboard')
+        cache.clear()
+    
+    def test_agregados_y_fragmentos_desde_cache(self):
+        self.client.get(self.url, secure=True)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, secure=True)
+        self.assertContains(response, 'Ingeniería Informática')
+        self.assertEqual(response.context['total_carreras'], 1)
+    
+    def test_cambios_invalidan_la_cache(self):
+        self.client.get(self.url, secure=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño.seguimientos.update(completado=True)
+        response = self.client.get(self.url, secure=True)
+        self.assertContains(response, '100%')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_rediseño(nombre='Derecho')
+        response = self.client.get(self.url, secure=True)
+        self.assertEqual(response.context['total_carreras'], 2)
+    
+    def test_version_cambia_una_vez_al_confirmar(self):
+        antes = cache_datos.version_datos()
+        with self.captureOnCommitCallbacks(execute=True):
+            crear_rediseño(nombre='Derecho')
+            self.rediseño.seguimientos.update(completado=True)
+            # Hasta confirmar, otra solicitud que lea las filas anteriores las guarda con la versión anterior
+            self.assertEqual(cache_datos.version_datos(), antes)
+        self.assertEqual(cache_datos.version_datos(), antes + 1)
+    
+    def test_estadisticas_de_aciertos(self):
+        self.client.get(self.url, secure=True)
+        self.client.get(self.url, secure=True)
+        url = reverse('curricular:estadisticas_cache')
+        self.assertEqual(self.client.get(url, secure=True).status_code, 302)
+        
+        self.usuario.is_staff = True
+        self.usuario.save()
+        datos = self.client.get(url, secure=True).json()
+        self.assertEqual((datos['aciertos'], datos['fallos']), (2, 2))
+        self.assertEqual(datos['tasa_aciertos'], 0.5)
+
+
+class ProgresoEnVivoTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño = crear_rediseño()
+        self.usuario = get_user_model().objects.create_user('coordinador', password='clave')
+        self.url = reverse('curricular:eventos_progreso')
+        parche = mock.patch.object(eventos, 'difusor', eventos.Difusor(historial=2, capacidad=2))
+        self.difusor = parche.start()
+        self.addCleanup(parche.stop)
+    
+    def capturar_publicaciones(self):
+        """Datos de cada evento publicado al confirmar las transacciones"""
+        datos = []
+        parche = mock.patch.object(
+            self.difusor, 'publicar', side_effect=lambda tipo, calcular: datos.append(calcular())
+        )
+        parche.start()
+        self.addCleanup(parche.stop)
+        return datos
+    
+    def test_difusor_reparte_y_descarta_lo_mas_antiguo(self):
+        async def escenario():
+            uno, dos = self.difusor.suscribir(), self.difusor.suscribir()
+            for numero in range(3):
+                await asyncio.to_thread(self.difusor.publicar, 'progreso', lambda: {'numero': numero})
+            await asyncio.sleep(0)
+            return [[cola.get_nowait() for _ in range(cola.qsize())] for cola in (uno, dos)]
+        
+        uno, dos = asyncio.run(escenario())
+        self.assertEqual(uno, dos)
+        self.assertEqual(uno[0], b'id: 2\nevent: progreso\ndata: {"numero": 1}\n\n')
+        self.assertEqual([mensaje[:5] for mensaje in uno], [b'id: 2', b'id: 3'])
+    
+    def test_reconexion_reenvia_lo_perdido_o_pide_recargar(self):
+        async def escenario():
+            self.difusor.suscribir()
+            for _ in range(3):
+                self.difusor.publicar('progreso', dict)
+            colas = [self.difusor.suscribir(ultimo_id) for ultimo_id in (2, 3, 0, 99)]
+            return [[cola.get_nowait() for _ in range(cola.qsize())] for cola in colas]
+        
+        reconectado, al_dia, atrasado, reiniciado = asyncio.run(escenario())
+        self.assertEqual([mensaje[:5] for mensaje in reconectado], [b'id: 3'])
+        self.assertEqual(al_dia, [])
+        self.assertIn(b'event: recargar', atrasado[0])
+        self.assertIn(b'event: recargar', reiniciado[0])
+    
+    def test_sin_suscriptores_no_calcula(self):
+        calcular = mock.Mock()
+        self.assertIsNone(self.difusor.publicar('progreso', calcular))
+        calcular.assert_not_called()
+    
+    def test_una_transaccion_publica_un_solo_evento(self):
+        publicados = self.capturar_publicaciones()
+        primera, segunda = self.rediseño.seguimientos.order_by('fase__orden')[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            for seguimiento in (primera, segunda):
+                seguimiento.completado = True
+                seguimiento.save()
+        
+        self.assertEqual(len(publicados), 1)
+        datos = publicados[0]
+        self.assertEqual(datos['totales']['total_rediseños'], 1)
+        self.assertEqual(datos['rediseños'], [{
+            'id': self.rediseño.pk, 'estado': 'en_proceso',
+            'fases_completadas': 2, 'fases_totales': 12, 'progreso': 16,
+        }])
+        self.assertEqual({fase['id'] for fase in datos['fases']}, {primera.pk, segunda.pk})
+        self.assertTrue(all(fase['completado'] for fase in datos['fases']))
+    
+    def test_transaccion_revertida_no_se_publica(self):
+        publicados = self.capturar_publicaciones()
+        primera, segunda = self.rediseño.seguimientos.order_by('fase__orden')[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                primera.completado = True
+                primera.save()
+                raise RuntimeError
+            segunda.completado = True
+            segunda.save()
+        
+        self.assertEqual(len(publicados), 1)
+        self.assertEqual([fase['id'] for fase in publicados[0]['fases']], [segunda.pk])
+    
+    def test_solo_los_cambios_de_estado_se_publican(self):
+        publicados = self.capturar_publicaciones()
+        seguimiento = self.rediseño.seguimientos.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            seguimiento.observaciones = 'Revisado'
+            seguimiento.save()
+        self.assertEqual(publicados, [])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rediseño.seguimientos.update(completado=True)
+        self.assertEqual(len(publicados), 1)
+        self.assertEqual(publicados[0]['rediseños'][0]['progreso'], 100)
+        self.assertEqual(len(publicados[0]['fases']), 12)
+    
+    def test_totales_actualizados_fuera_de_una_transaccion(self):
+        publicados = self.capturar_publicaciones()
+        self.client.force_login(self.usuario)
+        self.client.get(reverse('curricular:dashboard'), secure=True)
+        
+        # En autocommit on_commit ejecuta el callback en el acto, dentro de la señal
+        with mock.patch.object(eventos.transaction, 'on_commit', lambda funcion: funcion()):
+            self.rediseño.estado = 'suspendido'
+            self.rediseño.save()
+            self.rediseño.carrera.activo = False
+            self.rediseño.carrera.save()
+        
+        self.assertEqual(len(publicados), 2)
+        self.assertEqual(publicados[0]['totales']['total_rediseños'], 0)
+        self.assertEqual(publicados[0]['rediseños'][0]['estado'], 'suspendido')
+        self.assertEqual(publicados[1]['totales']['total_carreras'], 0)
+        self.assertEqual(publicados[1]['rediseños'], [])
+    
+    def test_fuera_de_asgi_responde_204(self):
+        self.assertEqual(self.client.get(self.url, secure=True).status_code, 302)
+        self.client.force_login(self.usuario)
+        self.assertEqual(self.client.get(self.url, secure=True).status_code, 204)
+    
+    @override_settings(EVENTOS_LATIDO=0.01)
+    async def test_flujo_asgi(self):
+        await self.async_client.aforce_login(self.usuario)
+        response = await self.async_client.get(self.url, secure=True)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        contenido = aiter(response.streaming_content)
+        self.assertEqual(await anext(contenido), b'retry: 5000\n\n')
+        self.assertEqual(await anext(contenido), b': latido\n\n')
+        
+        self.difusor.publicar('progreso', lambda: {'fases': []})
+        self.assertIn(b'event: progreso', await anext(contenido))
+    
+    async def test_apagar_el_servidor_cierra_los_flujos(self):
+        flujo = eventos.flujo_eventos(None, 5, 1000)
+        await anext(flujo)
+        siguiente = asyncio.ensure_future(anext(flujo))
+        await asyncio.sleep(0)
+        self.assertEqual(self.difusor.suscriptores, 1)
+        
+        mensajes = iter([{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}])
+        enviados = []
+        
+        async def recibir():
+            return next(mensajes)
+        
+        async def enviar(mensaje):
+            enviados.append(mensaje['type'])
+        
+        await asgi.application({'type': 'lifespan'}, recibir, enviar)
+        self.assertEqual(enviados, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        with self.assertRaises(StopAsyncIteration):
+            await siguiente
+        self.assertEqual(self.difusor.suscriptores, 0)
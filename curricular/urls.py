@@ -6,10 +6,33 @@ app_name = 'curricular'
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('carreras/', views.lista_carreras, name='lista_carreras'),
+    path('api/carreras/', views.api_carreras, name='api_carreras'),
+    path('api/v1/sedes/', views.api_datos, {'recurso': 'sedes'}, name='api_sedes'),
+    path('api/v1/facultades/', views.api_datos, {'recurso': 'facultades'}, name='api_facultades'),
+    path('api/v1/carreras/', views.api_datos, {'recurso': 'carreras'}, name='api_datos_carreras'),
+    path('api/v1/rediseños/', views.api_datos, {'recurso': 'rediseños'}, name='api_rediseños'),
+    path('api/v1/seguimientos/', views.api_datos, {'recurso': 'seguimientos'}, name='api_seguimientos'),
+    path('api/v1/cambios/', views.api_cambios, name='api_cambios'),
     path('rediseño/<int:rediseño_id>/', views.detalle_rediseño, name='detalle_rediseño'),
     path('fase/<int:seguimiento_id>/actualizar/', views.actualizar_fase, name='actualizar_fase'),
+    path('fase/lote/', views.actualizar_fase_lote, name='actualizar_fase_lote'),
+    path('api/fase/lote/', views.api_actualizar_fase_lote, name='api_actualizar_fase_lote'),
     path('fase/<int:seguimiento_id>/subir-archivo/', views.subir_archivo_ca, name='subir_archivo_ca'),
+    path('fase/<int:seguimiento_id>/subidas/', views.iniciar_subida_ca, name='iniciar_subida_ca'),
+    path('subidas/<uuid:subida_id>/', views.fragmento_subida_ca, name='fragmento_subida_ca'),
     path('archivo/<int:archivo_id>/descargar/', views.descargar_archivo_ca, name='descargar_archivo_ca'),
+    path('rediseño/<int:valor>/archivos.zip', views.paquete_archivos_ca, {'ambito': 'rediseño'}, name='paquete_rediseño_ca'),
+    path('sede/<int:valor>/archivos.zip', views.paquete_archivos_ca, {'ambito': 'sede'}, name='paquete_sede_ca'),
+    path('año/<int:valor>/archivos.zip', views.paquete_archivos_ca, {'ambito': 'año'}, name='paquete_año_ca'),
+    path('archivo/<int:archivo_id>/miniatura/', views.miniatura_archivo_ca, name='miniatura_archivo_ca'),
     path('archivo/<int:archivo_id>/eliminar/', views.eliminar_archivo_ca, name='eliminar_archivo_ca'),
     path('reporte/pdf/', views.generar_reporte_pdf, name='generar_reporte_pdf'),
+    path('reporte/xlsx/', views.exportar_xlsx, name='exportar_xlsx'),
+    path('exportar/seguimientos.csv', views.exportar_seguimientos, {'formato': 'csv'}, name='exportar_seguimientos_csv'),
+    path('exportar/seguimientos.ndjson', views.exportar_seguimientos, {'formato': 'ndjson'}, name='exportar_seguimientos_ndjson'),
+    path('cache/estadisticas/', views.estadisticas_cache, name='estadisticas_cache'),
+    path('eventos/progreso/', views.eventos_progreso, name='eventos_progreso'),
+    path('instrumentacion/', views.estadisticas_instrumentacion, name='estadisticas_instrumentacion'),
+    path('reporte/tarea/<uuid:tarea_id>/', views.estado_tarea, name='estado_tarea'),
+    path('reporte/tarea/<uuid:tarea_id>/descargar/', views.descargar_tarea, name='descargar_tarea'),
 ]
\ No newline at end of file
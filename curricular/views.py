@@ -1,82 +1,312 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, FileResponse
-from django.db.models import Q, Count
+from django.http import HttpResponse, FileResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.template.loader import render_to_string
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Count, Prefetch, Case, When, OuterRef, Subquery
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header
+from django.views.decorators.http import require_POST
 from io import BytesIO
+import json
 import mimetypes
 
 from .models import (
     RediseñoCurricular, SeguimientoFase, Carrera, Fase, 
-    ArchivoComisionAcademica, Sede, Facultad
+    ArchivoComisionAcademica, Sede, Facultad, TareaReporte, SubidaParcial, CambioSeguimiento
 )
-from .forms import SeguimientoFaseForm, ArchivoComisionAcademicaForm
+from .forms import (
+    SeguimientoFaseForm, ArchivoComisionAcademicaForm, ActualizacionLoteForm, SeguimientoLoteForm,
+    FiltroSeguimientosForm, InicioSubidaForm
+)
+from . import api, cache_datos, eventos, exportaciones, instrumentacion, paquetes
+from .busqueda import buscar_carreras
+from .descargas import servir_archivo
+from .paginacion import PaginadorCursor
+from .subidas import FragmentoInvalido, iniciar_subida, recibir_fragmento
+from .reportes import etag_reporte, reporte_pdf_en_cache
+from .tareas import encolar_tarea
 
-@login_required
-def dashboard(request):
-    """Dashboard principal con estadísticas"""
+def estadisticas_dashboard():
     total_carreras = Carrera.objects.filter(activo=True).count()
     total_rediseños = RediseñoCurricular.objects.filter(estado='en_proceso').count()
     
     # Rediseños por sede
-    rediseños_por_sede = RediseñoCurricular.objects.filter(
+    rediseños_por_sede = list(RediseñoCurricular.objects.filter(
         estado='en_proceso'
     ).values('carrera__sede__nombre').annotate(
         total=Count('id')
-    ).order_by('-total')
-    
-    # Últimos rediseños actualizados
-    ultimos_rediseños = RediseñoCurricular.objects.select_related(
-        'carrera', 'carrera__sede', 'carrera__facultad'
-    ).order_by('-actualizado_el')[:10]
+    ).order_by('-total'))
     
-    context = {
+    return {
         'total_carreras': total_carreras,
         'total_rediseños': total_rediseños,
         'rediseños_por_sede': rediseños_por_sede,
-        'ultimos_rediseños': ultimos_rediseños,
     }
+
+def fragmento_ultimos_rediseños():
+    ultimos_rediseños = RediseñoCurricular.objects.with_progreso().select_related(
+        'carrera', 'carrera__sede', 'carrera__facultad'
+    ).order_by('-actualizado_el')[:10]
+    return render_to_string(
+        'curricular/fragmentos/ultimos_rediseños.html',
+        {'ultimos_rediseños': ultimos_rediseños},
+    )
+
+@login_required
+def dashboard(request):
+    """Dashboard principal con estadísticas.
+    
+    Los agregados y la tabla de últimos rediseños se sirven desde la caché
+    versionada, que se invalida cuando cambian los datos.
+    """
+    context = dict(cache_datos.obtener_o_calcular('dashboard:estadisticas', estadisticas_dashboard))
+    context['ultimos_rediseños_html'] = cache_datos.obtener_o_calcular(
+        'dashboard:ultimos_rediseños', fragmento_ultimos_rediseños
+    )
     return render(request, 'curricular/dashboard.html', context)
 
+@staff_member_required
+def estadisticas_cache(request):
+    """Tasa de aciertos de la caché versionada"""
+    return JsonResponse(cache_datos.estadisticas())
+
+@staff_member_required
+def estadisticas_instrumentacion(request):
+    """Tiempo y consultas por vista medidos por InstrumentacionMiddleware;
+    un POST reinicia el resumen"""
+    if request.method == 'POST':
+        instrumentacion.reiniciar()
+    return JsonResponse(instrumentacion.resumen())
+
 @login_required
-def lista_carreras(request):
-    """Lista de todas las carreras con filtros"""
-    carreras = Carrera.objects.select_related('facultad', 'sede').filter(activo=True)
+async def eventos_progreso(request):
+    """Flujo Server-Sent Events con el progreso en vivo para el dashboard y
+    el detalle de rediseño. Fuera de ASGI responde 204, con lo que el
+    navegador deja de reintentar y la página funciona como antes."""
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    try:
+        ultimo_id = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        ultimo_id = None
     
-    # Filtros
-    sede_id = request.GET.get('sede')
-    facultad_id = request.GET.get('facultad')
-    buscar = request.GET.get('buscar')
+    response = StreamingHttpResponse(
+        eventos.flujo_eventos(ultimo_id, settings.EVENTOS_LATIDO, settings.EVENTOS_REINTENTO_MS),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Nginx no debe acumular los eventos
+    return response
+
+# Orden del modelo Carrera (sede, facultad, nombre), desempatado por pk
+ORDEN_CARRERAS = ['sede__nombre', 'facultad__nombre', 'nombre', 'pk']
+
+def filtrar_carreras(carreras, params):
+    """Aplica los filtros de sede, facultad y búsqueda.
+    
+    Retorna el queryset filtrado y, si hubo búsqueda, los ids de las carreras
+    encontradas ordenados por relevancia (None en caso contrario); si hay
+    más de BUSQUEDA_LIMITE se agrega una de más, ver busqueda_limitada().
+    """
+    sede_id = params.get('sede')
+    facultad_id = params.get('facultad')
+    buscar = params.get('buscar')
     
     if sede_id:
         carreras = carreras.filter(sede_id=sede_id)
     if facultad_id:
         carreras = carreras.filter(facultad_id=facultad_id)
+    carrera_ids = None
     if buscar:
-        carreras = carreras.filter(
-            Q(nombre__icontains=buscar) |
-            Q(facultad__nombre__icontains=buscar)
-        )
+        # Búsqueda de texto completo, sin acentos
+        carrera_ids = buscar_carreras(buscar, settings.BUSQUEDA_LIMITE + 1)
+        carreras = carreras.filter(pk__in=carrera_ids[:settings.BUSQUEDA_LIMITE])
+    return carreras, carrera_ids
+
+def busqueda_limitada(carrera_ids):
+    """La búsqueda encontró más carreras de las que se muestran"""
+    return carrera_ids is not None and len(carrera_ids) > settings.BUSQUEDA_LIMITE
+
+def ultimo_rediseño():
+    return Subquery(
+        RediseñoCurricular.objects.filter(carrera=OuterRef('pk')).order_by('-año').values('pk')[:1]
+    )
+
+@login_required
+def lista_carreras(request):
+    """Lista de todas las carreras con filtros.
+    
+    Con el parámetro `cursor` se pagina por cursor (sin COUNT ni OFFSET).
+    """
+    carreras = Carrera.objects.select_related('facultad', 'sede').filter(
+        activo=True
+    ).annotate(ultimo_rediseño_id=ultimo_rediseño())
+    carreras, carrera_ids = filtrar_carreras(carreras, request.GET)
+    
+    page_obj = pagina_cursor = None
+    if 'cursor' in request.GET:
+        paginador = PaginadorCursor(carreras, ORDEN_CARRERAS, 20)
+        pagina_cursor = paginador.get_page(request.GET.get('cursor'))
+    else:
+        if carrera_ids:
+            # Resultados de búsqueda ordenados por relevancia
+            carreras = carreras.order_by(
+                Case(*[When(pk=pk, then=posicion) for posicion, pk in enumerate(carrera_ids)])
+            )
+        paginator = Paginator(carreras, 20)
+        page_number = request.GET.get('page')
+        page_obj = paginator.get_page(page_number)
     
-    # Paginación
-    paginator = Paginator(carreras, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    parametros = request.GET.copy()
+    parametros.pop('page', None)
+    parametros.pop('cursor', None)
     
     context = {
         'page_obj': page_obj,
+        'pagina_cursor': pagina_cursor,
+        'carreras': page_obj if page_obj is not None else pagina_cursor,
+        'parametros': parametros.urlencode(),
+        'busqueda_limitada': busqueda_limitada(carrera_ids),
         'sedes': Sede.objects.all(),
         'facultades': Facultad.objects.all(),
     }
     return render(request, 'curricular/lista_carreras.html', context)
 
+@login_required
+def api_carreras(request):
+    """Listado JSON de carreras activas paginado por cursor"""
+    try:
+        limite = min(max(int(request.GET.get('limite', 50)), 1), 100)
+    except ValueError:
+        limite = 50
+    
+    carreras, carrera_ids = filtrar_carreras(Carrera.objects.filter(activo=True), request.GET)
+    carreras = carreras.values(
+        'pk', 'nombre', 'grado_academico', 'sede__nombre', 'facultad__nombre',
+        ultimo_rediseño_id=ultimo_rediseño(),
+    )
+    pagina = PaginadorCursor(carreras, ORDEN_CARRERAS, limite).get_page(request.GET.get('cursor'))
+    
+    url_siguiente = None
+    if pagina.has_next():
+        parametros = request.GET.copy()
+        parametros['cursor'] = pagina.siguiente
+        url_siguiente = f"{request.path}?{parametros.urlencode()}"
+    
+    return JsonResponse({
+        'resultados': [
+            {
+                'id': carrera['pk'],
+                'nombre': carrera['nombre'],
+                'grado_academico': carrera['grado_academico'],
+                'sede': carrera['sede__nombre'],
+                'facultad': carrera['facultad__nombre'],
+                'ultimo_rediseño_id': carrera['ultimo_rediseño_id'],
+            }
+            for carrera in pagina
+        ],
+        'siguiente': pagina.siguiente,
+        'url_siguiente': url_siguiente,
+        'busqueda_limitada': busqueda_limitada(carrera_ids),
+    })
+
+@login_required
+def api_datos(request, recurso):
+    """Listado JSON de solo lectura de un recurso de curricular.api, con
+    selección de campos, filtros, cursor y ETag débil"""
+    definicion = api.RECURSOS[recurso]
+    try:
+        limite = min(max(int(request.GET.get('limite', 50)), 1), 500)
+    except ValueError:
+        limite = 50
+    
+    try:
+        campos = definicion.seleccionar(request.GET.get('campos'))
+        queryset = definicion.filtrar(request.GET)
+    except api.ParametroInvalido as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    
+    etag = definicion.etag_previo(queryset, request.get_full_path())
+    response = get_conditional_response(request, etag=etag) if etag else None
+    if response is None:
+        resultados, siguiente = definicion.pagina(queryset, campos, limite, request.GET.get('cursor'))
+        url_siguiente = None
+        if siguiente:
+            parametros = request.GET.copy()
+            parametros['cursor'] = siguiente
+            url_siguiente = f"{request.path}?{parametros.urlencode()}"
+        
+        if etag is None:
+            etag = api.etag_debil(request.get_full_path(), resultados)
+            response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse({
+                'resultados': resultados,
+                'siguiente': siguiente,
+                'url_siguiente': url_siguiente,
+            })
+    
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def api_cambios(request):
+    """Cambios de seguimientos posteriores al cursor `desde`, para
+    sincronizar de forma incremental. `desde=ultimo` retorna solo el cursor
+    actual, para empezar a seguir los cambios sin leer el historial."""
+    try:
+        limite = min(max(int(request.GET.get('limite', 100)), 1), 1000)
+    except ValueError:
+        limite = 100
+    
+    cambios = CambioSeguimiento.objects.all()
+    if request.GET.get('rediseño'):
+        try:
+            cambios = cambios.filter(rediseño_id=int(request.GET['rediseño']))
+        except ValueError:
+            return JsonResponse({'error': 'El parámetro rediseño debe ser un número'}, status=400)
+    
+    desde = request.GET.get('desde', '0')
+    if desde == 'ultimo':
+        ultimo = cambios.order_by('-pk').values_list('pk', flat=True).first()
+        return JsonResponse({'cambios': [], 'cursor': ultimo or 0, 'hay_mas': False})
+    try:
+        desde = int(desde)
+    except ValueError:
+        return JsonResponse({'error': 'El cursor desde debe ser un número o "ultimo"'}, status=400)
+    
+    filas = list(cambios.filter(pk__gt=desde).order_by('pk').values(
+        'pk', 'seguimiento_id', 'rediseño_id', 'origen', 'usuario__username', 'fecha', 'antes', 'despues',
+    )[:limite + 1])
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+    
+    return JsonResponse({
+        'cambios': [
+            {
+                'id': fila['pk'],
+                'seguimiento_id': fila['seguimiento_id'],
+                'rediseño_id': fila['rediseño_id'],
+                'origen': fila['origen'],
+                'usuario': fila['usuario__username'],
+                'fecha': fila['fecha'],
+                'antes': fila['antes'],
+                'despues': fila['despues'],
+            }
+            for fila in filas
+        ],
+        'cursor': filas[-1]['pk'] if filas else desde,
+        'hay_mas': hay_mas,
+    })
+
 @login_required
 def detalle_rediseño(request, rediseño_id):
     """Detalle del rediseño curricular con sus fases"""
@@ -87,11 +317,18 @@ def detalle_rediseño(request, rediseño_id):
         id=rediseño_id
     )
     
-    seguimientos = rediseño.seguimientos.select_related('fase').order_by('fase__orden')
+    seguimientos = rediseño.seguimientos.select_related('fase').prefetch_related(
+        Prefetch(
+            'archivos',
+            queryset=ArchivoComisionAcademica.objects.select_related('subido_por').defer('texto_extraido'),
+            to_attr='archivos_adjuntos',
+        )
+    ).order_by('fase__orden')
     
     context = {
         'rediseño': rediseño,
         'seguimientos': seguimientos,
+        'progreso': rediseño.progreso_porcentaje(),
     }
     return render(request, 'curricular/detalle_rediseño.html', context)
 
@@ -109,6 +346,7 @@ def actualizar_fase(request, seguimiento_id):
         if form.is_valid():
             seguimiento = form.save(commit=False)
             seguimiento.actualizado_por = request.user
+            seguimiento.origen_cambio = 'formulario'
             seguimiento.save()
             messages.success(request, 'Fase actualizada correctamente.')
             return redirect('curricular:detalle_rediseño', rediseño_id=seguimiento.rediseño.id)
@@ -121,6 +359,77 @@ def actualizar_fase(request, seguimiento_id):
     }
     return render(request, 'curricular/actualizar_fase.html', context)
 
+@login_required
+def actualizar_fase_lote(request):
+    """Actualizar la misma fase de varios rediseños a la vez"""
+    if not request.user.puede_editar():
+        messages.error(request, 'No tienes permisos para editar fases.')
+        return redirect('curricular:dashboard')
+    
+    if request.method == 'POST':
+        form = ActualizacionLoteForm(request.POST)
+        if form.is_valid():
+            cambios = form.cambios()
+            seguimientos = SeguimientoFase.objects.filter(
+                fase=form.cleaned_data['fase']
+            ).actualizar_en_lote(
+                {rediseño.pk: cambios for rediseño in form.cleaned_data['rediseños']},
+                request.user,
+            )
+            messages.success(request, f'{len(seguimientos)} seguimientos actualizados correctamente.')
+            return redirect(f"{reverse('curricular:actualizar_fase_lote')}?fase={form.cleaned_data['fase'].pk}")
+    else:
+        form = ActualizacionLoteForm(initial={'fase': request.GET.get('fase')})
+    
+    return render(request, 'curricular/actualizar_fase_lote.html', {'form': form})
+
+@login_required
+@require_POST
+def api_actualizar_fase_lote(request):
+    """Actualiza una fase de varios rediseños en una transacción.
+    
+    Cuerpo: {"fase": id, "seguimientos": [{"rediseño": id, "completado": true,
+    "fecha_inicio": "AAAA-MM-DD", "fecha_conclusion": "AAAA-MM-DD"}, ...]}
+    """
+    if not request.user.puede_editar():
+        return JsonResponse({'error': 'No tienes permisos para editar fases.'}, status=403)
+    
+    try:
+        datos = json.loads(request.body)
+        fase = Fase.objects.get(pk=datos['fase'])
+        elementos = list(datos['seguimientos'])
+    except (ValueError, TypeError, KeyError, Fase.DoesNotExist):
+        return JsonResponse({'error': 'Se esperaba {"fase": id, "seguimientos": [...]}'}, status=400)
+    
+    cambios, errores = {}, {}
+    for i, elemento in enumerate(elementos):
+        form = SeguimientoLoteForm(elemento if isinstance(elemento, dict) else {})
+        if form.is_valid():
+            cambios[form.cleaned_data['rediseño']] = form.cambios()
+        else:
+            errores[i] = form.errors
+    if errores:
+        return JsonResponse({'errores': errores}, status=400)
+    
+    with transaction.atomic():
+        seguimientos = SeguimientoFase.objects.filter(fase=fase).actualizar_en_lote(cambios, request.user)
+        faltantes = set(cambios) - {seguimiento.rediseño_id for seguimiento in seguimientos}
+        if faltantes:
+            transaction.set_rollback(True)
+            return JsonResponse({
+                'error': 'Rediseños sin seguimiento para esta fase',
+                'rediseños': sorted(faltantes),
+            }, status=404)
+    
+    rediseños = RediseñoCurricular.objects.filter(pk__in=cambios).order_by('pk')
+    return JsonResponse({
+        'actualizados': len(seguimientos),
+        'rediseños': [
+            {'id': rediseño.pk, 'progreso': rediseño.progreso_porcentaje()}
+            for rediseño in rediseños.only('fases_completadas', 'fases_totales')
+        ],
+    })
+
 @login_required
 def subir_archivo_ca(request, seguimiento_id):
     """Subir archivo para la fase Comisión Académica"""
@@ -156,16 +465,109 @@ def subir_archivo_ca(request, seguimiento_id):
     }
     return render(request, 'curricular/subir_archivo_ca.html', context)
 
+def datos_subida(subida):
+    return {
+        'id': str(subida.id),
+        'url': reverse('curricular:fragmento_subida_ca', args=[subida.id]),
+        'tamaño': subida.tamaño,
+        'recibido': subida.recibido,
+        'completa': False,
+    }
+
+@login_required
+@require_POST
+def iniciar_subida_ca(request, seguimiento_id):
+    """Iniciar una subida por fragmentos: valida nombre y tamaño antes de
+    recibir el contenido"""
+    seguimiento = get_object_or_404(SeguimientoFase, id=seguimiento_id, fase__codigo='CA')
+    
+    if not request.user.puede_editar():
+        return JsonResponse({'error': 'No tienes permisos para subir archivos.'}, status=403)
+    
+    form = InicioSubidaForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errores': form.errors}, status=400)
+    
+    subida = iniciar_subida(
+        seguimiento,
+        request.user,
+        form.cleaned_data['nombre'],
+        form.cleaned_data['tamaño'],
+        form.cleaned_data['descripcion'],
+    )
+    return JsonResponse(datos_subida(subida), status=201)
+
+@login_required
+def fragmento_subida_ca(request, subida_id):
+    """GET: bytes recibidos de la subida. POST: agrega el fragmento enviado
+    como cuerpo, a partir de la cabecera X-Subida-Offset"""
+    subida = get_object_or_404(SubidaParcial, id=subida_id, usuario=request.user)
+    
+    if request.method == 'POST':
+        try:
+            offset = int(request.headers['X-Subida-Offset'])
+            largo = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return JsonResponse({'error': 'Faltan las cabeceras X-Subida-Offset o Content-Length'}, status=400)
+        
+        try:
+            subida, archivo = recibir_fragmento(subida.pk, offset, request, largo)
+        except FragmentoInvalido as exc:
+            subida.refresh_from_db()
+            return JsonResponse({'error': str(exc), **datos_subida(subida)}, status=409)
+        
+        if archivo is not None:
+            return JsonResponse({
+                'completa': True,
+                'archivo_id': archivo.pk,
+                'url_detalle': reverse('curricular:detalle_rediseño', args=[subida.seguimiento.rediseño_id]),
+            }, status=201)
+    
+    return JsonResponse(datos_subida(subida))
+
 @login_required
 def descargar_archivo_ca(request, archivo_id):
     """Descargar archivo de Comisión Académica"""
     archivo = get_object_or_404(ArchivoComisionAcademica, id=archivo_id)
     
-    # Servir el archivo
-    response = FileResponse(archivo.archivo.open('rb'))
-    response['Content-Type'] = archivo.tipo_mime
-    response['Content-Disposition'] = f'attachment; filename="{archivo.nombre_original}"'
+    # Admite descargas reanudables (Range) y peticiones condicionales
+    return servir_archivo(
+        request,
+        archivo.archivo,
+        tamaño=archivo.tamaño,
+        modificado=archivo.subido_el,
+        etag=archivo.etag(),
+        nombre=archivo.nombre_original,
+        tipo_mime=archivo.tipo_mime,
+    )
+
+@login_required
+def miniatura_archivo_ca(request, archivo_id):
+    """Miniatura generada al procesar el archivo"""
+    archivo = get_object_or_404(ArchivoComisionAcademica.objects.exclude(miniatura=''), id=archivo_id)
+    response = FileResponse(archivo.miniatura.open('rb'), content_type='image/jpeg')
+    patch_cache_control(response, private=True, max_age=86400)
+    return response
+
+@login_required
+def paquete_archivos_ca(request, ambito, valor):
+    """Descargar en un ZIP todos los archivos de Comisión Académica de un
+    rediseño, una sede o un año"""
+    if ambito == 'rediseño':
+        rediseño = get_object_or_404(RediseñoCurricular.objects.select_related('carrera'), id=valor)
+        filtros = {'seguimiento__rediseño': rediseño}
+        nombre = f'comision_academica_{rediseño.carrera.nombre}_{rediseño.año}.zip'
+    elif ambito == 'sede':
+        sede = get_object_or_404(Sede, id=valor)
+        filtros = {'seguimiento__rediseño__carrera__sede': sede}
+        nombre = f'comision_academica_{sede.nombre}.zip'
+    else:
+        filtros = {'seguimiento__rediseño__año': valor}
+        nombre = f'comision_academica_{valor}.zip'
     
+    response = StreamingHttpResponse(paquetes.generar_zip(filtros), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, nombre)
+    patch_cache_control(response, private=True, no_cache=True)
     return response
 
 @login_required
@@ -179,7 +581,7 @@ def eliminar_archivo_ca(request, archivo_id):
     
     if request.method == 'POST':
         rediseño_id = archivo.seguimiento.rediseño.id
-        archivo.archivo.delete()
+        # El contenido se borra al eliminar la última referencia (ver signals)
         archivo.delete()
         messages.success(request, 'Archivo eliminado correctamente.')
         return redirect('curricular:detalle_rediseño', rediseño_id=rediseño_id)
@@ -189,94 +591,94 @@ def eliminar_archivo_ca(request, archivo_id):
 
 @login_required
 def generar_reporte_pdf(request):
-    """Generar reporte PDF del estado de todos los rediseños"""
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="reporte_rediseño_curricular.pdf"'
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor('#1a5490'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    )
-    
-    # Título
-    title = Paragraph("REPORTE DE REDISEÑO CURRICULAR 2025<br/>UATF - POTOSÍ", title_style)
-    elements.append(title)
-    elements.append(Spacer(1, 0.3*inch))
+    """Generar reporte PDF del estado de todos los rediseños.
     
-    # Estadísticas generales
-    total_carreras = Carrera.objects.filter(activo=True).count()
-    total_rediseños = RediseñoCurricular.objects.filter(estado='en_proceso').count()
+    Si el PDF no está en caché, se encola su generación y se responde de
+    inmediato con el estado de la tarea.
+    """
+    etag = etag_reporte()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        pdf = reporte_pdf_en_cache(etag)
+        if pdf is not None:
+            response = FileResponse(
+                BytesIO(pdf),
+                as_attachment=True,
+                filename='reporte_rediseño_curricular.pdf',
+                content_type='application/pdf',
+            )
+        else:
+            tarea = encolar_tarea('reporte_pdf', version=etag, usuario=request.user)
+            if tarea.estado != 'completada':
+                return respuesta_tarea(request, tarea, status=202)
+            response = archivo_tarea(tarea)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def exportar_xlsx(request):
+    """Exportar a Excel la matriz de fases, fechas y responsables de todos
+    los rediseños; se genera en segundo plano como el reporte PDF"""
+    etag = etag_reporte()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        tarea = encolar_tarea('reporte_xlsx', version=etag, usuario=request.user)
+        if tarea.estado != 'completada':
+            return respuesta_tarea(request, tarea, status=202)
+        response = archivo_tarea(tarea)
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@login_required
+def exportar_seguimientos(request, formato):
+    """Exportar los seguimientos de fases en CSV o NDJSON, generados por
+    lotes mientras se envía la respuesta"""
+    form = FiltroSeguimientosForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errores': form.errors}, status=400)
     
-    stats_data = [
-        ['Total de Carreras:', str(total_carreras)],
-        ['Rediseños en Proceso:', str(total_rediseños)],
-    ]
-    
-    stats_table = Table(stats_data, colWidths=[3*inch, 2*inch])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f0f0f0')),
-        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-    ]))
-    elements.append(stats_table)
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Tabla de rediseños por sede
-    rediseños = RediseñoCurricular.objects.select_related(
-        'carrera__sede', 'carrera__facultad'
-    ).filter(estado='en_proceso').order_by('carrera__sede__nombre', 'carrera__nombre')
-    
-    for sede in Sede.objects.all():
-        rediseños_sede = rediseños.filter(carrera__sede=sede)
-        if not rediseños_sede.exists():
-            continue
-        
-        elements.append(Paragraph(f"<b>SEDE: {sede.nombre.upper()}</b>", styles['Heading2']))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        data = [['#', 'Carrera', 'Facultad', 'Progreso']]
-        
-        for idx, rediseño in enumerate(rediseños_sede, 1):
-            data.append([
-                str(idx),
-                rediseño.carrera.nombre,
-                rediseño.carrera.facultad.nombre[:30] + '...' if len(rediseño.carrera.facultad.nombre) > 30 else rediseño.carrera.facultad.nombre,
-                f"{rediseño.progreso_porcentaje()}%"
-            ])
-        
-        table = Table(data, colWidths=[0.5*inch, 2.5*inch, 2.5*inch, 1*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1a5490')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ]))
-        elements.append(table)
-        elements.append(Spacer(1, 0.3*inch))
-    
-    doc.build(elements)
-    pdf = buffer.getvalue()
-    buffer.close()
-    response.write(pdf)
-    
-    return response
\ No newline at end of file
+    seguimientos = exportaciones.filtrar_seguimientos(form.cleaned_data)
+    response = StreamingHttpResponse(
+        exportaciones.exportar_seguimientos(seguimientos, formato),
+        content_type=exportaciones.FORMATOS_SEGUIMIENTOS[formato],
+    )
+    response['Content-Disposition'] = f'attachment; filename="seguimientos.{formato}"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def archivo_tarea(tarea):
+    return FileResponse(
+        tarea.archivo.open('rb'),
+        as_attachment=True,
+        filename=tarea.nombre_archivo,
+        content_type=tarea.tipo_mime,
+    )
+
+def respuesta_tarea(request, tarea, status=200):
+    """Estado de la tarea en JSON, o una página que lo consulta periódicamente"""
+    datos = {
+        'id': str(tarea.id),
+        'tipo': tarea.tipo,
+        'estado': tarea.estado,
+        'progreso': tarea.progreso,
+        'error': tarea.error,
+        'url_estado': reverse('curricular:estado_tarea', args=[tarea.id]),
+        'url_descarga': reverse('curricular:descargar_tarea', args=[tarea.id]),
+    }
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(datos, status=status)
+    return render(request, 'curricular/tarea_reporte.html', {'tarea': datos}, status=status)
+
+@login_required
+def estado_tarea(request, tarea_id):
+    """Estado de una tarea de reporte en segundo plano"""
+    tarea = get_object_or_404(TareaReporte, id=tarea_id)
+    return respuesta_tarea(request, tarea)
+
+@login_required
+def descargar_tarea(request, tarea_id):
+    """Descargar el archivo generado por una tarea de reporte"""
+    tarea = get_object_or_404(TareaReporte, id=tarea_id, estado='completada')
+    return archivo_tarea(tarea)